@@ -0,0 +1,175 @@
+"""
+تجميع طلبات التنبؤ - Micro-Batching for Prediction Requests
+يجمع طلبات التنبؤ الفردية المتزامنة في دفعة واحدة لتقليل الحمل الثابت لـ sklearn و pandas
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.config import PREDICT_BATCH_MAX_WAIT_MS, PREDICT_BATCH_MAX_SIZE
+from app.executors import BoundedExecutor
+
+# دالة التقييم: قائمة سجلات -> (التصنيفات، الاحتمالات)
+# Scoring function: list of records -> (labels, probabilities)
+ScoreFn = Callable[[List[Dict[str, Any]]], Tuple[np.ndarray, np.ndarray]]
+
+
+class MicroBatcher:
+    """مُجمّع الطلبات - Asyncio request coalescer"""
+
+    def __init__(
+        self,
+        score_fn: ScoreFn,
+        max_wait_ms: float = PREDICT_BATCH_MAX_WAIT_MS,
+        max_batch_size: int = PREDICT_BATCH_MAX_SIZE,
+        executor: Optional[BoundedExecutor] = None
+    ):
+        """
+        تهيئة المُجمّع - Initialize batcher
+
+        Args:
+            score_fn: دالة التقييم الموجهة - Vectorized scoring function
+            max_wait_ms: أقصى انتظار لتجميع الدفعة (مللي ثانية) - Max wait to fill a batch
+            max_batch_size: أقصى حجم للدفعة - Max rows per batch
+            executor: مجمع التنفيذ (بدونه يُقيّم في حلقة الأحداث) - Pool to score in (None scores on the loop)
+        """
+        self.score_fn = score_fn
+        self.executor = executor
+        self.max_wait = max(max_wait_ms, 0) / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flushes: set = set()
+
+        # المقاييس - Metrics
+        self._batches = 0
+        self._rows = 0
+        self._max_seen = 0
+        self._full_flushes = 0
+        self._timeout_flushes = 0
+        self._errors = 0
+        self._size_histogram: Dict[int, int] = {}
+
+    def _ensure_worker(self) -> None:
+        """تشغيل عامل التجميع في الحلقة الحالية - Start the worker on the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, record: Dict[str, Any]) -> Tuple[Any, np.ndarray]:
+        """
+        إرسال سجل واحد للتقييم - Submit a single record for scoring
+
+        Args:
+            record: بيانات الموظف - Employee record
+
+        Returns:
+            (التصنيف، صف الاحتمالات) - (label, probability row)
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((record, future))
+        return await future
+
+    async def _run(self) -> None:
+        """حلقة التجميع - Coalescing loop"""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = self._loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # سحب كل ما هو جاهز دون انتظار - Drain whatever is already queued
+                try:
+                    batch.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            if len(batch) >= self.max_batch_size:
+                self._full_flushes += 1
+            else:
+                self._timeout_flushes += 1
+
+            if self.executor is not None:
+                # التقييم في الخلفية ليتداخل مع تجميع الدفعة التالية
+                # Score in the background so the next batch can fill meanwhile
+                task = self._loop.create_task(self._flush(batch))
+                self._flushes.add(task)
+                task.add_done_callback(self._flushes.discard)
+            else:
+                await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """تقييم دفعة وإرسال النتائج - Score a batch and resolve each caller"""
+        # تجاهل الطلبات الملغاة - Skip callers that went away
+        batch = [(record, future) for record, future in batch if not future.done()]
+        if not batch:
+            return
+
+        self._record_batch(len(batch))
+
+        records = [record for record, _ in batch]
+        try:
+            if self.executor is not None:
+                preds, probas = await self.executor.run(self.score_fn, records)
+            else:
+                preds, probas = self.score_fn(records)
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"فشل تقييم الدفعة ({len(batch)} طلب): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result((preds[i], probas[i]))
+
+    def _record_batch(self, size: int) -> None:
+        """تحديث مقاييس حجم الدفعة - Update batch-size metrics"""
+        self._batches += 1
+        self._rows += size
+        self._max_seen = max(self._max_seen, size)
+        # تجميع الأحجام في فئات أسية - Bucket sizes by powers of two
+        bucket = 1 << (size - 1).bit_length()
+        self._size_histogram[bucket] = self._size_histogram.get(bucket, 0) + 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        مقاييس المُجمّع - Batcher metrics
+
+        Returns:
+            عمق الطابور وإحصائيات حجم الدفعات - Queue depth and batch-size statistics
+        """
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batches": self._batches,
+            "rows": self._rows,
+            "avg_batch_size": round(self._rows / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size_seen": self._max_seen,
+            "full_flushes": self._full_flushes,
+            "timeout_flushes": self._timeout_flushes,
+            "errors": self._errors,
+            "batch_size_histogram": {
+                f"<={bucket}": count for bucket, count in sorted(self._size_histogram.items())
+            }
+        }
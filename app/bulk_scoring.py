@@ -0,0 +1,239 @@
+"""
+التقييم الجماعي من قاعدة البيانات - Bulk Scoring from the Database
+يقرأ جدول الموظفين على أجزاء ويقيّمها ويكتب النتائج في جدول نتائج دون تحميل الجدول كاملاً
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from loguru import logger
+from sqlalchemy import (
+    Column, DateTime, Float, Integer, MetaData, String, Table, create_engine, select
+)
+from sqlalchemy.engine import Engine
+
+from app.config import (
+    FEATURE_COLS, TARGET_COL, ID_COL, DEFAULT_EMPLOYEE_TABLE,
+    BULK_SCORING_CHUNK_SIZE, BULK_SCORING_RESULTS_TABLE
+)
+from app.data_utils import prepare_employee_data, clean_df
+from app.inference import predict_frame
+from app.model_registry import model_registry
+
+# أعمدة يشتق منها prepare_employee_data الميزات الناقصة
+# Columns prepare_employee_data derives missing features from
+DERIVATION_COLS = ["Date_Birth", "Emp_Date_Hiring"]
+
+# عمود احتمالية الترقية في جدول النتائج - Promotion probability column in the results table
+PROBABILITY_COL = "promotion_probability"
+
+
+def _split_table_name(name: str) -> Tuple[Optional[str], str]:
+    """فصل المخطط عن اسم الجدول (dbo.Employees) - Split 'schema.table'"""
+    schema, _, table = name.rpartition(".")
+    return (schema or None), table
+
+
+def _results_table(name: str, id_type: Any) -> Table:
+    """
+    تعريف جدول النتائج - Results table definition
+
+    Args:
+        name: اسم الجدول - Table name
+        id_type: نوع عمود المعرف في جدول المصدر - Source id column type
+
+    Returns:
+        الجدول - Table
+    """
+    schema, table = _split_table_name(name)
+    return Table(
+        table, MetaData(),
+        Column(ID_COL, id_type, index=True),
+        Column(TARGET_COL, Integer, nullable=False),
+        Column(PROBABILITY_COL, Float, nullable=False),
+        Column("model_version", String(64), nullable=False),
+        Column("scored_at", DateTime, nullable=False),
+        schema=schema
+    )
+
+
+def score_table(
+    engine: Engine,
+    source_table: str = DEFAULT_EMPLOYEE_TABLE,
+    results_table: str = BULK_SCORING_RESULTS_TABLE,
+    chunk_size: int = BULK_SCORING_CHUNK_SIZE,
+    limit: Optional[int] = None,
+    backend: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    تقييم جدول الموظفين على أجزاء - Score the employee table chunk by chunk
+
+    يُسقط فقط أعمدة الميزات والمعرف، ويقرأ بترقيم المفتاح (Emp_ID > آخر قيمة)
+    فلا يبقى مؤشر مفتوح أثناء الكتابة، ويُستخدم نفس إصدار النموذج لكل الأجزاء.
+    Projects only the feature and id columns and pages by key
+    (Emp_ID > last seen), so no cursor stays open while results are
+    written; the same model version scores every chunk.
+
+    Args:
+        engine: محرك SQLAlchemy (SQL Server أو SQLite) - SQLAlchemy engine (SQL Server or SQLite)
+        source_table: جدول الموظفين - Employee table
+        results_table: جدول النتائج (يُنشأ إذا لم يوجد) - Results table (created if missing)
+        chunk_size: عدد الصفوف لكل جزء - Rows per chunk
+        limit: حد عدد الصفوف - Row limit (optional)
+        backend: محرك الاستدلال - Inference backend
+
+    Returns:
+        ملخص التشغيل - Run summary
+
+    Raises:
+        ValueError: إذا لم يحتوِ الجدول على المعرف أو الميزات - If the table lacks the id or features
+        FileNotFoundError: إذا لم يوجد النموذج - If model not found
+    """
+    chunk_size = max(int(chunk_size), 1)
+    entry = model_registry.snapshot()
+
+    schema, table = _split_table_name(source_table)
+    source = Table(table, MetaData(), schema=schema, autoload_with=engine)
+    if ID_COL not in source.c:
+        raise ValueError(f"الجدول {source_table} لا يحتوي على عمود المعرف {ID_COL}")
+
+    # إسقاط الأعمدة المطلوبة فقط - Project only the columns we need
+    wanted = [c for c in FEATURE_COLS + DERIVATION_COLS if c in source.c and c != ID_COL]
+    id_column = source.c[ID_COL]
+    query = select(id_column, *[source.c[c] for c in wanted]).order_by(id_column)
+
+    results = _results_table(results_table, id_column.type)
+    results.create(engine, checkfirst=True)
+
+    logger.info(
+        f"بدء التقييم الجماعي: {source_table} -> {results_table} "
+        f"({len(wanted)} عمود، أجزاء من {chunk_size} صف، الإصدار {entry.version})"
+    )
+
+    started = time.perf_counter()
+    scored_at = datetime.now()
+    summary = {"chunks": 0, "rows_read": 0, "rows_scored": 0, "eligible_count": 0}
+    last_id = None
+
+    while limit is None or summary["rows_read"] < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - summary["rows_read"])
+        page = query if last_id is None else query.where(id_column > last_id)
+        with engine.connect() as conn:
+            chunk = pd.read_sql(page.limit(size), conn)
+        if chunk.empty:
+            break
+        # أسماء SQLAlchemy من نوع quoted_name ترفضها sklearn - sklearn rejects quoted_name labels
+        chunk.columns = [str(c) for c in chunk.columns]
+
+        # قيمة بايثون عادية لربطها كمعامل - Plain Python value for parameter binding
+        last_id = chunk[ID_COL].tolist()[-1]
+        summary["chunks"] += 1
+        summary["rows_read"] += len(chunk)
+
+        rows = _score_chunk(chunk, entry, backend, scored_at)
+        if rows:
+            # إدخال جماعي (fast_executemany مع pyodbc) - Bulk insert (fast_executemany with pyodbc)
+            with engine.begin() as conn:
+                conn.execute(results.insert(), rows)
+            summary["rows_scored"] += len(rows)
+            summary["eligible_count"] += sum(row[TARGET_COL] for row in rows)
+
+        logger.info(f"الجزء {summary['chunks']}: {summary['rows_read']} صف مقروء، {summary['rows_scored']} مُقيّم")
+
+        if len(chunk) < size:
+            break
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"اكتمل التقييم الجماعي: {summary['rows_scored']} صف في {elapsed:.1f} ث")
+
+    return {
+        "source_table": source_table,
+        "results_table": results_table,
+        "model_version": entry.version,
+        **summary,
+        "rows_skipped": summary["rows_read"] - summary["rows_scored"],
+        "not_eligible_count": summary["rows_scored"] - summary["eligible_count"],
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(summary["rows_scored"] / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+def _score_chunk(
+    chunk: pd.DataFrame,
+    entry: Any,
+    backend: Optional[str],
+    scored_at: datetime
+) -> List[Dict[str, Any]]:
+    """
+    تحضير جزء وتقييمه - Prepare and score one chunk
+
+    Args:
+        chunk: صفوف الجزء - Chunk rows
+        entry: نسخة النموذج - Model snapshot
+        backend: محرك الاستدلال - Inference backend
+        scored_at: وقت التشغيل - Run timestamp
+
+    Returns:
+        صفوف جدول النتائج - Results table rows
+    """
+    chunk = clean_df(prepare_employee_data(chunk))
+    chunk = chunk[chunk[ID_COL].notna()]
+    if chunk.empty:
+        return []
+
+    missing = [c for c in FEATURE_COLS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"أعمدة مفقودة في جدول المصدر: {', '.join(missing)}")
+
+    preds, probas = predict_frame(chunk[FEATURE_COLS], backend, entry)
+
+    return [
+        {
+            ID_COL: emp_id,
+            TARGET_COL: int(pred),
+            PROBABILITY_COL: float(proba[1]),
+            "model_version": entry.version,
+            "scored_at": scored_at
+        }
+        for emp_id, pred, proba in zip(chunk[ID_COL].tolist(), preds, probas)
+    ]
+
+
+def score_database_source(
+    connection: Optional[Dict[str, Any]] = None,
+    database_url: Optional[str] = None,
+    source_table: str = DEFAULT_EMPLOYEE_TABLE,
+    results_table: str = BULK_SCORING_RESULTS_TABLE,
+    chunk_size: int = BULK_SCORING_CHUNK_SIZE,
+    limit: Optional[int] = None,
+    backend: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    التقييم الجماعي من إعدادات الاتصال - Bulk scoring from connection settings
+
+    قابلة للتشغيل في مجمع العمليات - Safe to run in the process pool
+
+    Args:
+        connection: إعدادات SQL Server - SQL Server settings (DatabaseConnection kwargs)
+        database_url: رابط SQLAlchemy بديل (مثل sqlite:///hr.db) - Alternative SQLAlchemy URL
+        source_table: جدول الموظفين - Employee table
+        results_table: جدول النتائج - Results table
+        chunk_size: عدد الصفوف لكل جزء - Rows per chunk
+        limit: حد عدد الصفوف - Row limit
+        backend: محرك الاستدلال - Inference backend
+
+    Returns:
+        ملخص التشغيل - Run summary
+    """
+    if database_url:
+        engine = create_engine(database_url)
+    else:
+        from app.database import DatabaseConnection
+        engine = DatabaseConnection(**(connection or {})).get_sqlalchemy_engine()
+
+    try:
+        return score_table(engine, source_table, results_table, chunk_size, limit, backend)
+    finally:
+        engine.dispose()
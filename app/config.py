@@ -23,6 +23,19 @@ PROMOTION_MODEL_PATH = MODELS_DIR / "promotion_model.joblib"
 PERFORMANCE_MODEL_PATH = MODELS_DIR / "performance_model.joblib"
 METRICS_PATH = MODELS_DIR / "last_metrics.json"
 MODEL_VERSION_PATH = MODELS_DIR / "model_version.json"
+TRAINING_JOBS_PATH = MODELS_DIR / "training_jobs.json"
+# البيانات المنظفة (Feather بأنواع صريحة)؛ ملف CSV القديم يُقرأ إن لم يوجد
+# Cleaned dataset (Feather with explicit dtypes); the legacy CSV is read when it is missing
+CLEANED_DATASET_PATH = DATA_DIR / "cleaned_dataset.feather"
+CLEANED_DATASET_CSV_PATH = DATA_DIR / "cleaned_dataset.csv"
+# ذاكرة المعالجة المسبقة (تقسيم، معالج مدرب، مصفوفات .npy) - Preprocessing artifact cache
+PREPROCESSING_CACHE_DIR = DATA_DIR / "cache"
+# نتائج الرفع السابقة مفتاحها بصمة محتوى الملف - Previous upload results keyed by file content hash
+UPLOAD_CACHE_DIR = DATA_DIR / "upload_cache"
+# نقاط حفظ البحث عن المعاملات - Hyperparameter search checkpoints
+TUNING_DIR = MODELS_DIR / "tuning"
+# نسخة بيانات آخر تدريب للتدريب التزايدي - Previous training set kept for incremental training
+TRAINING_SNAPSHOT_PATH = MODELS_DIR / "training_snapshot.joblib"
 
 # مسارات السياسات - Policy Paths
 POLICIES_DB_PATH = POLICIES_DIR / "policies.json"
@@ -38,8 +51,144 @@ CV_FOLDS = 5
 N_ESTIMATORS = 300
 MAX_DEPTH = None
 
+# فضاء البحث لكل نوع نموذج (معاملات المصنف) - Search space per model type (classifier parameters)
+TUNING_SEARCH_SPACES = {
+    "random_forest": {
+        "n_estimators": [100, 200, 300, 500],
+        "max_depth": [None, 10, 20, 30],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": ["sqrt", "log2", 0.3],
+    },
+    "gradient_boosting": {
+        "n_estimators": [100, 200, 300],
+        "max_depth": [3, 5, 7],
+        "learning_rate": [0.03, 0.1, 0.3],
+        "subsample": [0.7, 1.0],
+    },
+    "hist_gradient_boosting": {
+        "learning_rate": [0.03, 0.1, 0.3],
+        "max_leaf_nodes": [15, 31, 63],
+        "min_samples_leaf": [10, 20, 50],
+        "l2_regularization": [0.0, 0.1, 1.0],
+    },
+}
+# HistGradientBoosting: فئات أصلية وإيقاف مبكر - native categoricals and early stopping
+# أقصى عدد فئات لكل عمود = عدد الصناديق؛ الفئات الأندر تُدمج - Max categories per column = max bins; rarer ones are grouped
+HGB_MAX_ITER = 500
+HGB_LEARNING_RATE = 0.1
+HGB_MAX_BINS = 255
+HGB_EARLY_STOPPING = True
+HGB_VALIDATION_FRACTION = 0.1
+HGB_N_ITER_NO_CHANGE = 10
+
+# الترميز الأحادي المتناثر - Sparse One-Hot Encoding
+# يبقي مصفوفة التصميم CSR من المعالج حتى المصنف ويدمج المستويات النادرة
+# Keeps the design matrix CSR from the preprocessor to the classifier and groups rare levels
+ONEHOT_SPARSE = os.getenv("ONEHOT_SPARSE", "false").lower() == "true"
+# أقل عدد ظهور للمستوى (0 لتعطيل الدمج) - Minimum level count (0 disables grouping)
+ONEHOT_MIN_FREQUENCY = int(os.getenv("ONEHOT_MIN_FREQUENCY", "20"))
+# أقصى عدد أعمدة لكل ميزة فئوية (0 بلا حد) - Max output columns per categorical feature (0 = unlimited)
+ONEHOT_MAX_CATEGORIES = int(os.getenv("ONEHOT_MAX_CATEGORIES", "0"))
+# وضع التحقق أثناء التدريب - Training validation mode
+# refit: تحقق متقاطع ثم تدريب نهائي | cv_reuse: إعادة استخدام نموذج الطية الأولى | oob: خارج الحقيبة (RandomForest)
+# refit: k-fold CV then a final fit | cv_reuse: keep the first fold model | oob: out-of-bag (RandomForest)
+VALIDATION_MODES = ["refit", "cv_reuse", "oob"]
+TRAINING_VALIDATION_MODE = os.getenv("TRAINING_VALIDATION_MODE", "refit")
+
+# إعدادات تجميع طلبات التنبؤ - Prediction Micro-Batching Settings
+PREDICT_BATCHING_ENABLED = os.getenv("PREDICT_BATCHING_ENABLED", "true").lower() == "true"
+PREDICT_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "5"))
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+
+# محرك الاستدلال - Inference Backend
+# sklearn: المسار الافتراضي | compiled: محرك الأشجار المُجمّع | auto: المُجمّع للدفعات الصغيرة
+# sklearn: default path | compiled: flat-array tree engine | auto: compiled for small batches
+INFERENCE_BACKENDS = ["sklearn", "compiled", "auto"]
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "sklearn")
+COMPILED_BACKEND_MAX_ROWS = int(os.getenv("COMPILED_BACKEND_MAX_ROWS", "64"))
+
+# إعدادات مجمعات التنفيذ - Executor Pool Settings
+# عند امتلاء المجمع (عمال + طابور) تُرفض الطلبات بالرمز 503
+# When a pool is full (workers + queue) requests are rejected with 503
+INFERENCE_MAX_WORKERS = int(os.getenv("INFERENCE_MAX_WORKERS", str(min(os.cpu_count() or 1, 4))))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "32"))
+TRAINING_MAX_WORKERS = int(os.getenv("TRAINING_MAX_WORKERS", "1"))
+TRAINING_MAX_QUEUE = int(os.getenv("TRAINING_MAX_QUEUE", "1"))
+# عمليات قراءة الملفات والأوراق في الرفع المتعدد - Processes parsing files and sheets in multi-file uploads
+INGESTION_MAX_WORKERS = int(os.getenv("INGESTION_MAX_WORKERS", str(min(os.cpu_count() or 1, 4))))
+INGESTION_MAX_QUEUE = int(os.getenv("INGESTION_MAX_QUEUE", "64"))
+# عمليات التقييم الجماعي من قاعدة البيانات (منفصلة عن التدريب) - Bulk database scoring processes (separate from training)
+SCORING_MAX_WORKERS = int(os.getenv("SCORING_MAX_WORKERS", "1"))
+SCORING_MAX_QUEUE = int(os.getenv("SCORING_MAX_QUEUE", "1"))
+
+# مهام التدريب غير المتزامنة - Asynchronous Training Jobs
+# كل مهمة تعمل في عملية مستقلة بأولوية أقل (nice) حتى لا تؤثر على زمن الاستجابة
+# Each job runs in its own lower-priority (nice) process so serving latency is unaffected
+# يُعاد استخدام TRAINING_MAX_WORKERS / TRAINING_MAX_QUEUE لعدد المهام الجارية والمنتظرة
+# TRAINING_MAX_WORKERS / TRAINING_MAX_QUEUE bound running and queued jobs
+TRAINING_JOB_NICE = int(os.getenv("TRAINING_JOB_NICE", "10"))
+TRAINING_JOB_HISTORY = int(os.getenv("TRAINING_JOB_HISTORY", "100"))
+
+# التدريب التزايدي من قاعدة البيانات - Incremental Database Training
+# تُسحب فقط الصفوف بعد آخر قيمة لعمود العلامة (المحفوظة في model_version.json)
+# وتُضاف أشجار مدربة عليها إلى الغابة؛ عند تجاوز INCREMENTAL_MAX_TREES يُعاد التدريب
+# كاملاً من النسخة المحفوظة دون إعادة تحميل الجدول
+# Only rows past the high-water mark stored in model_version.json are pulled and
+# trees trained on them are added to the forest; past INCREMENTAL_MAX_TREES the
+# model is refit from the cached training set without reloading the table
+INCREMENTAL_WATERMARK_COL = os.getenv("INCREMENTAL_WATERMARK_COL", "Emp_ID")
+INCREMENTAL_TREES = int(os.getenv("INCREMENTAL_TREES", "50"))
+INCREMENTAL_MAX_TREES = int(os.getenv("INCREMENTAL_MAX_TREES", "600"))
+INCREMENTAL_MIN_ROWS = int(os.getenv("INCREMENTAL_MIN_ROWS", "50"))
+# أحدث الصفوف المحتفظ بها (0 بلا حد) - Most recent rows kept in the sliding window (0 = all)
+INCREMENTAL_WINDOW_ROWS = int(os.getenv("INCREMENTAL_WINDOW_ROWS", "0"))
+
+# ذاكرة المعالجة المسبقة - Preprocessing Artifact Cache
+# إعادة التدريب على نفس البيانات بنفس إعدادات المعالج تتخطى القراءة والتقسيم والتحويل
+# Re-training on unchanged data with the same preprocessor settings skips reading, splitting and transforming
+PREPROCESSING_CACHE_ENABLED = os.getenv("PREPROCESSING_CACHE_ENABLED", "true").lower() == "true"
+PREPROCESSING_CACHE_MAX_ENTRIES = int(os.getenv("PREPROCESSING_CACHE_MAX_ENTRIES", "3"))
+# ضغط أنواع البيانات بعد التنظيف (category، وأعداد صحيحة صغيرة للأعمدة ذات المدى المعلن)
+# Dtype compaction after cleaning (category, and small integers for columns with a declared range)
+DTYPE_COMPACTION_ENABLED = os.getenv("DTYPE_COMPACTION_ENABLED", "true").lower() == "true"
+
+# البحث عن المعاملات بالتنصيف المتتالي (/train/tune) - Successive-halving hyperparameter search
+# TUNING_N_JOBS عدد الأنوية المسموح بها حتى لا تُحرم عمال الخدمة - Core budget, leaves the rest for serving
+TUNING_N_JOBS = int(os.getenv("TUNING_N_JOBS", str(max((os.cpu_count() or 1) // 2, 1))))
+TUNING_N_CANDIDATES = int(os.getenv("TUNING_N_CANDIDATES", "24"))
+TUNING_FACTOR = int(os.getenv("TUNING_FACTOR", "3"))
+TUNING_MIN_RESOURCES = int(os.getenv("TUNING_MIN_RESOURCES", "500"))
+TUNING_CV_FOLDS = int(os.getenv("TUNING_CV_FOLDS", "3"))
+# accuracy, precision, recall, f1_score, roc_auc
+TUNING_SCORING = os.getenv("TUNING_SCORING", "accuracy")
+
+# ذاكرة تخزين نتائج التنبؤ - Prediction Result Cache
+# تُمسح تلقائياً عند نشر إصدار جديد من النموذج - Cleared automatically when a new model version is published
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+PREDICTION_CACHE_MAX_MB = float(os.getenv("PREDICTION_CACHE_MAX_MB", "64"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+
+# إعدادات التنبؤ المتدفق - Streaming Prediction Settings
+# عدد الصفوف التي تُتحقق وتُقيّم معاً في /predict/stream
+# Rows validated and scored together by /predict/stream
+PREDICT_STREAM_CHUNK_SIZE = int(os.getenv("PREDICT_STREAM_CHUNK_SIZE", "1000"))
+
+# إعدادات التقييم الجماعي من قاعدة البيانات - Bulk Database Scoring Settings
+# تُقرأ الصفوف على أجزاء مرتبة بمعرف الموظف وتُكتب النتائج في جدول النتائج
+# Rows are read in Emp_ID-ordered chunks and predictions written to the results table
+BULK_SCORING_CHUNK_SIZE = int(os.getenv("BULK_SCORING_CHUNK_SIZE", "5000"))
+BULK_SCORING_RESULTS_TABLE = os.getenv("BULK_SCORING_RESULTS_TABLE", "Promotion_Predictions")
+# جداول النتائج المسموحة (مفصولة بفواصل)؛ أي اسم آخر يُرفض بالرمز 400
+# Allowed results tables (comma-separated); any other name is rejected with 400
+BULK_SCORING_RESULTS_TABLES = [
+    name.strip() for name in os.getenv("BULK_SCORING_RESULTS_TABLES", BULK_SCORING_RESULTS_TABLE).split(",")
+    if name.strip()
+]
+
 # أعمدة البيانات - Data Columns
 TARGET_COL = "promotion_eligible"
+# معرف الموظف (يُمرر كما هو في نتائج التنبؤ الجماعي) - Employee id, echoed in bulk results
+ID_COL = "Emp_ID"
 
 # الأعمدة الرقمية - Numerical Features
 NUMERICAL_COLS = [
@@ -116,7 +265,23 @@ DEFAULT_LANGUAGE = "ar"  # Arabic by default
 SUPPORTED_LANGUAGES = ["ar", "en"]
 
 # إعدادات الأمان - Security Settings
-MAX_FILE_SIZE_MB = 50
+MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
+# أقصى عدد ملفات في طلب /upload/datasets - Max files per /upload/datasets request
+MAX_UPLOAD_FILES = int(os.getenv("MAX_UPLOAD_FILES", "20"))
+# الصيغ المقروءة على أجزاء (CSV/TSV/TXT/NDJSON/Parquet/Feather) لا تُحمّل كاملة في الذاكرة
+# Formats read in chunks (CSV/TSV/TXT/NDJSON/Parquet/Feather) never load fully into memory
+MAX_STREAMING_FILE_SIZE_MB = int(os.getenv("MAX_STREAMING_FILE_SIZE_MB", "500"))
+UPLOAD_CHUNK_ROWS = int(os.getenv("UPLOAD_CHUNK_ROWS", "50000"))
+# محرك قراءة CSV (pyarrow أو pandas) ومحرك Excel (calamine أو openpyxl)؛ يُرجع للبديل عند الفشل
+# CSV reader engine (pyarrow or pandas) and Excel engine (calamine or openpyxl); falls back on failure
+CSV_READER_ENGINE = os.getenv("CSV_READER_ENGINE", "pyarrow").lower()
+EXCEL_READER_ENGINE = os.getenv("EXCEL_READER_ENGINE", "calamine").lower()
+# قراءة أعمدة النموذج فقط من الملفات المرفوعة - Read only the model's columns from uploaded files
+UPLOAD_PROJECT_COLUMNS = os.getenv("UPLOAD_PROJECT_COLUMNS", "true").lower() == "true"
+# إعادة رفع نفس الملف تُرجع النتيجة المحفوظة وتستعيد بياناتها المنظفة دون قراءة أو تنظيف
+# Re-uploading the same file returns the stored result and restores its cleaned data without parsing or cleaning
+UPLOAD_CACHE_ENABLED = os.getenv("UPLOAD_CACHE_ENABLED", "true").lower() == "true"
+UPLOAD_CACHE_MAX_ENTRIES = int(os.getenv("UPLOAD_CACHE_MAX_ENTRIES", "5"))
 
 # امتدادات الملفات المدعومة للبيانات - Supported data file extensions
 ALLOWED_DATA_EXTENSIONS = [
@@ -124,6 +289,7 @@ ALLOWED_DATA_EXTENSIONS = [
     ".xlsx", ".xls", ".xlsb", ".xlsm",  # Excel files
     ".txt",  # Text files
     ".json",  # JSON files
+    ".ndjson", ".jsonl",  # JSON Lines files
     ".parquet",  # Parquet files
     ".feather"  # Feather files
 ]
@@ -147,6 +313,7 @@ ALLOWED_MIME_TYPES = [
     "application/vnd.ms-excel.sheet.macroEnabled.12",  # .xlsm
     # JSON
     "application/json",
+    "application/x-ndjson",
     # Parquet
     "application/octet-stream",  # Generic binary (for .parquet, .feather, .xlsb)
     "application/vnd.apache.parquet",
@@ -187,6 +354,22 @@ MAX_SKILL_LEVEL = 10
 MIN_CONTRACT_RENEWAL = 0
 MAX_CONTRACT_RENEWAL = 60  # شهور
 
+# المدى المعلن لكل عمود رقمي (يحدد النوع المضغوط) - Declared range per numeric column (picks the compact dtype)
+NUMERIC_VALUE_RANGES = {
+    "Age": (MIN_AGE, MAX_AGE),
+    "Years_Since_Contract_Start": (MIN_YEARS_EXPERIENCE, MAX_YEARS_EXPERIENCE),
+    "Salary_Total": (MIN_SALARY, MAX_SALARY),
+    "Basic_Salary": (MIN_SALARY, MAX_SALARY),
+    "Allowances": (MIN_SALARY, MAX_SALARY),
+    "Insurance_Salary": (MIN_SALARY, MAX_SALARY),
+    "Remaining_Contract_Renewal": (MIN_CONTRACT_RENEWAL, MAX_CONTRACT_RENEWAL),
+    "Car_Ride_Time": (MIN_CAR_RIDE_TIME, MAX_CAR_RIDE_TIME),
+    "Skill_level_measurement_certificate": (MIN_SKILL_LEVEL, MAX_SKILL_LEVEL),
+    "Training_Hours": (MIN_TRAINING_HOURS, MAX_TRAINING_HOURS),
+    "Performance_Score": (MIN_PERFORMANCE, MAX_PERFORMANCE),
+    "Awards": (MIN_AWARDS, MAX_AWARDS),
+}
+
 # أنواع الموظفين - Employee Types
 VALID_EMP_TYPES = [
     "دائم", "مؤقت", "متعاقد", "موسمي", "تدريب",
@@ -233,6 +416,11 @@ SQL_SERVER_TIMEOUT = int(os.getenv("SQL_SERVER_TIMEOUT", "60"))
 
 # جدول الموظفين الافتراضي - Default Employee Table
 DEFAULT_EMPLOYEE_TABLE = os.getenv("DEFAULT_EMPLOYEE_TABLE", "Employees")
+# جداول المصدر المسموحة في /predict/from-database - Allowed source tables for /predict/from-database
+BULK_SCORING_SOURCE_TABLES = [
+    name.strip() for name in os.getenv("BULK_SCORING_SOURCE_TABLES", DEFAULT_EMPLOYEE_TABLE).split(",")
+    if name.strip()
+]
 
 # استعلام SQL الافتراضي - Default SQL Query
 DEFAULT_SQL_QUERY = f"SELECT * FROM {DEFAULT_EMPLOYEE_TABLE}"
@@ -6,31 +6,55 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from loguru import logger
-from typing import Tuple, List, Optional
+from typing import Any, Dict, Iterable, Tuple, List, Optional, Union
 import joblib
 import json
+import re
 from pathlib import Path
 
 from app.config import (
     NUMERICAL_COLS, CATEGORICAL_COLS, TARGET_COL,
     TEST_SIZE, RANDOM_STATE, FEATURE_COLS,
     VALID_GENDERS, DEFAULT_TRAINING_HOURS,
-    DEFAULT_PERFORMANCE_SCORE, DEFAULT_AWARDS
+    DEFAULT_PERFORMANCE_SCORE, DEFAULT_AWARDS, HGB_MAX_BINS,
+    ONEHOT_MIN_FREQUENCY, ONEHOT_MAX_CATEGORIES, ID_COL, INCREMENTAL_WATERMARK_COL,
+    NUMERIC_VALUE_RANGES, DTYPE_COMPACTION_ENABLED, DB_COLUMNS
+)
+from app.file_format import (
+    FileFormat, DELIMITED_EXTENSIONS, JSON_EXTENSIONS, FALLBACK_ENCODING, detect_file_format
+)
+from app.readers import (
+    EXCEL_EXTENSIONS, read_csv, read_excel, projection, select_columns, arrow_schema_names
 )
 
 
-def read_data_file(file_path: Path, file_extension: str = None) -> pd.DataFrame:
+def read_data_file(
+    file_path: Path,
+    file_extension: str = None,
+    file_format: Optional[FileFormat] = None,
+    columns: Optional[List[str]] = None,
+    sheet_name: Union[int, str] = 0
+) -> pd.DataFrame:
     """
     قراءة ملف بيانات من أي صيغة مدعومة - Read data file from any supported format
 
+    الملفات النصية تُحلل مرة واحدة بالترميز والفاصل وشكل JSON المكتشفة من عينة،
+    بمحرك pyarrow لـ CSV وcalamine لـ Excel عند توفرهما
+    Text files are parsed once with the encoding, delimiter and JSON layout
+    sniffed from a sample, using pyarrow for CSV and calamine for Excel when available
+
     Args:
         file_path: مسار الملف - File path
         file_extension: امتداد الملف (اختياري) - File extension (optional)
+        file_format: إعدادات مكتشفة مسبقاً؛ تُحدّث بالمحرك وبالترميز البديل
+            - Previously detected settings; updated with the engine and any encoding fallback
+        columns: الأعمدة المطلوبة (انظر readers.projection) - Wanted columns (see readers.projection)
+        sheet_name: ورقة Excel (رقم أو اسم) - Excel sheet (index or name)
 
     Returns:
         البيانات كـ DataFrame - Data as DataFrame
@@ -45,108 +69,51 @@ def read_data_file(file_path: Path, file_extension: str = None) -> pd.DataFrame:
     logger.info(f"قراءة ملف بصيغة: {file_extension}")
 
     try:
-        # CSV files
-        if file_extension == '.csv':
-            # Try different encodings
-            for encoding in ['utf-8', 'utf-8-sig', 'latin1', 'cp1252', 'iso-8859-1']:
-                try:
-                    df = pd.read_csv(file_path, encoding=encoding)
-                    logger.info(f"تم قراءة CSV بنجاح باستخدام ترميز: {encoding}")
-                    return df
-                except UnicodeDecodeError:
-                    continue
-            raise ValueError("فشل في قراءة ملف CSV بجميع الترميزات المدعومة")
-
-        # TSV files
-        elif file_extension == '.tsv':
-            for encoding in ['utf-8', 'utf-8-sig', 'latin1', 'cp1252']:
-                try:
-                    df = pd.read_csv(file_path, sep='\t', encoding=encoding)
-                    logger.info(f"تم قراءة TSV بنجاح باستخدام ترميز: {encoding}")
-                    return df
-                except UnicodeDecodeError:
-                    continue
-            raise ValueError("فشل في قراءة ملف TSV بجميع الترميزات المدعومة")
-
-        # Excel files (.xlsx, .xlsm)
-        elif file_extension in ['.xlsx', '.xlsm']:
-            df = pd.read_excel(file_path, engine='openpyxl')
-            logger.info(f"تم قراءة ملف Excel ({file_extension}) بنجاح")
-            return df
+        if file_format is None:
+            file_format = detect_file_format(file_path, file_extension)
 
-        # Old Excel files (.xls)
-        elif file_extension == '.xls':
-            try:
-                df = pd.read_excel(file_path, engine='xlrd')
-                logger.info("تم قراءة ملف .xls بنجاح باستخدام xlrd")
-                return df
-            except Exception:
-                # Fallback to openpyxl
-                df = pd.read_excel(file_path, engine='openpyxl')
-                logger.info("تم قراءة ملف .xls بنجاح باستخدام openpyxl")
-                return df
+        # CSV/TSV/TXT وJSON بإعدادات مكتشفة - CSV/TSV/TXT and JSON with sniffed settings
+        if file_extension in DELIMITED_EXTENSIONS + JSON_EXTENSIONS:
+            def read() -> pd.DataFrame:
+                if file_extension in DELIMITED_EXTENSIONS:
+                    return read_csv(file_path, file_format, columns)
+                return select_columns(pd.read_json(file_path, **file_format.json_kwargs()), columns)
 
-        # Binary Excel files (.xlsb)
-        elif file_extension == '.xlsb':
             try:
-                import pyxlsb
-                df = pd.read_excel(file_path, engine='pyxlsb')
-                logger.info("تم قراءة ملف .xlsb بنجاح")
-                return df
-            except ImportError:
-                raise ValueError("مكتبة pyxlsb غير مثبتة. يرجى تثبيتها لقراءة ملفات .xlsb")
-
-        # JSON files
-        elif file_extension == '.json':
-            # Try different orientations
-            for orient in ['records', 'index', 'columns', 'values']:
-                try:
-                    df = pd.read_json(file_path, orient=orient)
-                    logger.info(f"تم قراءة JSON بنجاح باستخدام orientation: {orient}")
-                    return df
-                except:
-                    continue
-            # If all fail, try without orient
-            df = pd.read_json(file_path)
-            logger.info("تم قراءة JSON بنجاح")
+                df = read()
+            except UnicodeDecodeError:
+                # بايتات غير صالحة بعد العينة - Invalid bytes past the sniffed sample
+                logger.warning(f"الترميز {file_format.encoding} لا يغطي كل الملف، إعادة القراءة بـ {FALLBACK_ENCODING}")
+                file_format.use_fallback_encoding()
+                df = read()
+            logger.info(f"تم قراءة {file_extension} بنجاح - Read with {file_format.to_dict()}")
+            return df
+
+        # Excel files (.xlsx, .xlsm, .xls, .xlsb)
+        if file_extension in EXCEL_EXTENSIONS:
+            df = read_excel(file_path, file_format, columns, sheet_name)
+            logger.info(f"تم قراءة ملف Excel ({file_extension}) بنجاح باستخدام {file_format.engine}")
             return df
 
         # Parquet files
         elif file_extension == '.parquet':
+            keep = projection(arrow_schema_names(file_path, file_extension), columns)
             try:
-                df = pd.read_parquet(file_path, engine='pyarrow')
+                df = pd.read_parquet(file_path, engine='pyarrow', columns=keep)
                 logger.info("تم قراءة ملف Parquet بنجاح باستخدام pyarrow")
                 return df
             except:
-                df = pd.read_parquet(file_path, engine='fastparquet')
+                df = pd.read_parquet(file_path, engine='fastparquet', columns=keep)
                 logger.info("تم قراءة ملف Parquet بنجاح باستخدام fastparquet")
                 return df
 
         # Feather files
         elif file_extension == '.feather':
-            df = pd.read_feather(file_path)
+            keep = projection(arrow_schema_names(file_path, file_extension), columns)
+            df = pd.read_feather(file_path, columns=keep)
             logger.info("تم قراءة ملف Feather بنجاح")
             return df
 
-        # Text files (try as CSV)
-        elif file_extension == '.txt':
-            # Try as CSV first
-            try:
-                df = pd.read_csv(file_path, encoding='utf-8')
-                logger.info("تم قراءة ملف TXT كـ CSV بنجاح")
-                return df
-            except:
-                # Try with tab separator
-                try:
-                    df = pd.read_csv(file_path, sep='\t', encoding='utf-8')
-                    logger.info("تم قراءة ملف TXT كـ TSV بنجاح")
-                    return df
-                except:
-                    # Try with any whitespace
-                    df = pd.read_csv(file_path, sep=r'\s+', encoding='utf-8')
-                    logger.info("تم قراءة ملف TXT بنجاح")
-                    return df
-
         else:
             raise ValueError(f"صيغة الملف غير مدعومة: {file_extension}")
 
@@ -210,12 +177,158 @@ def prepare_employee_data(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def clean_df(df: pd.DataFrame) -> pd.DataFrame:
+def _column_key(name: Any) -> str:
+    """مفتاح مقارنة أسماء الأعمدة - Comparison key for column names"""
+    return re.sub(r"[^0-9a-z]+", "_", str(name).strip().lower()).strip("_")
+
+
+# الأسماء المعتمدة بمفتاح المقارنة - Canonical names by comparison key
+_CANONICAL_COLUMNS = {
+    _column_key(name): name for name in DB_COLUMNS + FEATURE_COLS + [TARGET_COL]
+}
+
+
+def harmonize_columns(columns: Iterable[Any]) -> Dict[Any, str]:
+    """
+    مطابقة أعمدة ملف مع DB_COLUMNS و FEATURE_COLS - Match a file's columns to DB_COLUMNS and FEATURE_COLS
+
+    المطابقة لا تتأثر بحالة الأحرف أو المسافات أو الفواصل ("dept name" -> Dept_Name)؛
+    أول عمود يطابق اسماً معتمداً هو المستخدم
+    Matching ignores case, spaces and separators ("dept name" -> Dept_Name);
+    the first column matching a canonical name wins
+
+    Args:
+        columns: أعمدة الملف - File columns
+
+    Returns:
+        قاموس الاسم الأصلي -> الاسم المعتمد للأعمدة المطابقة فقط
+        - Original name -> canonical name, for matched columns only
+    """
+    mapping = {}
+    for column in columns:
+        canonical = _CANONICAL_COLUMNS.get(_column_key(column))
+        if canonical is not None and canonical not in mapping.values():
+            mapping[column] = canonical
+    return mapping
+
+
+# جداول التنظيف تُبنى مرة واحدة - Cleaning lookup tables, built once
+# القيم التي تعني "مفقود" بعد التحويل إلى نص - Tokens meaning "missing" once stringified
+_NULL_TOKENS = frozenset(['', 'nan', 'none', 'null', 'None'])
+_GENDER_MAPPING = {
+    'ذكر': 'male', 'انثى': 'female', 'أنثى': 'female',
+    'm': 'male', 'f': 'female', 'ذ': 'male', 'أ': 'female'
+}
+_VALID_GENDERS = frozenset(['male', 'female'])
+# أعمدة لا تقبل قيماً سالبة - Columns where negative values are illogical
+_NON_NEGATIVE_COLS = frozenset([
+    'Age', 'Years_Since_Contract_Start', 'Salary_Total', 'Basic_Salary', 'Allowances',
+    'Insurance_Salary', 'Training_Hours', 'Awards', 'Car_Ride_Time'
+])
+
+
+def _normalize_gender(token: Optional[str]) -> Optional[str]:
+    """توحيد قيمة جنس واحدة - Normalize one gender token (None if invalid)"""
+    if token is None:
+        return None
+    token = token.lower()
+    token = _GENDER_MAPPING.get(token, token)
+    return token if token in _VALID_GENDERS else None
+
+
+def _clean_categoricals(df: pd.DataFrame, columns: List[str]) -> dict:
+    """
+    تنظيف الأعمدة الفئوية في تمريرة واحدة لكل عمود - Normalize categorical columns in one pass per column
+
+    يُرمَّز كل عمود مرة واحدة، ثم يُنظف كل نص فريد مرة واحدة فقط (إزالة المسافات،
+    القيم الفارغة، توحيد الجنس) ويُبنى العمود من الرموز مباشرة. الترميز لكل عمود
+    على حدة لأن 1 و1.0 متساويان عند الترميز: عمود float يبقى '1.0' كما في astype(str).
+    Each column is factorized once; each distinct value is then cleaned a
+    single time (strip, missing tokens, gender mapping) and the column is
+    rebuilt straight from the codes. Columns are factorized separately
+    because 1 and 1.0 factorize as equal: a float column keeps '1.0' as
+    astype(str) gives.
+
+    Args:
+        df: البيانات - Dataframe
+        columns: الأعمدة الفئوية الموجودة - Categorical columns present
+
+    Returns:
+        الأعمدة المنظفة بنوع category - Cleaned columns as category
+    """
+    cleaned = {}
+    for col in columns:
+        series = df[col]
+        codes, uniques = pd.factorize(series)
+        if series.dtype == object and any(not isinstance(value, str) for value in uniques):
+            # أنواع مختلطة (1 و1.0 و"1") تُرمز كنصوص حتى لا تندمج - Mixed types are factorized as text so they stay distinct
+            codes, uniques = pd.factorize(series.astype(str))
+        tokens = [str(value).strip() for value in uniques]
+        tokens = [None if token in _NULL_TOKENS else token for token in tokens]
+
+        if col == 'gender':
+            col_tokens = [_normalize_gender(t) for t in tokens]
+            counts = np.bincount(codes[codes >= 0], minlength=len(tokens))
+            invalid = sum(
+                int(counts[i]) for i in range(len(tokens)) if tokens[i] is not None and col_tokens[i] is None
+            )
+            if invalid:
+                logger.warning(f"تم العثور على {invalid} قيمة جنس غير صالحة")
+            tokens = col_tokens
+
+        categories = sorted(set(tokens) - {None})
+        position = {token: i for i, token in enumerate(categories)}
+        # آخر عنصر -1 يلتقط الرمز -1 للقيم المفقودة الأصلية - Trailing -1 catches the -1 code of original nulls
+        table = np.array([position.get(token, -1) for token in tokens] + [-1], dtype=np.int32)
+        cleaned[col] = pd.Series(
+            pd.Categorical.from_codes(table[codes], categories=categories),
+            index=df.index, name=col
+        )
+    return cleaned
+
+
+def _clean_numericals(df: pd.DataFrame, columns: List[str]) -> dict:
+    """
+    تنظيف الأعمدة الرقمية - Coerce numeric columns and mask illogical negatives
+
+    القيم السالبة تُحجب بعملية where واحدة على كتلة الأعمدة التي لا تقبلها
+    Negatives are masked with one where over the block of non-negative columns
+
+    Args:
+        df: البيانات - Dataframe
+        columns: الأعمدة الرقمية الموجودة - Numerical columns present
+
+    Returns:
+        الأعمدة المنظفة (المتغيرة فقط) - Cleaned columns (only those that changed)
+    """
+    cleaned = {
+        col: pd.to_numeric(df[col], errors='coerce')
+        for col in columns
+        if not pd.api.types.is_numeric_dtype(df[col])
+    }
+    masked = [col for col in columns if col in _NON_NEGATIVE_COLS]
+    if not masked or len(df) == 0:
+        return cleaned
+
+    values = np.column_stack([
+        cleaned.get(col, df[col]).to_numpy(dtype=np.float64, na_value=np.nan) for col in masked
+    ])
+    negative = values < 0
+    if negative.any():
+        values = np.where(negative, np.nan, values)
+        for j in np.flatnonzero(negative.any(axis=0)):
+            cleaned[masked[j]] = pd.Series(values[:, j], index=df.index, name=masked[j])
+    return cleaned
+
+
+def clean_df(df: pd.DataFrame, report_memory: bool = True) -> pd.DataFrame:
     """
     تنظيف البيانات - Clean dataset
 
     Args:
         df: البيانات الأولية - Raw dataframe
+        report_memory: تسجيل الذاكرة قبل وبعد ضغط الأنواع (يمر على كل النصوص)
+            - Log memory before/after dtype compaction (scans every string)
 
     Returns:
         البيانات المنظفة - Cleaned dataframe
@@ -229,42 +342,120 @@ def clean_df(df: pd.DataFrame) -> pd.DataFrame:
     if duplicates_removed > 0:
         logger.info(f"تم إزالة {duplicates_removed} صف مكرر")
 
-    # تنظيف الأعمدة الرقمية - Clean numerical columns
-    for col in NUMERICAL_COLS:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            # إزالة القيم السالبة غير المنطقية - Remove illogical negative values
-            negative_cols = ['Age', 'Years_Since_Contract_Start', 'Salary_Total',
-                           'Basic_Salary', 'Allowances', 'Insurance_Salary',
-                           'Training_Hours', 'Awards', 'Car_Ride_Time']
-            if col in negative_cols:
-                df.loc[df[col] < 0, col] = np.nan
-
-    # تنظيف الأعمدة الفئوية - Clean categorical columns
-    for col in CATEGORICAL_COLS:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
-            # استبدال القيم الفارغة - Replace empty values
-            df[col] = df[col].replace(['', 'nan', 'none', 'null', 'None'], np.nan)
-
-    # توحيد قيم الجنس - Normalize gender values
-    if 'gender' in df.columns:
-        gender_mapping = {
-            'ذكر': 'male', 'انثى': 'female', 'أنثى': 'female',
-            'm': 'male', 'f': 'female', 'ذ': 'male', 'أ': 'female'
-        }
-        df['gender'] = df['gender'].str.lower().replace(gender_mapping)
-        # التحقق من القيم الصالحة
-        valid_genders_normalized = ['male', 'female']
-        invalid_genders = ~df['gender'].isin(valid_genders_normalized + [np.nan])
-        if invalid_genders.any():
-            logger.warning(f"تم العثور على {invalid_genders.sum()} قيمة جنس غير صالحة")
-            df.loc[invalid_genders, 'gender'] = np.nan
+    # الأعمدة المنظفة تُجمع ثم يُبنى الإطار مرة واحدة - Cleaned columns are collected, the frame is built once
+    columns = {col: df[col] for col in df.columns}
+    columns.update(_clean_numericals(df, [c for c in NUMERICAL_COLS if c in df.columns]))
+    categorical = [c for c in CATEGORICAL_COLS if c in df.columns]
+    if categorical:
+        cleaned = _clean_categoricals(df, categorical)
+        if not DTYPE_COMPACTION_ENABLED:
+            cleaned = {col: series.astype(object) for col, series in cleaned.items()}
+        columns.update(cleaned)
+    df = pd.DataFrame(columns, index=df.index, copy=False)
+
+    if DTYPE_COMPACTION_ENABLED:
+        df = compact_dtypes(df, report_memory=report_memory)
 
     logger.info(f"اكتمل تنظيف البيانات. الصفوف النهائية: {len(df)}")
     return df
 
 
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    """
+    حجم البيانات في الذاكرة - In-memory size of a dataframe
+
+    Args:
+        df: البيانات - Dataframe
+
+    Returns:
+        الحجم بالميغابايت (شاملاً النصوص) - Size in MB, strings included
+    """
+    return float(df.memory_usage(deep=True).sum()) / (1024 * 1024)
+
+
+def compact_numeric(series: pd.Series, low: float, high: float) -> pd.Series:
+    """
+    ضغط عمود رقمي حسب مداه المعلن - Downcast a numeric column using its declared range
+
+    القيم الصحيحة بلا مفقودات تأخذ أصغر نوع صحيح يسع المدى المعلن (والقيم الفعلية
+    إن تجاوزته)، فيبقى النوع ثابتاً بين الأجزاء؛ غير ذلك يبقى float64 حتى لا تفقد
+    الكسور دقتها (34.2 لا تصبح 34.20000076).
+    Whole values without gaps get the smallest integer type covering the
+    declared range (widened by the actual values if they exceed it), so the
+    dtype stays stable across chunks; anything else stays float64 so fractions
+    keep their precision (34.2 does not come back as 34.20000076).
+
+    Args:
+        series: العمود - Column
+        low: الحد الأدنى المعلن - Declared minimum
+        high: الحد الأعلى المعلن - Declared maximum
+
+    Returns:
+        العمود المضغوط - Compacted column
+    """
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if len(values) and not np.isnan(values).any() and np.array_equal(values, np.floor(values)):
+        low, high = min(low, values.min()), max(high, values.max())
+        for dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return series.astype(dtype)
+    return series.astype(np.float64)
+
+
+def compact_dtypes(df: pd.DataFrame, category_ratio: float = 0.5, report_memory: bool = True) -> pd.DataFrame:
+    """
+    ضغط أنواع البيانات - Compact dtypes to cut memory
+
+    الأعمدة الفئوية category، الأعمدة الرقمية حسب NUMERIC_VALUE_RANGES، والأعمدة
+    الإضافية (سحب SQL Server العريض): الأعداد الصحيحة بأصغر نوع، والنصوص المتكررة
+    category. الأعمدة العشرية الإضافية والمعرف وعمود العلامة لا تتغير قيمها.
+    Categoricals become category and numeric features follow
+    NUMERIC_VALUE_RANGES. Extra columns (wide SQL Server pulls): integers are
+    downcast and repetitive text becomes category. Extra float columns, the id
+    and the watermark column keep their values as is.
+
+    Args:
+        df: البيانات المنظفة - Cleaned dataframe
+        category_ratio: أقصى نسبة قيم فريدة لتحويل نص إضافي إلى category
+            - Max unique/rows ratio for turning extra text columns into category
+        report_memory: تسجيل الذاكرة قبل وبعد - Log memory before and after
+
+    Returns:
+        البيانات المضغوطة - Compacted dataframe
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORICAL_COLS:
+            columns[col] = series.astype("category")
+        elif col in NUMERIC_VALUE_RANGES:
+            columns[col] = compact_numeric(series, *NUMERIC_VALUE_RANGES[col])
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            columns[col] = pd.to_numeric(series, downcast="integer")
+        elif (
+            series.dtype == object
+            and col not in (ID_COL, INCREMENTAL_WATERMARK_COL)
+            and len(series)
+            and series.nunique(dropna=True) <= len(series) * category_ratio
+            and pd.api.types.infer_dtype(series, skipna=True) == "string"
+        ):
+            columns[col] = series.astype("category")
+        else:
+            columns[col] = series
+    compacted = pd.DataFrame(columns, index=df.index, copy=False)
+
+    if report_memory:
+        before, after = frame_memory_mb(df), frame_memory_mb(compacted)
+        logger.info(
+            f"ضغط أنواع البيانات - Dtype compaction: {before:.1f} MB -> {after:.1f} MB "
+            f"({before / max(after, 1e-9):.1f}x)"
+        )
+    return compacted
+
+
 def create_promotion_target(df: pd.DataFrame) -> pd.DataFrame:
     """
     إنشاء عمود الهدف (promotion_eligible) بناءً على معايير محددة
@@ -335,6 +526,30 @@ def validate_dataframe(df: pd.DataFrame, require_target: bool = True) -> Tuple[b
         df: البيانات - Dataframe
         require_target: هل يتطلب عمود الهدف - Whether target column is required
 
+    Returns:
+        (صالح، قائمة الأخطاء) - (is_valid, list of errors)
+    """
+    return validate_columns(list(df.columns), len(df), df.isna().sum().to_dict(), require_target)
+
+
+def validate_columns(
+    columns: List[str],
+    n_rows: int,
+    missing_counts: Dict[str, int],
+    require_target: bool = True
+) -> Tuple[bool, List[str]]:
+    """
+    التحقق من صحة البيانات من إحصاءاتها - Validate data from its column stats
+
+    يسمح بالتحقق من ملف مقروء على أجزاء دون تحميله كاملاً
+    Lets a file read in chunks be validated without loading it whole
+
+    Args:
+        columns: أسماء الأعمدة - Column names
+        n_rows: عدد الصفوف - Row count
+        missing_counts: عدد القيم المفقودة لكل عمود - Missing values per column
+        require_target: هل يتطلب عمود الهدف - Whether target column is required
+
     Returns:
         (صالح، قائمة الأخطاء) - (is_valid, list of errors)
     """
@@ -345,17 +560,18 @@ def validate_dataframe(df: pd.DataFrame, require_target: bool = True) -> Tuple[b
     if require_target:
         required_cols = required_cols + [TARGET_COL]
 
-    missing_cols = [col for col in required_cols if col not in df.columns]
+    missing_cols = [col for col in required_cols if col not in columns]
     if missing_cols:
         errors.append(f"الأعمدة المفقودة: {', '.join(missing_cols)}")
 
     # التحقق من عدم وجود صفوف - Check for empty dataframe
-    if len(df) == 0:
+    if n_rows == 0:
         errors.append("البيانات فارغة")
+        return False, errors
 
     # التحقق من نسبة القيم المفقودة - Check missing values ratio
-    for col in df.columns:
-        missing_ratio = df[col].isna().sum() / len(df)
+    for col in columns:
+        missing_ratio = missing_counts.get(col, 0) / n_rows
         if missing_ratio > 0.5:
             errors.append(f"العمود '{col}' يحتوي على أكثر من 50% قيم مفقودة")
 
@@ -363,13 +579,44 @@ def validate_dataframe(df: pd.DataFrame, require_target: bool = True) -> Tuple[b
     return is_valid, errors
 
 
-def build_preprocessor() -> ColumnTransformer:
+def build_preprocessor(native_categorical: bool = False, sparse_onehot: bool = False) -> ColumnTransformer:
     """
     بناء معالج البيانات - Build data preprocessor
 
+    Args:
+        native_categorical: للمصنفات التي تدعم الفئات أصلياً (HistGradientBoosting):
+            الأعمدة الرقمية كما هي (القيم المفقودة تُعالج داخل المصنف) والفئوية
+            بترميز ترتيبي بدلاً من الترميز الأحادي.
+            For classifiers with native categorical support
+            (HistGradientBoosting): numeric columns pass through (the
+            classifier handles missing values) and categoricals are
+            ordinal-encoded instead of one-hot expanded.
+        sparse_onehot: مخرجات CSR متناثرة مع دمج المستويات النادرة
+            (ONEHOT_MIN_FREQUENCY / ONEHOT_MAX_CATEGORIES)؛ الفئات غير المعروفة
+            تذهب إلى عمود المستويات النادرة إن وُجد.
+            CSR sparse output with rare levels grouped
+            (ONEHOT_MIN_FREQUENCY / ONEHOT_MAX_CATEGORIES); unknown
+            categories go to the infrequent column when there is one.
+
     Returns:
         معالج البيانات - Data preprocessor
     """
+    if native_categorical:
+        # عمود واحد لكل ميزة فئوية؛ الفئات غير المعروفة والمفقودة تصبح NaN
+        # One column per categorical feature; unknown and missing become NaN
+        return ColumnTransformer(
+            transformers=[
+                ("num", "passthrough", NUMERICAL_COLS),
+                ("cat", OrdinalEncoder(
+                    handle_unknown="use_encoded_value",
+                    unknown_value=np.nan,
+                    encoded_missing_value=np.nan,
+                    max_categories=HGB_MAX_BINS
+                ), CATEGORICAL_COLS)
+            ],
+            remainder='drop'
+        )
+
     # معالج الأعمدة الرقمية - Numerical pipeline
     num_pipe = Pipeline(steps=[
         ("imputer", SimpleImputer(strategy="median")),
@@ -377,18 +624,30 @@ def build_preprocessor() -> ColumnTransformer:
     ])
 
     # معالج الأعمدة الفئوية - Categorical pipeline
+    if sparse_onehot:
+        onehot = OneHotEncoder(
+            handle_unknown="infrequent_if_exist",
+            min_frequency=ONEHOT_MIN_FREQUENCY or None,
+            max_categories=ONEHOT_MAX_CATEGORIES or None,
+            sparse_output=True
+        )
+    else:
+        onehot = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
     cat_pipe = Pipeline(steps=[
         ("imputer", SimpleImputer(strategy="most_frequent")),
-        ("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
+        ("onehot", onehot)
     ])
 
     # دمج المعالجات - Combine preprocessors
+    # sparse_threshold=1 يبقي الناتج CSR دائماً بدلاً من تحويله إلى مصفوفة كثيفة
+    # sparse_threshold=1 always keeps the stacked output CSR instead of densifying it
     prep = ColumnTransformer(
         transformers=[
             ("num", num_pipe, NUMERICAL_COLS),
             ("cat", cat_pipe, CATEGORICAL_COLS)
         ],
-        remainder='drop'
+        remainder='drop',
+        sparse_threshold=1.0 if sparse_onehot else 0.3
     )
 
     return prep
@@ -411,7 +670,7 @@ def split_data(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series,
         raise ValueError(f"عمود الهدف '{TARGET_COL}' غير موجود في البيانات")
 
     # استخراج المتغيرات والهدف - Extract features and target
-    X = df[FEATURE_COLS + CATEGORICAL_COLS].copy()
+    X = df[FEATURE_COLS].copy()
     y = df[TARGET_COL].copy()
 
     # التحقق من وجود فئات كافية - Check for sufficient classes
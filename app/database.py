@@ -7,8 +7,9 @@ import pyodbc
 import pymssql
 import pandas as pd
 from sqlalchemy import create_engine, text
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from loguru import logger
+import re
 import urllib.parse
 
 from app.config import (
@@ -24,6 +25,29 @@ from app.config import (
 )
 
 
+# معامل مسمى بصيغة SQLAlchemy (:name) - A SQLAlchemy-style named parameter (:name)
+_NAMED_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+
+
+def _dbapi_query(query: str, params: Dict[str, Any], style: str) -> Tuple[str, Any]:
+    """
+    تحويل المعاملات المسماة لصيغة مكتبة DBAPI - Convert named parameters to a DBAPI paramstyle
+
+    Args:
+        query: استعلام بمعاملات :name - Query with :name parameters
+        params: قيم المعاملات - Parameter values
+        style: qmark (pyodbc) أو pyformat (pymssql) - qmark (pyodbc) or pyformat (pymssql)
+
+    Returns:
+        الاستعلام والمعاملات بالصيغة المطلوبة - Query and parameters in that paramstyle
+    """
+    if style == "qmark":
+        names = _NAMED_PARAM.findall(query)
+        return _NAMED_PARAM.sub("?", query), [params[name] for name in names]
+    # % حرفية في pyformat تُضاعف - A literal % is doubled under pyformat
+    return _NAMED_PARAM.sub(r"%(\1)s", query.replace("%", "%%")), params
+
+
 class DatabaseConnection:
     """مدير الاتصال بقاعدة البيانات - Database Connection Manager"""
 
@@ -50,6 +74,23 @@ class DatabaseConnection:
         self.connection = None
         self.engine = None
     
+    def connection_settings(self) -> Dict[str, Any]:
+        """
+        إعدادات الاتصال لتمريرها إلى عملية أخرى - Connection settings for a worker process
+
+        Returns:
+            إعدادات الاتصال - Connection settings
+        """
+        return {
+            "host": self.host,
+            "port": self.port,
+            "database": self.database,
+            "username": self.username,
+            "password": self.password,
+            "driver": self.driver,
+            "timeout": self.timeout
+        }
+
     def test_connection(self) -> Dict[str, Any]:
         """
         اختبار الاتصال بقاعدة البيانات - Test database connection
@@ -439,7 +480,9 @@ class DatabaseConnection:
                     f"PWD={self.password};"
                 )
                 connection_string = f"mssql+pyodbc:///?odbc_connect={params}"
-                self.engine = create_engine(connection_string, echo=False)
+                # fast_executemany يرسل الإدخالات الجماعية كمصفوفة معاملات واحدة
+                # fast_executemany sends bulk inserts as a single parameter array
+                self.engine = create_engine(connection_string, echo=False, fast_executemany=True)
                 logger.info("تم إنشاء محرك SQLAlchemy (pyodbc)")
             
             except Exception as e:
@@ -460,12 +503,13 @@ class DatabaseConnection:
         
         return self.engine
     
-    def execute_query(self, query: str) -> pd.DataFrame:
+    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
         """
         تنفيذ استعلام SQL وإرجاع النتائج - Execute SQL query and return results
         
         Args:
             query: استعلام SQL - SQL query
+            params: قيم المعاملات المسماة (:name) المربوطة بالاستعلام - Values bound to :name parameters (optional)
         
         Returns:
             نتائج الاستعلام - Query results as DataFrame
@@ -473,7 +517,7 @@ class DatabaseConnection:
         try:
             # محاولة استخدام SQLAlchemy
             engine = self.get_sqlalchemy_engine()
-            df = pd.read_sql(query, engine)
+            df = pd.read_sql(text(query), engine, params=params) if params else pd.read_sql(query, engine)
             logger.info(f"تم تنفيذ الاستعلام بنجاح: {len(df)} صف")
             return df
         
@@ -483,7 +527,8 @@ class DatabaseConnection:
             # محاولة استخدام pyodbc مباشرة
             try:
                 conn = self.get_pyodbc_connection()
-                df = pd.read_sql(query, conn)
+                sql, args = _dbapi_query(query, params, "qmark") if params else (query, None)
+                df = pd.read_sql(sql, conn, params=args)
                 conn.close()
                 logger.info(f"تم تنفيذ الاستعلام بنجاح (pyodbc): {len(df)} صف")
                 return df
@@ -494,7 +539,8 @@ class DatabaseConnection:
                 # محاولة استخدام pymssql كبديل أخير
                 try:
                     conn = self.get_pymssql_connection()
-                    df = pd.read_sql(query, conn)
+                    sql, args = _dbapi_query(query, params, "pyformat") if params else (query, None)
+                    df = pd.read_sql(sql, conn, params=args)
                     conn.close()
                     logger.info(f"تم تنفيذ الاستعلام بنجاح (pymssql): {len(df)} صف")
                     return df
@@ -507,7 +553,9 @@ class DatabaseConnection:
         self,
         table_name: Optional[str] = None,
         query: Optional[str] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        watermark_column: Optional[str] = None,
+        since: Any = None
     ) -> pd.DataFrame:
         """
         تحميل بيانات الموظفين من قاعدة البيانات - Load employee data from database
@@ -516,9 +564,14 @@ class DatabaseConnection:
             table_name: اسم الجدول - Table name (optional)
             query: استعلام SQL مخصص - Custom SQL query (optional)
             limit: حد عدد الصفوف - Row limit (optional)
+            watermark_column: عمود العلامة للتحميل التزايدي - High-water mark column (optional)
+            since: تحميل الصفوف بعد هذه القيمة فقط - Only load rows past this value (optional)
         
         Returns:
             بيانات الموظفين - Employee data as DataFrame
+
+        Raises:
+            ValueError: إذا كان اسم عمود العلامة غير صالح - If the watermark column name is invalid
         """
         if query:
             # استخدام الاستعلام المخصص
@@ -530,13 +583,24 @@ class DatabaseConnection:
             # استخدام الجدول الافتراضي
             final_query = DEFAULT_SQL_QUERY
         
+        if watermark_column:
+            if not re.fullmatch(r"\w+", watermark_column):
+                raise ValueError(f"اسم عمود غير صالح: {watermark_column} - Invalid column name")
+            # الصفوف الجديدة فقط بعد العلامة، والحد يأخذ الأقدم أولاً حتى لا تُتخطى صفوف
+            # Only rows past the mark; a limit takes the oldest first so none are skipped
+            where = f" WHERE [{watermark_column}] > :since" if since is not None else ""
+            top = f"TOP {int(limit)} " if limit else ""
+            final_query = (
+                f"SELECT {top}* FROM ({final_query}) AS subquery{where} "
+                f"ORDER BY [{watermark_column}]"
+            )
         # إضافة حد للصفوف إذا تم تحديده
-        if limit:
+        elif limit:
             final_query = f"SELECT TOP {limit} * FROM ({final_query}) AS subquery"
         
         logger.info(f"تحميل بيانات الموظفين: {final_query[:100]}...")
         
-        df = self.execute_query(final_query)
+        df = self.execute_query(final_query, {"since": since} if watermark_column and since is not None else None)
         
         logger.info(f"تم تحميل {len(df)} موظف، {len(df.columns)} عمود")
         
@@ -611,3 +675,31 @@ class DatabaseConnection:
 # إنشاء نسخة عامة - Create global instance
 db = DatabaseConnection()
 
+
+def get_db() -> DatabaseConnection:
+    """
+    الاتصال المشترك الحالي - Current shared connection
+
+    يُستدعى عند كل طلب بدلاً من استيراد db حتى تصل الإعدادات المحفوظة لاحقاً
+    Called per request instead of importing db, so settings saved later take effect
+
+    Returns:
+        الاتصال - Connection manager
+    """
+    return db
+
+
+def reset_db(**settings: Any) -> DatabaseConnection:
+    """
+    استبدال الاتصال المشترك بإعدادات جديدة - Replace the shared connection with new settings
+
+    Args:
+        settings: معاملات DatabaseConnection - DatabaseConnection arguments
+
+    Returns:
+        الاتصال الجديد - New connection manager
+    """
+    global db
+    db = DatabaseConnection(**settings)
+    return db
+
@@ -0,0 +1,360 @@
+"""
+مخزن البيانات المنظفة - Cleaned Dataset Store
+البيانات المنظفة تُحفظ بصيغة Feather (Arrow IPC غير مضغوط) بأنواع صريحة، وتُقرأ
+بإسقاط الأعمدة والربط بالذاكرة بدلاً من إعادة تحليل CSV في كل تدريب
+The cleaned dataset is stored as Feather (uncompressed Arrow IPC) with
+explicit dtypes and read back with column projection and memory mapping
+instead of re-parsing a CSV on every training run
+"""
+
+import os
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+from loguru import logger
+
+from app.config import (
+    CLEANED_DATASET_PATH, CLEANED_DATASET_CSV_PATH,
+    NUMERICAL_COLS, CATEGORICAL_COLS, TARGET_COL, NUMERIC_VALUE_RANGES, ID_COL, INCREMENTAL_WATERMARK_COL
+)
+from app.data_utils import compact_numeric
+
+
+def storage_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    الأنواع الصريحة للتخزين - Explicit storage dtypes
+
+    الأعمدة الفئوية category، الرقمية حسب مداها المعلن (أعداد صحيحة صغيرة أو float64)،
+    الهدف int16؛ الأعمدة النصية الأخرى ذات الأنواع المختلطة تُحول إلى نص حتى يقبلها Arrow.
+    Categoricals become category, numerics follow their declared range
+    (small integers or float64) and the target int16; other object columns
+    holding mixed types become strings so Arrow accepts them.
+
+    Args:
+        df: البيانات المنظفة - Cleaned data
+
+    Returns:
+        البيانات بالأنواع الصريحة - Data with explicit dtypes
+    """
+    df = df.reset_index(drop=True)
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORICAL_COLS:
+            columns[col] = series.astype("category")
+        elif col in NUMERICAL_COLS:
+            low, high = NUMERIC_VALUE_RANGES.get(col, (0, 0))
+            columns[col] = compact_numeric(pd.to_numeric(series, errors="coerce"), low, high)
+        elif col == TARGET_COL and series.notna().all():
+            columns[col] = series.astype(np.int16)
+        elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=True).startswith("mixed"):
+            columns[col] = series.where(series.isna(), series.astype(str))
+        else:
+            columns[col] = series
+    return pd.DataFrame(columns)
+
+
+def save_cleaned_dataset(df: pd.DataFrame, path: Path = CLEANED_DATASET_PATH) -> Path:
+    """
+    حفظ البيانات المنظفة بشكل ذري - Atomically save the cleaned dataset
+
+    Args:
+        df: البيانات المنظفة - Cleaned data
+        path: مسار الحفظ - Target path
+
+    Returns:
+        مسار الملف - File path
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    # بدون ضغط حتى يمكن ربط الملف بالذاكرة مباشرة - Uncompressed so the file can be memory-mapped as is
+    feather.write_feather(storage_dtypes(df), tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    logger.info(f"تم حفظ البيانات المنظفة: {path} ({path.stat().st_size / 1024:.1f} KB)")
+    return path
+
+
+def cleaned_dataset_path() -> Optional[Path]:
+    """
+    مسار البيانات المنظفة الحالي - Current cleaned dataset path
+
+    Returns:
+        ملف Feather، أو ملف CSV القديم إن لم يوجد، أو None - Feather file, the legacy CSV otherwise, or None
+    """
+    for path in (CLEANED_DATASET_PATH, CLEANED_DATASET_CSV_PATH):
+        if path.exists():
+            return path
+    return None
+
+
+def load_cleaned_dataset(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    قراءة البيانات المنظفة - Read the cleaned dataset
+
+    Args:
+        path: مسار الملف (Feather أو CSV قديم) - File path (Feather, or a legacy CSV)
+        columns: الأعمدة المطلوبة؛ الموجود منها فقط يُقرأ - Wanted columns; only those present are read
+
+    Returns:
+        البيانات - Data
+    """
+    if path.suffix == ".csv":
+        if columns is None:
+            return pd.read_csv(path, encoding="utf-8")
+        wanted = set(columns)
+        return pd.read_csv(path, encoding="utf-8", usecols=lambda c: c in wanted)
+
+    if columns is not None:
+        available = set(_schema_names(path))
+        columns = [c for c in columns if c in available]
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def _schema_names(path: Path) -> List[str]:
+    """أسماء الأعمدة دون قراءة البيانات - Column names without reading the data"""
+    with pa.memory_map(str(path)) as source:
+        return ipc.open_file(source).schema.names
+
+
+def iter_csv_chunks(path: Path, chunk_rows: int = 50000) -> Iterator[bytes]:
+    """
+    تصدير البيانات المنظفة كـ CSV على أجزاء - Export the cleaned dataset as CSV in chunks
+
+    Args:
+        path: مسار البيانات المنظفة - Cleaned dataset path
+        chunk_rows: عدد الصفوف في كل جزء - Rows per chunk
+
+    Yields:
+        أجزاء CSV بترميز UTF-8 - UTF-8 CSV chunks
+    """
+    if path.suffix == ".csv":
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                yield block
+        return
+
+    df = load_cleaned_dataset(path)
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=(start == 0)).encode("utf-8")
+
+
+# أقصى عدد قيم فريدة يُتتبع لعمود نصي إضافي قبل اعتباره نصاً حراً
+# Distinct values tracked for an extra text column before it is treated as free text
+_MAX_TRACKED_LEVELS = 65536
+# أقصى نسبة قيم فريدة لتخزين نص إضافي كـ category (كما في compact_dtypes)
+# Max unique/rows ratio for storing extra text as category (as in compact_dtypes)
+_CATEGORY_RATIO = 0.5
+
+
+@dataclass
+class _ColumnStats:
+    """إحصاءات عمود تحدد نوعه النهائي - Running stats that decide a column's final type"""
+    nulls: int = 0
+    whole: bool = True
+    low: float = np.inf
+    high: float = -np.inf
+    int_source: bool = True
+    levels: Optional[Set[str]] = field(default_factory=set)
+
+
+def _smallest_int(low: float, high: float) -> pa.DataType:
+    """أصغر نوع صحيح يسع المدى - Smallest signed integer type covering the range"""
+    for dtype, arrow_type in ((np.int8, pa.int8()), (np.int16, pa.int16()), (np.int32, pa.int32())):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return arrow_type
+    return pa.int64()
+
+
+class CleanedDatasetWriter:
+    """
+    كتابة البيانات المنظفة جزءاً بجزء - Incremental cleaned dataset writer
+
+    الأجزاء تُكتب إلى ملف Arrow مؤقت بأنواع واسعة ثابتة (float64 / نص)، مع تتبع
+    مدى كل عمود؛ عند الإنهاء تُحوّل دفعة بدفعة إلى الأنواع نفسها التي ينتجها
+    save_cleaned_dataset، فلا يُحمّل الملف كاملاً في الذاكرة.
+    Chunks go to a staging Arrow stream with fixed wide types (float64 /
+    string) while each column's range is tracked; finalize() converts batch
+    by batch to the same dtypes save_cleaned_dataset produces, so the
+    dataset is never held in memory at once.
+    """
+
+    def __init__(self, path: Path = CLEANED_DATASET_PATH):
+        self.path = path
+        self.rows = 0
+        self.schema: Optional[pa.Schema] = None
+        # اسم فريد لكل كاتب حتى لا يتداخل رفعان متزامنان - Unique per writer so concurrent uploads don't collide
+        token = uuid.uuid4().hex[:8]
+        self._staging_path = path.with_name(f"{path.name}.{token}.staging")
+        self._tmp_path = path.with_name(f"{path.name}.{token}.tmp")
+        self._writer: Optional[ipc.RecordBatchStreamWriter] = None
+        self._staging_schema: Optional[pa.Schema] = None
+        self._kinds: Dict[str, str] = {}
+        self._stats: Dict[str, _ColumnStats] = {}
+
+    def append(self, df: pd.DataFrame) -> None:
+        """
+        إضافة جزء منظف - Append a cleaned chunk
+
+        Args:
+            df: جزء من البيانات المنظفة - Cleaned chunk
+        """
+        if self._writer is None:
+            self._start(df)
+        arrays = [self._coerce(df, col, kind) for col, kind in self._kinds.items()]
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self._staging_schema))
+        self.rows += len(df)
+
+    def finalize(self) -> Path:
+        """
+        تحويل الملف المؤقت إلى Feather نهائي بشكل ذري - Convert the staging file into the final Feather atomically
+
+        Returns:
+            مسار الملف - File path
+        """
+        self._writer.close()
+        self._writer = None
+
+        fields, dictionaries = [], {}
+        for col, kind in self._kinds.items():
+            arrow_type = self._final_type(col, kind)
+            if pa.types.is_dictionary(arrow_type):
+                dictionaries[col] = pa.array(sorted(self._stats[col].levels), type=pa.string())
+            fields.append(pa.field(col, arrow_type))
+        self.schema = pa.schema(fields)
+
+        with pa.memory_map(str(self._staging_path)) as source, \
+                ipc.new_file(str(self._tmp_path), self.schema) as writer:
+            for batch in ipc.open_stream(source):
+                arrays = []
+                for col, target in zip(self.schema.names, self.schema.types):
+                    array = batch.column(col)
+                    if col in dictionaries:
+                        # نفس القاموس لكل الدفعات كما يتطلب ملف IPC - Same dictionary in every batch, as the IPC file format requires
+                        indices = pc.index_in(array, value_set=dictionaries[col])
+                        array = pa.DictionaryArray.from_arrays(indices, dictionaries[col])
+                    elif array.type != target:
+                        array = pc.cast(array, target, safe=False)
+                    arrays.append(array)
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+        os.replace(self._tmp_path, self.path)
+        self._staging_path.unlink(missing_ok=True)
+        logger.info(f"تم حفظ البيانات المنظفة: {self.path} ({self.rows} صف، {self.path.stat().st_size / 1024:.1f} KB)")
+        return self.path
+
+    def abort(self) -> None:
+        """حذف الملفات المؤقتة - Discard the staging files"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._staging_path.unlink(missing_ok=True)
+        self._tmp_path.unlink(missing_ok=True)
+
+    def dtypes(self) -> Dict[str, str]:
+        """
+        أنواع pandas للملف النهائي - pandas dtypes of the final file
+
+        Returns:
+            نوع كل عمود - Dtype per column
+        """
+        return self.schema.empty_table().to_pandas().dtypes.astype(str).to_dict()
+
+    def _start(self, df: pd.DataFrame) -> None:
+        """تحديد نوع كل عمود من الجزء الأول - Fix each column's kind from the first chunk"""
+        fields = []
+        for col in df.columns:
+            series = df[col]
+            if col in CATEGORICAL_COLS:
+                kind, arrow_type = "text", pa.string()
+            elif col in NUMERICAL_COLS or col == TARGET_COL or (
+                pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype)
+            ):
+                kind, arrow_type = "number", pa.float64()
+            elif pd.api.types.is_datetime64_any_dtype(series):
+                kind, arrow_type = "datetime", pa.array(series.head(0)).type
+            else:
+                kind, arrow_type = "text", pa.string()
+            self._kinds[col] = kind
+            self._stats[col] = _ColumnStats()
+            fields.append(pa.field(col, arrow_type))
+        self._staging_schema = pa.schema(fields)
+        self._writer = ipc.new_stream(str(self._staging_path), self._staging_schema)
+
+    def _coerce(self, df: pd.DataFrame, col: str, kind: str) -> pa.Array:
+        """تحويل عمود إلى نوعه المرحلي وتحديث إحصاءاته - Coerce a column to its staging type and update its stats"""
+        if col not in df.columns:
+            series = pd.Series(np.nan, index=df.index)
+        else:
+            series = df[col]
+        stats = self._stats[col]
+
+        if kind == "number":
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype(object)
+            stats.int_source &= pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series)
+            values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(values)
+            present = values[~missing]
+            stats.nulls += int(missing.sum())
+            if present.size:
+                stats.low = min(stats.low, float(present.min()))
+                stats.high = max(stats.high, float(present.max()))
+                stats.whole = stats.whole and bool(np.array_equal(present, np.floor(present)))
+            return pa.array(values, type=pa.float64(), from_pandas=True)
+
+        if kind == "datetime":
+            return pa.array(pd.to_datetime(series, errors="coerce"), type=self._staging_schema.field(col).type)
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # الفئات فقط تُحوّل إلى نص، لا كل صف - Only the categories are stringified, not every row
+            if not pd.api.types.is_string_dtype(series.cat.categories):
+                series = series.cat.rename_categories(str)
+            levels = series.cat.categories
+            array = pc.cast(pa.array(series), pa.string())
+        else:
+            series = series.astype(object)
+            series = series.where(series.isna(), series.astype(str))
+            levels = series.dropna().unique()
+            array = pa.array(series, type=pa.string(), from_pandas=True)
+
+        if stats.levels is not None:
+            stats.levels.update(levels)
+            if col not in CATEGORICAL_COLS and len(stats.levels) > _MAX_TRACKED_LEVELS:
+                stats.levels = None
+        return array
+
+    def _final_type(self, col: str, kind: str) -> pa.DataType:
+        """النوع النهائي لعمود (نفس قواعد storage_dtypes و compact_dtypes) - Final type, same rules as storage_dtypes/compact_dtypes"""
+        stats = self._stats[col]
+        staged = self._staging_schema.field(col).type
+        if kind == "text":
+            if col in CATEGORICAL_COLS or (
+                stats.levels is not None
+                and col not in (ID_COL, INCREMENTAL_WATERMARK_COL)
+                and len(stats.levels) <= self.rows * _CATEGORY_RATIO
+            ):
+                return pa.dictionary(pa.int32(), pa.string())
+            return staged
+        if kind != "number":
+            return staged
+
+        gapless_whole = stats.nulls == 0 and stats.whole and self.rows > 0
+        if col in NUMERICAL_COLS:
+            low, high = NUMERIC_VALUE_RANGES.get(col, (0, 0))
+            if gapless_whole:
+                return _smallest_int(min(low, stats.low), max(high, stats.high))
+            return pa.float64()
+        if col == TARGET_COL:
+            return pa.int16() if stats.nulls == 0 else staged
+        if gapless_whole and stats.int_source:
+            return _smallest_int(stats.low, stats.high)
+        return staged
@@ -0,0 +1,246 @@
+"""
+منفذات المهام الثقيلة - Executors for CPU-Bound Work
+يوفر مجمع خيوط محدود للاستدلال ومجمع عمليات للتدريب مع ضغط عكسي ومقاييس الاستخدام
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+from app.config import (
+    INFERENCE_MAX_WORKERS, INFERENCE_MAX_QUEUE,
+    TRAINING_MAX_WORKERS, TRAINING_MAX_QUEUE,
+    INGESTION_MAX_WORKERS, INGESTION_MAX_QUEUE,
+    SCORING_MAX_WORKERS, SCORING_MAX_QUEUE
+)
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """المنفذ ممتلئ - Executor has no free slot (maps to HTTP 503)"""
+
+
+def _timed_call(fn: Callable, *args, **kwargs):
+    """تنفيذ دالة مع قياس الزمن داخل العامل - Run fn and return (result, busy seconds)"""
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    except BaseException as e:
+        # يبقى الزمن مع الاستثناء عبر حدود العملية - Survives pickling across processes
+        e.busy_seconds = time.perf_counter() - start
+        raise
+    return result, time.perf_counter() - start
+
+
+class BoundedExecutor:
+    """منفذ محدود السعة - Executor with admission control and utilization metrics"""
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Executor],
+        max_workers: int,
+        max_queue: int
+    ):
+        """
+        تهيئة المنفذ - Initialize executor
+
+        Args:
+            name: اسم المجمع - Pool name
+            factory: دالة إنشاء المجمع - Pool factory (created lazily)
+            max_workers: عدد العمال - Number of workers
+            max_queue: أقصى عدد مهام منتظرة - Max tasks waiting for a worker
+        """
+        self.name = name
+        self.max_workers = max(int(max_workers), 1)
+        self.max_queue = max(int(max_queue), 0)
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        # المقاييس - Metrics
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+        self._started_at = time.monotonic()
+
+    @property
+    def capacity(self) -> int:
+        """السعة الكلية (عمال + طابور) - Total slots (workers + queue)"""
+        return self.max_workers + self.max_queue
+
+    def _get_executor(self) -> Executor:
+        """إنشاء المجمع عند أول استخدام - Create the pool on first use"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._factory()
+                    logger.info(f"تم إنشاء مجمع '{self.name}' بعدد {self.max_workers} عامل")
+        return self._executor
+
+    def _acquire(self) -> None:
+        """حجز مكان أو الرفض - Reserve a slot or reject"""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise ExecutorSaturatedError(
+                    f"المجمع '{self.name}' ممتلئ ({self._in_flight}/{self.capacity})"
+                )
+            self._in_flight += 1
+            self._submitted += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def _release(self, busy_seconds: float, failed: bool) -> None:
+        """تحرير المكان وتحديث المقاييس - Free the slot and update metrics"""
+        with self._lock:
+            self._in_flight -= 1
+            self._busy_seconds += busy_seconds
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        تشغيل دالة في المجمع دون حجب حلقة الأحداث - Run fn in the pool without blocking the loop
+
+        Args:
+            fn: الدالة (يجب أن تكون قابلة للتسلسل لمجمع العمليات) - Callable (picklable for process pools)
+
+        Returns:
+            نتيجة الدالة - Function result
+
+        Raises:
+            ExecutorSaturatedError: إذا امتلأ المجمع - If the pool is saturated
+        """
+        self._acquire()
+        try:
+            future = self._get_executor().submit(_timed_call, fn, *args, **kwargs)
+        except BaseException:
+            self._release(0.0, failed=True)
+            raise
+
+        def _on_done(done) -> None:
+            # يُستدعى عند انتهاء العامل فعلياً حتى لو أُلغي الطلب
+            # Fires when the worker is really done, even if the request was cancelled
+            if done.cancelled():
+                self._release(0.0, failed=True)
+            elif done.exception() is not None:
+                self._release(getattr(done.exception(), "busy_seconds", 0.0), failed=True)
+            else:
+                self._release(done.result()[1], failed=False)
+
+        future.add_done_callback(_on_done)
+        result, _ = await asyncio.wrap_future(future)
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        مقاييس المجمع - Pool metrics
+
+        Returns:
+            الاستخدام والطابور والعدادات - Utilization, queue and counters
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self._started_at, 1e-9)
+            in_flight = self._in_flight
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": min(in_flight, self.max_workers),
+                "queued": max(in_flight - self.max_workers, 0),
+                "peak_in_flight": self._peak_in_flight,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "busy_seconds": round(self._busy_seconds, 3),
+                # نسبة زمن انشغال العمال منذ بدء التشغيل - Worker busy fraction since start
+                "utilization": round(self._busy_seconds / (elapsed * self.max_workers), 4),
+                "saturation": round(in_flight / self.capacity, 4)
+            }
+
+    def shutdown(self) -> None:
+        """إيقاف المجمع - Shut the pool down"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# مجمع خيوط للاستدلال (sklearn يحرر الـ GIL أثناء المرور على الأشجار)
+# Thread pool for inference (sklearn releases the GIL while walking trees)
+inference_executor = BoundedExecutor(
+    "inference",
+    lambda: ThreadPoolExecutor(max_workers=INFERENCE_MAX_WORKERS, thread_name_prefix="inference"),
+    max_workers=INFERENCE_MAX_WORKERS,
+    max_queue=INFERENCE_MAX_QUEUE
+)
+
+# مجمع عمليات للتدريب لعزل استهلاك المعالج عن خدمة الطلبات
+# Process pool for training so it cannot starve request serving
+# spawn بدلاً من fork لأن العملية الأم تحتوي على خيوط
+# spawn rather than fork because the parent process runs threads
+training_executor = BoundedExecutor(
+    "training",
+    lambda: ProcessPoolExecutor(
+        max_workers=TRAINING_MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    ),
+    max_workers=TRAINING_MAX_WORKERS,
+    max_queue=TRAINING_MAX_QUEUE
+)
+
+# مجمع عمليات لقراءة الملفات والأوراق بالتوازي (تحليل CSV/Excel مقيد بالـ GIL)
+# Process pool parsing files and sheets in parallel (CSV/Excel parsing holds the GIL)
+ingestion_executor = BoundedExecutor(
+    "ingestion",
+    lambda: ProcessPoolExecutor(
+        max_workers=INGESTION_MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    ),
+    max_workers=INGESTION_MAX_WORKERS,
+    max_queue=INGESTION_MAX_QUEUE
+)
+
+# مجمع عمليات للتقييم الجماعي من قاعدة البيانات حتى لا يحجز مكان التدريب
+# Process pool for bulk database scoring so it never holds the training slot
+scoring_executor = BoundedExecutor(
+    "scoring",
+    lambda: ProcessPoolExecutor(
+        max_workers=SCORING_MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    ),
+    max_workers=SCORING_MAX_WORKERS,
+    max_queue=SCORING_MAX_QUEUE
+)
+
+
+def executors_metrics() -> Dict[str, Any]:
+    """
+    مقاييس جميع المجمعات - Metrics for all pools
+
+    Returns:
+        مقاييس كل مجمع - Per-pool metrics
+    """
+    return {
+        inference_executor.name: inference_executor.metrics(),
+        training_executor.name: training_executor.metrics(),
+        ingestion_executor.name: ingestion_executor.metrics(),
+        scoring_executor.name: scoring_executor.metrics()
+    }
+
+
+def shutdown_executors() -> None:
+    """إيقاف جميع المجمعات - Shut down all pools"""
+    inference_executor.shutdown()
+    training_executor.shutdown()
+    ingestion_executor.shutdown()
+    scoring_executor.shutdown()
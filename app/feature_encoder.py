@@ -0,0 +1,341 @@
+"""
+مُرمّز الميزات المُجمّع - Compiled Feature Encoder
+يستخرج قيم التعويض والتطبيع وفهارس الترميز الأحادي والترتيبي من المعالج المدرب
+ويكتب سجلات JSON مباشرة في مصفوفة NumPy دون بناء DataFrame
+"""
+
+import warnings
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sklearn.ensemble import (
+    RandomForestClassifier, ExtraTreesClassifier, GradientBoostingClassifier
+)
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import (
+    FunctionTransformer, OneHotEncoder, OrdinalEncoder, StandardScaler
+)
+
+# فئة غير معروفة تُتجاهل (أصفار) - Unknown category is ignored (all zeros)
+_IGNORE = -1
+# فئة غير معروفة ترفع خطأ كما في sklearn - Unknown category raises like sklearn
+_RAISE = -2
+
+# مصنفات تحوّل المدخلات إلى float32 داخلياً - Classifiers that cast inputs to float32 themselves
+_FLOAT32_CLASSIFIERS = (RandomForestClassifier, ExtraTreesClassifier, GradientBoostingClassifier)
+
+
+def _is_nan(value: Any) -> bool:
+    """هل القيمة NaN (None ليست مفقودة في الأعمدة النصية) - NaN check matching SimpleImputer"""
+    return isinstance(value, float) and value != value
+
+
+def _is_identity(step: Any) -> bool:
+    """خطوة لا تغير القيم - Step that leaves values unchanged
+
+    ColumnTransformer المدرب يستبدل "passthrough" بـ FunctionTransformer بلا دالة
+    A fitted ColumnTransformer replaces "passthrough" with a func-less FunctionTransformer
+    """
+    if step is None or (isinstance(step, str) and step == "passthrough"):
+        return True
+    return isinstance(step, FunctionTransformer) and step.func is None
+
+
+def _split_steps(transformer: Any) -> List[Any]:
+    """خطوات المحول كقائمة - Transformer steps as a flat list"""
+    if isinstance(transformer, Pipeline):
+        return [step for _, step in transformer.steps if not _is_identity(step)]
+    return [] if _is_identity(transformer) else [transformer]
+
+
+def _check_imputer(imputer: SimpleImputer) -> np.ndarray:
+    """التحقق من المُعوِّض وإرجاع قيمه - Validate an imputer and return its fill values"""
+    if not _is_nan(imputer.missing_values):
+        raise ValueError("المُعوِّض يجب أن يستخدم NaN كقيمة مفقودة")
+    if getattr(imputer, "add_indicator", False):
+        raise ValueError("أعمدة مؤشر القيم المفقودة غير مدعومة")
+    return imputer.statistics_
+
+
+class _NumericBlock:
+    """كتلة رقمية: تعويض ثم تطبيع - Numeric block: impute then scale"""
+
+    def __init__(self, columns: List[str], offset: int, steps: List[Any]):
+        self.columns = columns
+        self.offset = offset
+        self.width = len(columns)
+        self.fill: Optional[np.ndarray] = None
+        self.mean: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+        scaled = False
+        for step in steps:
+            if isinstance(step, SimpleImputer) and self.fill is None and not scaled:
+                fill = np.asarray(_check_imputer(step), dtype=np.float64)
+                # sklearn يحذف الأعمدة الفارغة تماماً - sklearn drops all-missing columns
+                if np.isnan(fill).any():
+                    raise ValueError("أعمدة بدون قيمة تعويض غير مدعومة")
+                self.fill = fill
+            elif isinstance(step, StandardScaler) and not scaled:
+                self.mean = step.mean_ if step.with_mean else None
+                self.scale = step.scale_ if step.with_std else None
+                scaled = True
+            else:
+                raise ValueError(f"خطوة رقمية غير مدعومة: {type(step).__name__}")
+
+    def encode(self, records: Sequence[Dict[str, Any]], out: np.ndarray) -> None:
+        """كتابة الكتلة في المصفوفة - Write the block into the output matrix"""
+        values = np.array([[record[c] for c in self.columns] for record in records], dtype=np.float64)
+        if self.fill is not None:
+            missing = np.isnan(values)
+            if missing.any():
+                values[missing] = np.broadcast_to(self.fill, values.shape)[missing]
+        # نفس ترتيب العمليات في StandardScaler.transform للتطابق التام
+        # Same operation order as StandardScaler.transform for bit-identical output
+        if self.mean is not None:
+            values -= self.mean
+        if self.scale is not None:
+            values /= self.scale
+        out[:, self.offset:self.offset + self.width] = values
+
+
+class _OneHotBlock:
+    """كتلة فئوية: تعويض ثم ترميز أحادي - Categorical block: impute then one-hot"""
+
+    def __init__(self, columns: List[str], offset: int, steps: List[Any]):
+        self.columns = columns
+        self.offset = offset
+        self.fill: Optional[np.ndarray] = None
+
+        encoder = steps[-1]
+        if not isinstance(encoder, OneHotEncoder):
+            raise ValueError(f"خطوة فئوية غير مدعومة: {type(encoder).__name__}")
+        for step in steps[:-1]:
+            if isinstance(step, SimpleImputer) and self.fill is None:
+                self.fill = _check_imputer(step)
+            else:
+                raise ValueError(f"خطوة فئوية غير مدعومة: {type(step).__name__}")
+
+        widths = list(encoder._n_features_outs)
+        self.width = sum(widths)
+        self.mappings: List[Dict[Any, int]] = []
+        self.unknown: List[int] = []
+
+        starts = np.concatenate([[0], np.cumsum(widths)[:-1]]).astype(int)
+        baseline = [categories[0] for categories in encoder.categories_]
+        for j, categories in enumerate(encoder.categories_):
+            # ترميز الفئات المعروفة بالمُرمّز نفسه ليشمل الفئات النادرة والمحذوفة
+            # Encode known categories with the fitted encoder itself so
+            # infrequent grouping and dropped levels map exactly as sklearn does
+            self.mappings.append({
+                category: self._locate(encoder, baseline, j, category, starts[j], widths[j])
+                for category in categories.tolist()
+            })
+            self.unknown.append(self._unknown_index(encoder, baseline, j, categories, starts[j], widths[j]))
+
+    def _locate(
+        self, encoder: OneHotEncoder, baseline: List[Any], j: int,
+        category: Any, start: int, width: int
+    ) -> int:
+        """فهرس عمود الإخراج لفئة واحدة - Output column for one category (-1 if dropped)"""
+        row = list(baseline)
+        row[j] = category
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            encoded = encoder.transform(np.array([row], dtype=object))
+        if hasattr(encoded, "toarray"):
+            encoded = encoded.toarray()
+        hits = np.flatnonzero(encoded[0, start:start + width])
+        return self.offset + start + int(hits[0]) if hits.size else _IGNORE
+
+    def _unknown_index(
+        self, encoder: OneHotEncoder, baseline: List[Any], j: int,
+        categories: np.ndarray, start: int, width: int
+    ) -> int:
+        """سلوك الفئة غير المعروفة - Column used for an unseen category"""
+        if encoder.handle_unknown == "error":
+            return _RAISE
+        if categories.dtype.kind in "iuf":
+            sentinel = categories.max() + 1
+        else:
+            sentinel = "\x00unseen\x00"
+        try:
+            return self._locate(encoder, baseline, j, sentinel, start, width)
+        except ValueError:
+            return _RAISE
+
+    def encode(self, records: Sequence[Dict[str, Any]], out: np.ndarray) -> None:
+        """كتابة الكتلة في المصفوفة - Write the block into the output matrix"""
+        n_rows = len(records)
+        out[:, self.offset:self.offset + self.width] = 0.0
+        for j, column in enumerate(self.columns):
+            mapping = self.mappings[j]
+            unknown = self.unknown[j]
+            fill = self.fill[j] if self.fill is not None else None
+            index = np.empty(n_rows, dtype=np.int64)
+            for i, record in enumerate(records):
+                value = record[column]
+                if fill is not None and _is_nan(value):
+                    value = fill
+                index[i] = mapping.get(value, unknown)
+
+            if unknown == _RAISE and (index == _RAISE).any():
+                bad = records[int(np.flatnonzero(index == _RAISE)[0])][column]
+                raise ValueError(f"فئة غير معروفة '{bad}' في العمود {column}")
+            rows = np.flatnonzero(index >= 0)
+            out[rows, index[rows]] = 1.0
+
+
+class _OrdinalBlock:
+    """كتلة فئوية: تعويض ثم ترميز ترتيبي - Categorical block: impute then ordinal codes"""
+
+    def __init__(self, columns: List[str], offset: int, steps: List[Any]):
+        self.columns = columns
+        self.offset = offset
+        self.width = len(columns)
+        self.fill: Optional[np.ndarray] = None
+
+        encoder = steps[-1]
+        for step in steps[:-1]:
+            if isinstance(step, SimpleImputer) and self.fill is None:
+                self.fill = _check_imputer(step)
+            else:
+                raise ValueError(f"خطوة فئوية غير مدعومة: {type(step).__name__}")
+
+        self.mappings: List[Dict[Any, float]] = []
+        self.none_codes: List[Optional[float]] = []
+        self.nan_codes: List[Optional[float]] = []
+        self.unknown: List[Optional[float]] = []
+
+        baseline = [categories[0] for categories in encoder.categories_]
+        for j, categories in enumerate(encoder.categories_):
+            # الرموز من المُرمّز نفسه لتشمل الفئات النادرة والقيم المفقودة
+            # Codes come from the fitted encoder so infrequent and missing values match sklearn
+            self.mappings.append({
+                category: self._code(encoder, baseline, j, category)
+                for category in categories.tolist()
+                if category is not None and not _is_nan(category)
+            })
+            self.none_codes.append(self._code(encoder, baseline, j, None))
+            self.nan_codes.append(self._code(encoder, baseline, j, np.nan))
+            sentinel = categories.max() + 1 if categories.dtype.kind in "iuf" else "\x00unseen\x00"
+            self.unknown.append(self._code(encoder, baseline, j, sentinel))
+
+    @staticmethod
+    def _code(encoder: OrdinalEncoder, baseline: List[Any], j: int, category: Any) -> Optional[float]:
+        """رمز فئة واحدة أو None إذا رفضها المُرمّز - Code for one category, None if the encoder raises"""
+        row = list(baseline)
+        row[j] = category
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                return float(encoder.transform(np.array([row], dtype=object))[0, j])
+        except (ValueError, TypeError):
+            return None
+
+    def encode(self, records: Sequence[Dict[str, Any]], out: np.ndarray) -> None:
+        """كتابة الكتلة في المصفوفة - Write the block into the output matrix"""
+        for j, column in enumerate(self.columns):
+            mapping = self.mappings[j]
+            fill = self.fill[j] if self.fill is not None else None
+            codes = out[:, self.offset + j]
+            for i, record in enumerate(records):
+                value = record[column]
+                if fill is not None and _is_nan(value):
+                    value = fill
+                if value is None:
+                    code = self.none_codes[j]
+                elif _is_nan(value):
+                    code = self.nan_codes[j]
+                else:
+                    code = mapping.get(value, self.unknown[j])
+                if code is None:
+                    raise ValueError(f"فئة غير معروفة '{value}' في العمود {column}")
+                codes[i] = code
+
+
+class FeatureEncoder:
+    """مُرمّز السجلات - Record encoder compiled from a fitted ColumnTransformer"""
+
+    def __init__(self, model: Pipeline):
+        """
+        تجميع المعالج - Compile the fitted preprocessor
+
+        Args:
+            model: خط أنابيب مدرب بخطوتي prep و clf - Fitted pipeline with 'prep' and 'clf' steps
+
+        Raises:
+            ValueError: إذا احتوى المعالج على خطوات غير مدعومة - If prep has unsupported steps
+        """
+        steps = getattr(model, "named_steps", {})
+        prep = steps.get("prep")
+        if prep is None or not hasattr(prep, "transformers_"):
+            raise ValueError("النموذج لا يحتوي على معالج ColumnTransformer مدرب")
+
+        # sklearn يحوّل إلى float32 داخل الأشجار، غير ذلك نحافظ على float64
+        # Tree ensembles cast to float32 internally; keep float64 for anything else
+        clf = steps.get("clf")
+        self.dtype = np.float32 if isinstance(clf, _FLOAT32_CLASSIFIERS) else np.float64
+
+        self.blocks: List[Any] = []
+        offset = 0
+        for name, transformer, columns in prep.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            columns = list(columns)
+            # passthrough: أعمدة رقمية تُنسخ كما هي - Numeric columns copied as-is
+            transformer_steps = _split_steps(transformer)
+            if transformer_steps and isinstance(transformer_steps[-1], OneHotEncoder):
+                block = _OneHotBlock(columns, offset, transformer_steps)
+            elif transformer_steps and isinstance(transformer_steps[-1], OrdinalEncoder):
+                block = _OrdinalBlock(columns, offset, transformer_steps)
+            else:
+                block = _NumericBlock(columns, offset, transformer_steps)
+            self.blocks.append(block)
+            offset += block.width
+
+        self.n_features = offset
+        self.columns = [c for block in self.blocks for c in block.columns]
+
+    def encode_records(self, records: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        ترميز سجلات JSON - Encode JSON records
+
+        يكتب كل كتلة مباشرة في مصفوفة مخصصة مسبقاً، ويطابق
+        prep.transform تماماً بعد التحويل إلى نوع المصنف.
+        Writes every block straight into a preallocated matrix; matches
+        prep.transform exactly once cast to the classifier's dtype.
+
+        Args:
+            records: بيانات الموظفين - Employee records
+
+        Returns:
+            المصفوفة المُرمّزة (n_samples, n_features) - Encoded matrix
+
+        Raises:
+            ValueError: لعمود مفقود أو فئة غير معروفة - Missing column or unknown category
+        """
+        out = np.empty((len(records), self.n_features), dtype=self.dtype)
+        try:
+            for block in self.blocks:
+                block.encode(records, out)
+        except KeyError as e:
+            raise ValueError(f"عمود مفقود في بيانات الإدخال: {e}") from None
+        return out
+
+
+def build_feature_encoder(model: Pipeline) -> Optional[FeatureEncoder]:
+    """
+    بناء المُرمّز إن أمكن - Build an encoder when the preprocessor supports it
+
+    Args:
+        model: النموذج - Model
+
+    Returns:
+        المُرمّز أو None (يُستخدم prep.transform بدلاً منه) - Encoder, or None to fall back to prep.transform
+    """
+    try:
+        return FeatureEncoder(model)
+    except (ValueError, AttributeError, TypeError):
+        return None
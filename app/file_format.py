@@ -0,0 +1,268 @@
+"""
+اكتشاف صيغة الملفات النصية - Text File Format Detection
+يُقرأ أول SNIFF_BYTES من الملف مرة واحدة لتحديد الترميز والفاصل وشكل JSON، ثم
+يُحلل الملف مرة واحدة بهذه الإعدادات بدلاً من تجربة ترميزات واتجاهات متتالية
+The first SNIFF_BYTES of the file are read once to pick the encoding, the
+delimiter and the JSON layout; the file is then parsed once with those
+settings instead of retrying encodings and orientations one by one
+"""
+
+import codecs
+import csv
+import io
+import json
+from collections import Counter
+from dataclasses import asdict, dataclass
+from json.decoder import scanstring
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import NUMERICAL_COLS, CATEGORICAL_COLS, TARGET_COL
+
+# حجم العينة - Sample size
+SNIFF_BYTES = 64 * 1024
+# عدد الصفوف المفحوصة لتحديد الفاصل - Rows inspected for the delimiter
+SNIFF_ROWS = 50
+
+DELIMITED_EXTENSIONS = (".csv", ".tsv", ".txt")
+JSON_EXTENSIONS = (".json", ".ndjson", ".jsonl")
+
+# الترميز الأخير إذا ظهرت بايتات غير صالحة بعد العينة - Last resort when invalid bytes appear past the sample
+FALLBACK_ENCODING = "latin1"
+WHITESPACE_DELIMITER = r"\s+"
+
+# UTF-32 قبل UTF-16 لأن علامة UTF-32-LE تبدأ بعلامة UTF-16-LE
+# UTF-32 before UTF-16: the UTF-32-LE mark starts with the UTF-16-LE one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_DELIMITERS = (",", "\t", ";", "|")
+_DEFAULT_DELIMITERS = {".csv": ",", ".tsv": "\t", ".txt": ","}
+# نسبة الصفوف التي يجب أن تتفق على عدد الأعمدة - Share of rows that must agree on the field count
+_CONSISTENT_SHARE = 0.9
+_KNOWN_COLUMNS = frozenset(NUMERICAL_COLS + CATEGORICAL_COLS + [TARGET_COL])
+
+
+@dataclass
+class FileFormat:
+    """
+    إعدادات القراءة المكتشفة - Detected read settings
+
+    encoding/delimiter/json_layout تبقى None للصيغ الثنائية؛ engine يسجله القارئ
+    encoding/delimiter/json_layout stay None for binary formats; the reader records engine
+    """
+    extension: str
+    encoding: Optional[str] = None
+    delimiter: Optional[str] = None
+    json_layout: Optional[str] = None
+    sample_bytes: int = 0
+    encoding_fallback: bool = False
+    engine: Optional[str] = None
+
+    def csv_kwargs(self) -> Dict[str, Any]:
+        """معاملات pd.read_csv - pd.read_csv arguments"""
+        return {"sep": self.delimiter, "encoding": self.encoding}
+
+    def json_kwargs(self) -> Dict[str, Any]:
+        """معاملات pd.read_json - pd.read_json arguments"""
+        if self.json_layout == "lines":
+            return {"lines": True, "encoding": self.encoding}
+        return {"orient": self.json_layout, "encoding": self.encoding}
+
+    def use_fallback_encoding(self) -> None:
+        """التحويل إلى الترميز الأخير بعد خطأ فك ترميز - Switch to the last-resort encoding after a decode error"""
+        self.encoding = FALLBACK_ENCODING
+        self.encoding_fallback = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """تمثيل للاستجابة - Response representation"""
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+
+def sniff_encoding(sample: bytes, complete: bool = False) -> str:
+    """
+    تحديد الترميز من عينة - Detect the encoding from a sample
+
+    Args:
+        sample: أول بايتات الملف - Leading bytes of the file
+        complete: العينة هي الملف كاملاً - The sample is the whole file
+
+    Returns:
+        اسم الترميز - Encoding name
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        # حرف متعدد البايتات قد يُقطع في آخر العينة - A multi-byte character may be cut at the sample end
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=complete)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    # ملفات Windows القديمة: عربية (cp1256) أو غربية (cp1252)
+    # Legacy Windows exports: Arabic (cp1256) or Western (cp1252)
+    high = [ch for ch in sample.decode("cp1256") if ord(ch) > 0x7F]
+    arabic = sum(1 for ch in high if "\u0600" <= ch <= "\u06ff")
+    if high and arabic * 2 >= len(high):
+        return "cp1256"
+    try:
+        sample.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def sniff_delimiter(text: str, default: str = ",") -> str:
+    """
+    تحديد الفاصل من عينة نصية - Detect the delimiter from a text sample
+
+    الفاصل الصحيح يعطي نفس عدد الأعمدة (أكثر من واحد) في معظم الصفوف؛ الافتراضي
+    يُفضل عند التعادل
+    The right delimiter yields the same field count (above one) on most rows;
+    the extension default wins ties
+
+    Args:
+        text: عينة من أسطر كاملة - Sample of complete lines
+        default: فاصل الامتداد - The extension's delimiter
+
+    Returns:
+        الفاصل، أو WHITESPACE_DELIMITER للأعمدة المفصولة بمسافات
+        - The delimiter, or WHITESPACE_DELIMITER for whitespace-aligned columns
+    """
+    candidates = {}
+    for delimiter in _DELIMITERS:
+        rows = [row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if row][:SNIFF_ROWS]
+        width = _consistent_width(len(row) for row in rows)
+        if width:
+            candidates[delimiter] = width
+
+    if default in candidates:
+        return default
+    if candidates:
+        return max(candidates, key=candidates.get)
+
+    lines = [line for line in text.splitlines() if line.strip()][:SNIFF_ROWS]
+    if _consistent_width(len(line.split()) for line in lines):
+        return WHITESPACE_DELIMITER
+    return default
+
+
+def _consistent_width(widths) -> int:
+    """عدد الأعمدة المشترك أو 0 - The shared field count, or 0"""
+    counts = Counter(widths)
+    if not counts:
+        return 0
+    width, hits = counts.most_common(1)[0]
+    return width if width > 1 and hits >= _CONSISTENT_SHARE * sum(counts.values()) else 0
+
+
+def sniff_json_layout(text: str) -> str:
+    """
+    تحديد شكل JSON من بدايته - Detect the JSON layout from its start
+
+    Args:
+        text: بداية الملف - Start of the file
+
+    Returns:
+        lines أو records أو values أو split أو columns أو index
+        - lines, records, values, split, columns or index
+
+    Raises:
+        ValueError: إذا لم يبدأ النص بمصفوفة أو كائن - If the text is not an array or object
+    """
+    text = text.lstrip()
+    if text.startswith("["):
+        return "values" if text[1:].lstrip().startswith("[") else "records"
+    if not text.startswith("{"):
+        raise ValueError("الملف ليس JSON صالحاً - File is not a JSON array or object")
+
+    # كائن كامل في السطر الأول يليه كائن آخر: JSON Lines
+    # A complete object on the first line followed by another: JSON Lines
+    first, _, rest = text.partition("\n")
+    if rest.lstrip().startswith("{"):
+        try:
+            json.loads(first)
+            return "lines"
+        except ValueError:
+            pass
+
+    key, pos = _first_member(text, 0)
+    if key is None:
+        return "columns"
+    value = text[pos]
+    if value == "[":
+        return "split" if key in ("columns", "index", "data") else "columns"
+    if value != "{":
+        # كائن واحد بقيم مفردة في سطر واحد هو صف واحد - A one-line object of scalars is one row
+        return "lines" if "\n" not in text.strip() else "columns"
+    if key in _KNOWN_COLUMNS:
+        return "columns"
+    inner_key, _ = _first_member(text, pos)
+    return "index" if inner_key in _KNOWN_COLUMNS else "columns"
+
+
+def _first_member(text: str, start: int) -> Tuple[Optional[str], int]:
+    """أول مفتاح في الكائن الذي يبدأ عند start وموضع قيمته - First key of the object at start and where its value begins"""
+    try:
+        pos = _skip_space(text, start + 1)
+        if text[pos] != '"':
+            return None, start
+        key, pos = scanstring(text, pos + 1)
+        pos = _skip_space(text, pos)
+        if text[pos] != ":":
+            return None, start
+        # _skip_space يرفع IndexError إذا انتهت العينة - _skip_space raises IndexError at the sample end
+        return key, _skip_space(text, pos + 1)
+    except (IndexError, ValueError):
+        return None, start
+
+
+def _skip_space(text: str, pos: int) -> int:
+    """تجاوز المسافات - Skip whitespace"""
+    while text[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def detect_file_format(path: Path, file_extension: Optional[str] = None) -> FileFormat:
+    """
+    اكتشاف إعدادات قراءة الملف من عينة واحدة - Detect a file's read settings from one sample
+
+    Args:
+        path: مسار الملف - File path
+        file_extension: الامتداد (اختياري) - Extension (optional)
+
+    Returns:
+        إعدادات القراءة - Read settings
+
+    Raises:
+        ValueError: إذا لم يكن ملف JSON صالحاً - If a JSON file does not start like JSON
+    """
+    file_extension = (file_extension or path.suffix).lower()
+    if file_extension not in DELIMITED_EXTENSIONS + JSON_EXTENSIONS:
+        return FileFormat(extension=file_extension)
+
+    with open(path, "rb") as f:
+        sample = f.read(SNIFF_BYTES)
+        complete = not f.read(1)
+
+    encoding = sniff_encoding(sample, complete)
+    text = sample.decode(encoding, errors="ignore")
+    if not complete:
+        # السطر الأخير قد يكون مقطوعاً - The last line may be cut
+        text = text[:text.rfind("\n") + 1] or text
+
+    file_format = FileFormat(extension=file_extension, encoding=encoding, sample_bytes=len(sample))
+    if file_extension in (".ndjson", ".jsonl"):
+        file_format.json_layout = "lines"
+    elif file_extension == ".json":
+        file_format.json_layout = sniff_json_layout(text)
+    else:
+        file_format.delimiter = sniff_delimiter(text, _DEFAULT_DELIMITERS[file_extension])
+    return file_format
@@ -24,6 +24,8 @@ MESSAGES_AR = {
     "file_format_unsupported": "صيغة الملف غير مدعومة: {format}",
     "dataset_cleaned": "تم تنظيف البيانات بنجاح",
     "rows_processed": "تم معالجة {count} صف",
+    "too_many_files": "عدد الملفات كبير جداً. الحد الأقصى هو {max_files} ملف",
+    "datasets_merged": "تم دمج {count} جزء (ملف أو ورقة) في مجموعة البيانات",
     
     # رسائل التدريب - Training Messages
     "training_started": "بدأ تدريب النموذج...",
@@ -31,12 +33,21 @@ MESSAGES_AR = {
     "model_saved": "تم حفظ النموذج بنجاح",
     "no_dataset": "لا يوجد مجموعة بيانات. يرجى رفع البيانات أولاً عبر /upload/dataset",
     "dataset_empty": "مجموعة البيانات فارغة",
+    "incremental_not_enough_rows": "لا توجد صفوف جديدة كافية منذ آخر تدريب",
+    "tuning_unknown_model": "لا يوجد فضاء بحث لنوع النموذج: {model_type}",
     "training_error": "حدث خطأ أثناء التدريب: {error}",
+    "training_job_submitted": "تم إرسال مهمة التدريب",
+    "training_job_not_found": "مهمة التدريب غير موجودة",
+    "training_job_cancelled": "تم إلغاء مهمة التدريب",
+    "training_job_finished": "مهمة التدريب منتهية ولا يمكن إلغاؤها",
+    "training_job_interrupted": "توقفت مهمة التدريب بسبب إعادة تشغيل الخادم",
     
     # رسائل التنبؤ - Prediction Messages
     "prediction_success": "تم التنبؤ بنجاح",
     "model_not_found": "النموذج غير موجود. يرجى تدريب النموذج أولاً عبر /train",
     "prediction_error": "حدث خطأ أثناء التنبؤ: {error}",
+    "server_busy": "الخادم مشغول حالياً، يرجى المحاولة لاحقاً",
+    "table_not_allowed": "الجدول غير مسموح: {table}",
     "promotion_eligible": "مؤهل للترقية",
     "promotion_not_eligible": "غير مؤهل للترقية",
     "probability": "الاحتمالية",
@@ -162,6 +173,8 @@ MESSAGES_EN = {
     "file_format_unsupported": "Unsupported file format: {format}",
     "dataset_cleaned": "Dataset cleaned successfully",
     "rows_processed": "Processed {count} rows",
+    "too_many_files": "Too many files. Maximum is {max_files} files",
+    "datasets_merged": "Merged {count} parts (files or sheets) into the dataset",
     
     # Training Messages
     "training_started": "Model training started...",
@@ -169,12 +182,21 @@ MESSAGES_EN = {
     "model_saved": "Model saved successfully",
     "no_dataset": "No dataset found. Please upload data first via /upload/dataset",
     "dataset_empty": "Dataset is empty",
+    "incremental_not_enough_rows": "Not enough new rows since the last training run",
+    "tuning_unknown_model": "No search space for model type: {model_type}",
     "training_error": "Error during training: {error}",
+    "training_job_submitted": "Training job submitted",
+    "training_job_not_found": "Training job not found",
+    "training_job_cancelled": "Training job cancelled",
+    "training_job_finished": "Training job has already finished and cannot be cancelled",
+    "training_job_interrupted": "Training job was interrupted by a server restart",
     
     # Prediction Messages
     "prediction_success": "Prediction successful",
     "model_not_found": "Model not found. Please train the model first via /train",
     "prediction_error": "Error during prediction: {error}",
+    "server_busy": "Server is busy, please retry later",
+    "table_not_allowed": "Table is not allowed: {table}",
     "promotion_eligible": "Eligible for promotion",
     "promotion_not_eligible": "Not eligible for promotion",
     "probability": "Probability",
@@ -0,0 +1,245 @@
+"""
+التدريب التزايدي - Incremental Training
+علامة آخر صف مُدرَّب، نسخة بيانات التدريب السابقة، وإضافة أشجار للغابة (warm_start)
+High-water mark, cached previous training set and warm-start tree growth
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from loguru import logger
+from sklearn.pipeline import Pipeline
+
+from app.config import (
+    TRAINING_SNAPSHOT_PATH, MODEL_VERSION_PATH, PROMOTION_MODEL_PATH, ONEHOT_SPARSE,
+    FEATURE_COLS, NUMERICAL_COLS, CATEGORICAL_COLS, TARGET_COL, ID_COL,
+    INCREMENTAL_WATERMARK_COL, INCREMENTAL_TREES, INCREMENTAL_MAX_TREES, INCREMENTAL_WINDOW_ROWS
+)
+from app.data_utils import build_preprocessor
+
+# عمود داخلي يحدد صفوف الاختبار في النسخة المحفوظة - Internal column marking held-out rows in the snapshot
+HOLDOUT_COL = "_holdout"
+
+
+def data_fingerprint() -> str:
+    """
+    بصمة مخطط البيانات - Digest of the training data schema
+
+    تغيّرها يعني أن النسخة المحفوظة لا تصلح ويجب إعادة تحميل الجدول كاملاً
+    A change means the cached rows are unusable and the table must be reloaded
+
+    Returns:
+        بصمة سداسية عشرية - Hex digest
+    """
+    schema = {
+        "numerical": NUMERICAL_COLS,
+        "categorical": CATEGORICAL_COLS,
+        "target": TARGET_COL,
+        "watermark": INCREMENTAL_WATERMARK_COL,
+    }
+    return hashlib.blake2b(json.dumps(schema).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def preprocessing_fingerprint(model_type: str, sparse_onehot: bool = ONEHOT_SPARSE) -> str:
+    """
+    بصمة المعالج ونسخة sklearn - Digest of the preprocessor settings and sklearn version
+
+    تغيّرها يعني أن الأشجار الحالية لا تقبل مخرجات المعالج الجديد ويجب إعادة التدريب
+    A change means existing trees no longer match the preprocessor output and a refit is needed
+
+    Args:
+        model_type: نوع النموذج - Model type
+        sparse_onehot: الترميز الأحادي المتناثر - Sparse one-hot path
+
+    Returns:
+        بصمة سداسية عشرية - Hex digest
+    """
+    prep = build_preprocessor(
+        native_categorical=(model_type == "hist_gradient_boosting"),
+        sparse_onehot=sparse_onehot
+    )
+    params = {
+        name: value for name, value in prep.get_params(deep=True).items()
+        if not hasattr(value, "get_params")
+    }
+    payload = json.dumps(
+        {"sklearn": sklearn.__version__, "params": params},
+        sort_keys=True, default=repr
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def watermark_value(df: pd.DataFrame, column: str = INCREMENTAL_WATERMARK_COL) -> Any:
+    """
+    أعلى قيمة لعمود العلامة بصيغة JSON - Highest watermark value, JSON-safe
+
+    Args:
+        df: البيانات الأولية - Raw data
+        column: عمود العلامة - Watermark column
+
+    Returns:
+        القيمة (رقم أو نص ISO) أو None إذا لم يوجد العمود - Value (number or ISO text), None if absent
+    """
+    if column not in df.columns or df[column].isna().all():
+        return None
+    value = df[column].max()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def read_version_info() -> Dict[str, Any]:
+    """
+    قراءة model_version.json - Read model_version.json
+
+    Returns:
+        معلومات الإصدار أو قاموس فارغ - Version info, empty if missing or unreadable
+    """
+    try:
+        with open(MODEL_VERSION_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_snapshot(df: pd.DataFrame, holdout: pd.Series, version: str, model_type: str) -> None:
+    """
+    حفظ نسخة بيانات التدريب بشكل ذري - Atomically save the training set snapshot
+
+    Args:
+        df: البيانات المنظفة (تُحفظ الميزات والمعرف والعلامة فقط) - Cleaned data (features, id and watermark kept)
+        holdout: صفوف الاختبار - Held-out row mask
+        version: إصدار النموذج المدرب عليها - Model version trained on it
+        model_type: نوع النموذج - Model type
+    """
+    keep = FEATURE_COLS + [c for c in (ID_COL, INCREMENTAL_WATERMARK_COL) if c in df.columns and c not in FEATURE_COLS]
+    data = df[list(dict.fromkeys(keep))].copy()
+    data[HOLDOUT_COL] = holdout.to_numpy(dtype=bool)
+
+    snapshot = {
+        "version": version,
+        "model_type": model_type,
+        "data_fingerprint": data_fingerprint(),
+        "data": data.reset_index(drop=True),
+    }
+    tmp_path = TRAINING_SNAPSHOT_PATH.with_name(TRAINING_SNAPSHOT_PATH.name + ".tmp")
+    joblib.dump(snapshot, tmp_path)
+    os.replace(tmp_path, TRAINING_SNAPSHOT_PATH)
+    logger.info(f"تم حفظ نسخة بيانات التدريب ({len(data)} صف): {TRAINING_SNAPSHOT_PATH}")
+
+
+def load_base(model_type: str) -> Tuple[Optional[Dict[str, Any]], Optional[Pipeline], str]:
+    """
+    تحديد ما يمكن إعادة استخدامه من التدريب السابق - Decide what the previous run can contribute
+
+    Args:
+        model_type: نوع النموذج المطلوب - Requested model type
+
+    Returns:
+        (النسخة المحفوظة أو None، النموذج القابل للتوسيع أو None، السبب)
+        (snapshot or None, warm-startable model or None, reason)
+        بدون نسخة: تحميل كامل. نسخة بدون نموذج: إعادة تدريب من النسخة. كلاهما: إضافة أشجار.
+        No snapshot: full reload. Snapshot only: refit from it. Both: add trees.
+    """
+    info = read_version_info()
+    metadata = info.get("metadata", {})
+    watermark = metadata.get("watermark") or {}
+    if watermark.get("column") != INCREMENTAL_WATERMARK_COL or watermark.get("value") is None:
+        return None, None, "no_watermark"
+    if not TRAINING_SNAPSHOT_PATH.exists():
+        return None, None, "no_snapshot"
+
+    try:
+        snapshot = joblib.load(TRAINING_SNAPSHOT_PATH)
+    except Exception as e:
+        logger.warning(f"تعذر قراءة نسخة بيانات التدريب: {e}")
+        return None, None, "snapshot_unreadable"
+    if snapshot.get("version") != info.get("version"):
+        return None, None, "snapshot_stale"
+    if snapshot.get("data_fingerprint") != data_fingerprint():
+        return None, None, "schema_changed"
+    snapshot["watermark"] = watermark["value"]
+
+    # الأشجار الإضافية لـ RandomForest فقط وبنفس المعالج - Tree growth is RandomForest-only, same preprocessor
+    if model_type != "random_forest" or snapshot.get("model_type") != model_type:
+        return snapshot, None, "model_type_changed"
+    if metadata.get("preprocessing_fingerprint") != preprocessing_fingerprint(model_type):
+        return snapshot, None, "preprocessing_changed"
+
+    try:
+        model = joblib.load(PROMOTION_MODEL_PATH)
+    except Exception as e:
+        logger.warning(f"تعذر تحميل النموذج الحالي: {e}")
+        return snapshot, None, "model_unreadable"
+    if getattr(model, "model_version_", None) != info.get("version"):
+        return snapshot, None, "model_changed"
+    if model.named_steps["clf"].n_estimators + INCREMENTAL_TREES > INCREMENTAL_MAX_TREES:
+        return snapshot, None, "tree_limit"
+    return snapshot, model, "warm_start"
+
+
+def merge_delta(snapshot_data: pd.DataFrame, delta: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    دمج الصفوف الجديدة مع النسخة المحفوظة - Merge new rows into the cached training set
+
+    الموظفون المحدثون (نفس المعرف) يحلون محل نسخهم القديمة، ثم تُطبق النافذة المنزلقة
+    Updated employees (same id) replace their old rows, then the sliding window is applied
+
+    Args:
+        snapshot_data: بيانات النسخة المحفوظة - Cached rows
+        delta: الصفوف الجديدة المنظفة - New cleaned rows
+
+    Returns:
+        (البيانات المدمجة، قناع الصفوف الجديدة) - (merged data, new-row mask)
+    """
+    old = snapshot_data
+    if ID_COL in old.columns and ID_COL in delta.columns:
+        old = old[~old[ID_COL].isin(delta[ID_COL])]
+
+    new = delta.reindex(columns=[c for c in old.columns if c != HOLDOUT_COL])
+    merged = pd.concat([old, new], ignore_index=True)
+    is_new = pd.Series(np.arange(len(merged)) >= len(old), index=merged.index)
+
+    # أحدث الصفوف فقط - Keep only the most recent rows
+    if INCREMENTAL_WINDOW_ROWS and len(merged) > INCREMENTAL_WINDOW_ROWS:
+        merged = merged.tail(INCREMENTAL_WINDOW_ROWS)
+        is_new = is_new.loc[merged.index]
+        merged = merged.reset_index(drop=True)
+        is_new = is_new.reset_index(drop=True)
+
+    logger.info(f"دمج {int(is_new.sum())} صف جديد مع {len(merged) - int(is_new.sum())} صف محفوظ")
+    return merged, is_new
+
+
+def add_trees(model: Pipeline, X: pd.DataFrame, y: pd.Series, n_trees: int = INCREMENTAL_TREES) -> int:
+    """
+    إضافة أشجار مدربة على الصفوف الجديدة - Grow the forest with trees fit on the new rows
+
+    المعالج يبقى كما هو (الفئات الجديدة تُعامل كغير معروفة) والأشجار القديمة لا تتغير
+    The fitted preprocessor is kept (new levels are treated as unknown) and existing trees are untouched
+
+    Args:
+        model: خط أنابيب RandomForest المدرب - Fitted RandomForest pipeline
+        X: ميزات الصفوف الجديدة - New-row features
+        y: أهداف الصفوف الجديدة - New-row targets
+        n_trees: عدد الأشجار المضافة - Trees to add
+
+    Returns:
+        عدد الأشجار الكلي - Total tree count
+    """
+    clf = model.named_steps["clf"]
+    Xt = model.named_steps["prep"].transform(X)
+    clf.set_params(warm_start=True, oob_score=False, n_estimators=clf.n_estimators + n_trees)
+    try:
+        clf.fit(Xt, y)
+    finally:
+        clf.set_params(warm_start=False)
+    return clf.n_estimators
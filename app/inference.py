@@ -0,0 +1,185 @@
+"""
+أدوات الاستدلال - Inference Utilities
+مسار تنبؤ موحد يحسب الاحتمالات مرة واحدة ويشتق التصنيف منها
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from sklearn.pipeline import Pipeline
+
+from app.config import INFERENCE_BACKEND, INFERENCE_BACKENDS, COMPILED_BACKEND_MAX_ROWS
+from app.feature_encoder import FeatureEncoder
+from app.model_registry import model_registry
+from app.prediction_cache import prediction_cache, feature_key
+from app.tree_engine import CompiledForest
+
+
+def predict_with_proba(model: Any, X: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    التنبؤ مع الاحتمالات في تمريرة واحدة - Predict labels and probabilities in one pass
+
+    يستدعي predict_proba مرة واحدة فقط ثم يشتق التصنيف بنفس طريقة
+    predict في sklearn (classes_.take(argmax))، بدلاً من تمرير البيانات
+    عبر المعالج وجميع الأشجار مرتين.
+    Calls predict_proba once and derives labels exactly as sklearn's
+    predict does, instead of running preprocessing and every tree twice.
+
+    Args:
+        model: النموذج أو المصنف - Pipeline or bare classifier
+        X: بيانات الإدخال - Input features
+
+    Returns:
+        (التصنيفات، الاحتمالات) - (labels, probabilities)
+    """
+    proba = model.predict_proba(X)
+    preds = model.classes_.take(np.argmax(proba, axis=1), axis=0)
+    return preds, proba
+
+
+def resolve_backend(backend: Optional[str], n_rows: int) -> str:
+    """
+    تحديد محرك الاستدلال - Resolve the inference backend
+
+    Args:
+        backend: المحرك المطلوب (None للإعداد الافتراضي) - Requested backend (None for config)
+        n_rows: عدد الصفوف - Number of rows
+
+    Returns:
+        sklearn أو compiled - 'sklearn' or 'compiled'
+
+    Raises:
+        ValueError: إذا كان المحرك غير معروف - If backend is unknown
+    """
+    backend = backend or INFERENCE_BACKEND
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"محرك غير معروف: {backend}. المتاح: {', '.join(INFERENCE_BACKENDS)}")
+    if backend == "auto":
+        return "compiled" if n_rows <= COMPILED_BACKEND_MAX_ROWS else "sklearn"
+    return backend
+
+
+def predict_frame(
+    X: pd.DataFrame,
+    backend: Optional[str] = None,
+    entry: Optional[Any] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    التنبؤ بالنموذج الحالي عبر المحرك المختار - Predict with the current model and chosen backend
+
+    Args:
+        X: بيانات الإدخال - Input features
+        backend: sklearn أو compiled أو auto - Backend name
+        entry: نسخة النموذج (الافتراضي: الحالية) - Model snapshot (defaults to the current one)
+
+    Returns:
+        (التصنيفات، الاحتمالات) - (labels, probabilities)
+    """
+    entry = entry or model_registry.snapshot()
+    if resolve_backend(backend, len(X)) == "compiled":
+        compiled = model_registry.get_compiled(entry)
+        if compiled is not None:
+            return compiled.predict_with_proba(X)
+        logger.debug("النموذج الحالي غير قابل للتجميع، استخدام sklearn")
+    return predict_with_proba(entry.model, X)
+
+
+def predict_encoded(
+    model: Pipeline,
+    records: List[Dict[str, Any]],
+    encoder: Optional[FeatureEncoder] = None,
+    compiled: Optional[CompiledForest] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    التنبؤ بسجلات JSON دون بناء DataFrame - Predict JSON records without building a DataFrame
+
+    يرمّز السجلات مباشرة بالمُرمّز المُجمّع ثم يمررها إلى المصنف،
+    ويرجع إلى DataFrame و prep.transform إذا لم يتوفر المُرمّز.
+    Encodes records with the compiled encoder and feeds the classifier
+    directly; falls back to a DataFrame and prep.transform without one.
+
+    Args:
+        model: النموذج - Model
+        records: بيانات الموظفين - Employee records
+        encoder: المُرمّز المُجمّع (اختياري) - Compiled encoder (optional)
+        compiled: المحرك المُجمّع (اختياري) - Compiled forest (optional)
+
+    Returns:
+        (التصنيفات، الاحتمالات) - (labels, probabilities)
+    """
+    if encoder is None:
+        X = pd.DataFrame(records)
+        if compiled is not None:
+            return compiled.predict_with_proba(X)
+        return predict_with_proba(model, X)
+
+    Xt = encoder.encode_records(records)
+    if compiled is not None:
+        return compiled.predict_with_proba(Xt)
+    return predict_with_proba(model.named_steps['clf'], Xt)
+
+
+def _predict_snapshot(
+    entry: Any,
+    records: List[Dict[str, Any]],
+    backend: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """التنبؤ بنسخة محددة من النموذج - Predict records with a given model snapshot"""
+    compiled = None
+    if resolve_backend(backend, len(records)) == "compiled":
+        compiled = model_registry.get_compiled(entry)
+        if compiled is None:
+            logger.debug("النموذج الحالي غير قابل للتجميع، استخدام sklearn")
+    return predict_encoded(entry.model, records, model_registry.get_encoder(entry), compiled)
+
+
+def predict_records(
+    records: List[Dict[str, Any]],
+    backend: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    التنبؤ بسجلات JSON بالنموذج الحالي - Predict JSON records with the current model
+
+    النموذج والمُرمّز والمحرك المُجمّع مأخوذة من نفس النسخة حتى لو تم
+    تبديل النموذج أثناء الطلب. السجلات الموجودة في ذاكرة التنبؤ لا يُعاد
+    تقييمها، ويُقيّم الباقي في دفعة واحدة.
+    Model, encoder and compiled forest all come from one snapshot, even if
+    the model is swapped mid-request. Records found in the prediction cache
+    are not re-scored; the rest are scored as one batch.
+
+    Args:
+        records: بيانات الموظفين - Employee records
+        backend: sklearn أو compiled أو auto - Backend name
+
+    Returns:
+        (التصنيفات، الاحتمالات) - (labels, probabilities)
+    """
+    entry = model_registry.snapshot()
+    if not prediction_cache.enabled or not records:
+        return _predict_snapshot(entry, records, backend)
+
+    keys = [feature_key(record) for record in records]
+    cached = prediction_cache.get_many(entry.version, keys)
+    missing = [i for i, hit in enumerate(cached) if hit is None]
+    if not missing:
+        preds = np.array([hit[0] for hit in cached], dtype=entry.model.classes_.dtype)
+        return preds, np.array([hit[1] for hit in cached], dtype=np.float64)
+
+    if len(missing) == len(records):
+        preds, probas = _predict_snapshot(entry, records, backend)
+    else:
+        miss_preds, miss_probas = _predict_snapshot(entry, [records[i] for i in missing], backend)
+        preds = np.empty(len(records), dtype=miss_preds.dtype)
+        probas = np.empty((len(records), miss_probas.shape[1]), dtype=np.float64)
+        hits = [i for i, hit in enumerate(cached) if hit is not None]
+        preds[hits] = [cached[i][0] for i in hits]
+        probas[hits] = [cached[i][1] for i in hits]
+        preds[missing] = miss_preds
+        probas[missing] = miss_probas
+
+    prediction_cache.put_many(entry.version, [
+        (keys[i], (preds[i].item(), tuple(probas[i].tolist()))) for i in missing
+    ])
+    return preds, probas
@@ -0,0 +1,509 @@
+"""
+استيعاب ملفات البيانات على أجزاء - Chunked Dataset Ingestion
+CSV/TSV/TXT/NDJSON/Parquet/Feather تُقرأ على أجزاء، كل جزء يُنظف ويُضاف إلى مخزن البيانات
+المنظفة، والملخص يُجمع أثناء القراءة؛ الصيغ الأخرى تُقرأ كاملة ثم تمر بنفس المسار
+CSV/TSV/TXT/NDJSON/Parquet/Feather are read in chunks; each chunk is cleaned and
+appended to the cleaned store while the summary is accumulated online. Other
+formats are read whole and then go through the same path.
+
+ingest_file يعمل أيضاً كعامل في مجمع العمليات لكل ملف أو ورقة في الرفع المتعدد،
+ثم merge_parts يدمج الأجزاء المنظفة في المخزن
+ingest_file also runs as a process-pool worker per file or sheet in
+multi-file uploads; merge_parts then merges the cleaned parts into the store
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from loguru import logger
+
+from app.config import (
+    UPLOAD_CHUNK_ROWS, CLEANED_DATASET_PATH, NUMERICAL_COLS, CATEGORICAL_COLS, RANDOM_STATE
+)
+from app.data_utils import clean_df, read_data_file, harmonize_columns
+from app.dataset_store import CleanedDatasetWriter
+from app.file_format import FileFormat, detect_file_format
+from app.readers import EXCEL_EXTENSIONS, excel_sheet_names, iter_csv, projection, select_columns
+
+# الصيغ المقروءة على أجزاء - Formats read in chunks
+STREAMING_EXTENSIONS = (".csv", ".tsv", ".txt", ".ndjson", ".jsonl", ".parquet", ".feather")
+# عينة القيم لكل عمود رقمي لحساب الربيعيات (دقيقة حتى هذا العدد من الصفوف)
+# Per-column reservoir for quartiles (exact up to this many rows)
+SUMMARY_SAMPLE_ROWS = 100_000
+PREVIEW_ROWS = 5
+
+
+def iter_file_chunks(
+    path: Path,
+    file_format: FileFormat,
+    chunk_rows: int = UPLOAD_CHUNK_ROWS,
+    columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    قراءة ملف على أجزاء - Read a file in row chunks
+
+    Args:
+        path: مسار الملف - File path
+        file_format: إعدادات القراءة (الامتداد من STREAMING_EXTENSIONS)
+            - Read settings (extension one of STREAMING_EXTENSIONS)
+        chunk_rows: عدد الصفوف في كل جزء (تقريبي لـ pyarrow) - Rows per chunk (approximate with pyarrow)
+        columns: الأعمدة المطلوبة (انظر readers.projection) - Wanted columns (see readers.projection)
+
+    Yields:
+        أجزاء البيانات الأولية - Raw data chunks
+    """
+    file_extension = file_format.extension
+    if file_extension in (".csv", ".tsv", ".txt"):
+        yield from iter_csv(path, file_format, chunk_rows, columns)
+
+    elif file_extension in (".ndjson", ".jsonl"):
+        with pd.read_json(path, chunksize=chunk_rows, **file_format.json_kwargs()) as reader:
+            for chunk in reader:
+                yield select_columns(chunk, columns)
+
+    elif file_extension == ".parquet":
+        parquet = pq.ParquetFile(path)
+        keep = projection(parquet.schema_arrow.names, columns)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=keep):
+            yield batch.to_pandas()
+
+    elif file_extension == ".feather":
+        with pa.memory_map(str(path)) as source:
+            reader = ipc.open_file(source)
+            keep = projection(reader.schema.names, columns)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if keep is not None:
+                    batch = batch.select(keep)
+                for start in range(0, batch.num_rows, chunk_rows):
+                    yield batch.slice(start, chunk_rows).to_pandas()
+
+    else:
+        raise ValueError(f"صيغة الملف لا تُقرأ على أجزاء: {file_extension}")
+
+
+def _slices(df: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """تقسيم بيانات محملة إلى أجزاء - Split an in-memory frame into chunks"""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+class RowDeduplicator:
+    """
+    إزالة الصفوف المكررة عبر الأجزاء - Drop duplicate rows across chunks
+
+    يُحفظ hash من 8 بايت لكل صف فريد بدلاً من الصفوف نفسها؛ مع key يكون الصف
+    مكرراً إذا تكرر معرفه فقط (أول ظهور يبقى، والصفوف دون معرف تُقارن كاملة)
+    Keeps an 8-byte hash per distinct row instead of the rows themselves; with
+    key a row is a duplicate when its id repeats (the first one is kept, rows
+    without an id are compared whole)
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self._seen = np.empty(0, dtype=np.uint64)
+        self.removed = 0
+
+    def filter(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        الصفوف غير المرئية سابقاً - Rows not seen before
+
+        Args:
+            chunk: جزء من البيانات الأولية - Raw chunk
+
+        Returns:
+            الجزء دون المكررات - Chunk without duplicates
+        """
+        hashes = self._hash(chunk)
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        if self._seen.size:
+            keep &= ~np.isin(hashes, self._seen)
+        self._seen = np.union1d(self._seen, hashes[keep])
+        self.removed += int((~keep).sum())
+        return chunk[keep] if not keep.all() else chunk
+
+    def _hash(self, chunk: pd.DataFrame) -> np.ndarray:
+        """hash كل صف أو معرفه - Hash of each row, or of its id"""
+        # الأجزاء قد تستنتج int أو float لنفس العمود؛ الأرقام تُوحد قبل الحساب
+        # Chunks may infer int or float for the same column, so numbers are unified before hashing
+        frame = pd.DataFrame({
+            col: series.astype(np.float64)
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            else series
+            for col, series in chunk.items()
+        }, copy=False)
+        if self.key not in frame.columns:
+            return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+        ids = frame[self.key]
+        hashes = pd.util.hash_pandas_object(ids, index=False).to_numpy()
+        missing = ids.isna().to_numpy()
+        if missing.any():
+            hashes[missing] = pd.util.hash_pandas_object(frame[missing], index=False).to_numpy()
+        return hashes
+
+
+@dataclass
+class _NumericSummary:
+    """عزوم وعينة عمود رقمي - Running moments and reservoir of a numeric column"""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    low: float = np.inf
+    high: float = -np.inf
+    seen: int = 0
+    sample: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+
+class SummaryAccumulator:
+    """
+    ملخص البيانات يُجمع جزءاً بجزء - Data summary accumulated chunk by chunk
+
+    نفس شكل get_data_summary: العدد والمتوسط والانحراف والحدود دقيقة (دمج Chan)،
+    والربيعيات من عينة خزان بحجم SUMMARY_SAMPLE_ROWS.
+    Same layout as get_data_summary: count, mean, std, min and max are exact
+    (Chan's parallel merge); quartiles come from a reservoir of
+    SUMMARY_SAMPLE_ROWS values.
+    """
+
+    def __init__(self, sample_rows: int = SUMMARY_SAMPLE_ROWS):
+        self.rows = 0
+        self.columns: List[str] = []
+        self.missing: Counter = Counter()
+        self._sample_rows = sample_rows
+        self._numeric: Dict[str, _NumericSummary] = {}
+        self._levels: Dict[str, Counter] = {}
+        self._rng = np.random.default_rng(RANDOM_STATE)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        إضافة جزء منظف - Add a cleaned chunk
+
+        Args:
+            chunk: جزء من البيانات المنظفة - Cleaned chunk
+        """
+        if not self.columns:
+            self.columns = list(chunk.columns)
+        self.rows += len(chunk)
+        self.missing.update(chunk.isna().sum().to_dict())
+
+        for col in NUMERICAL_COLS:
+            if col in chunk.columns:
+                values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                self._add_numeric(self._numeric.setdefault(col, _NumericSummary()), values[~np.isnan(values)])
+
+        for col in CATEGORICAL_COLS:
+            if col in chunk.columns:
+                counts = chunk[col].value_counts()
+                self._levels.setdefault(col, Counter()).update(counts[counts > 0].to_dict())
+
+    def _add_numeric(self, stats: _NumericSummary, values: np.ndarray) -> None:
+        """دمج عزوم الجزء وتحديث العينة - Merge the chunk moments and update the reservoir"""
+        n = values.size
+        if n == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = stats.count + n
+        delta = mean - stats.mean
+        stats.mean += delta * n / total
+        stats.m2 += m2 + delta * delta * stats.count * n / total
+        stats.count = total
+        stats.low = min(stats.low, float(values.min()))
+        stats.high = max(stats.high, float(values.max()))
+
+        # خوارزمية الخزان R متجهة - Vectorized reservoir sampling (Algorithm R)
+        room = self._sample_rows - stats.sample.size
+        if room > 0:
+            stats.sample = np.concatenate([stats.sample, values[:room]])
+            stats.seen += min(room, n)
+            values = values[room:]
+        if values.size:
+            positions = stats.seen + np.arange(1, values.size + 1)
+            accepted = self._rng.random(values.size) < self._sample_rows / positions
+            slots = self._rng.integers(0, self._sample_rows, int(accepted.sum()))
+            stats.sample[slots] = values[accepted]
+            stats.seen += values.size
+
+    def summary(self, dtypes: Dict[str, str]) -> Dict[str, Any]:
+        """
+        الملخص النهائي - Final summary
+
+        Args:
+            dtypes: أنواع الأعمدة المخزنة - Stored column dtypes
+
+        Returns:
+            ملخص بشكل get_data_summary - Summary shaped like get_data_summary
+        """
+        summary = {
+            "total_rows": self.rows,
+            "total_columns": len(self.columns),
+            "columns": self.columns,
+            "missing_values": {col: int(self.missing.get(col, 0)) for col in self.columns},
+            "data_types": dtypes,
+        }
+
+        if self._numeric:
+            numerical_stats = {}
+            for col, stats in self._numeric.items():
+                if stats.count:
+                    q1, q2, q3 = np.quantile(stats.sample, [0.25, 0.5, 0.75])
+                    std = np.sqrt(stats.m2 / (stats.count - 1)) if stats.count > 1 else np.nan
+                    numerical_stats[col] = {
+                        "count": float(stats.count), "mean": stats.mean, "std": float(std),
+                        "min": stats.low, "25%": float(q1), "50%": float(q2), "75%": float(q3), "max": stats.high
+                    }
+                else:
+                    numerical_stats[col] = {"count": 0.0, **{k: np.nan for k in ("mean", "std", "min", "25%", "50%", "75%", "max")}}
+            summary["numerical_stats"] = numerical_stats
+
+        if self._levels:
+            summary["categorical_stats"] = {
+                col: dict(counts.most_common()) for col, counts in self._levels.items()
+            }
+        return summary
+
+
+@dataclass
+class IngestionResult:
+    """نتيجة الاستيعاب - Ingestion result"""
+    rows: int
+    raw_rows: int
+    columns: List[str]
+    missing: Dict[str, int]
+    preview: Optional[pd.DataFrame]
+    summary: Dict[str, Any]
+    duplicates_removed: int
+    chunks: int
+    streamed: bool
+    path: Optional[Path] = None
+    file_format: Optional[FileFormat] = None
+    sheet: Optional[str] = None
+    unmatched_columns: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def list_parts(path: Path, file_extension: str) -> List[Optional[str]]:
+    """
+    أجزاء الملف القابلة للقراءة بالتوازي - A file's independently readable parts
+
+    Args:
+        path: مسار الملف - File path
+        file_extension: امتداد الملف - File extension
+
+    Returns:
+        أسماء أوراق Excel، أو [None] لباقي الصيغ - Excel sheet names, or [None] for other formats
+    """
+    if file_extension in EXCEL_EXTENSIONS:
+        return excel_sheet_names(path, detect_file_format(path, file_extension))
+    return [None]
+
+
+def ingest_file(
+    path: Path,
+    file_extension: str,
+    chunk_rows: int = UPLOAD_CHUNK_ROWS,
+    target: Path = CLEANED_DATASET_PATH,
+    columns: Optional[List[str]] = None,
+    sheet_name: Optional[str] = None,
+    harmonize: bool = False,
+    dedup_key: Optional[str] = None
+) -> IngestionResult:
+    """
+    قراءة ملف وتنظيفه وحفظه في مخزن البيانات المنظفة - Read, clean and store a data file
+
+    الذاكرة المستخدمة مضاعف صغير لحجم الجزء للصيغ المقروءة على أجزاء
+    Peak memory is a small multiple of the chunk size for chunk-read formats
+
+    Args:
+        path: مسار الملف الأولي - Raw file path
+        file_extension: امتداد الملف - File extension
+        chunk_rows: عدد الصفوف في كل جزء - Rows per chunk
+        target: مسار البيانات المنظفة - Cleaned dataset path
+        columns: الأعمدة المطلوبة أو None للكل (انظر readers.projection)
+            - Wanted columns, or None for all (see readers.projection)
+        sheet_name: ورقة Excel (None للأولى) - Excel sheet (None for the first)
+        harmonize: مطابقة الأعمدة مع الأسماء المعتمدة وحذف الباقي (انظر harmonize_columns)
+            - Rename columns to canonical names and drop the rest (see harmonize_columns)
+        dedup_key: عمود المعرف لإزالة التكرار بدلاً من الصف كاملاً (انظر RowDeduplicator)
+            - Id column to deduplicate on instead of whole rows (see RowDeduplicator)
+
+    Returns:
+        نتيجة الاستيعاب؛ path هو None إذا لم توجد صفوف - Ingestion result; path is None when there were no rows
+    """
+    start = time.perf_counter()
+    file_format = detect_file_format(path, file_extension)
+    while True:
+        try:
+            result = _ingest(path, file_format, chunk_rows, target, columns, sheet_name, harmonize, dedup_key)
+            result.sheet = sheet_name
+            result.seconds = time.perf_counter() - start
+            return result
+        except pa.ArrowInvalid as e:
+            if file_format.engine != "pyarrow":
+                raise
+            # قيمة تخالف النوع المستنتج من أول كتلة - A value conflicting with the first block's inferred type
+            logger.warning(f"تعذرت القراءة بـ pyarrow، إعادة الاستيعاب بـ pandas: {e}")
+            file_format.engine = "pandas"
+        except UnicodeDecodeError:
+            if file_format.encoding is None or file_format.encoding_fallback:
+                raise
+            # بايتات غير صالحة بعد العينة - Invalid bytes past the sample
+            logger.warning(f"الترميز {file_format.encoding} لا يغطي كل الملف، إعادة القراءة بترميز بديل")
+            file_format.use_fallback_encoding()
+
+
+def _ingest(
+    path: Path,
+    file_format: FileFormat,
+    chunk_rows: int,
+    target: Path,
+    columns: Optional[List[str]],
+    sheet_name: Optional[str] = None,
+    harmonize: bool = False,
+    dedup_key: Optional[str] = None
+) -> IngestionResult:
+    """مسار الاستيعاب بإعدادات قراءة محددة - Ingestion with fixed read settings"""
+    streamed = file_format.extension in STREAMING_EXTENSIONS
+    if streamed:
+        chunks = iter_file_chunks(path, file_format, chunk_rows, columns)
+    else:
+        frame = read_data_file(path, file_format.extension, file_format, columns, sheet_name or 0)
+        chunks = _slices(frame, chunk_rows)
+
+    unmatched = []
+
+    def prepare(raw: pd.DataFrame) -> pd.DataFrame:
+        if harmonize:
+            mapping = harmonize_columns(raw.columns)
+            if not unmatched:
+                unmatched.extend(str(c) for c in raw.columns if c not in mapping)
+            return raw[list(mapping)].rename(columns=mapping)
+        # JSON بشكل values يعطي أسماء أعمدة رقمية؛ Arrow يتطلب نصوصاً
+        # A values-layout JSON has integer column names; Arrow needs strings
+        raw.columns = raw.columns.map(str)
+        return raw
+
+    result = _store_chunks(chunks, target, prepare, clean=True, dedup_key=dedup_key)
+    result.streamed = streamed
+    result.file_format = file_format
+    result.unmatched_columns = unmatched
+    return result
+
+
+def _store_chunks(
+    chunks: Iterable[pd.DataFrame],
+    target: Path,
+    prepare: Callable[[pd.DataFrame], pd.DataFrame],
+    clean: bool,
+    dedup_key: Optional[str] = None
+) -> IngestionResult:
+    """إزالة التكرار والتنظيف والتلخيص والحفظ لكل جزء - Deduplicate, clean, summarize and store each chunk"""
+    writer = CleanedDatasetWriter(target)
+    deduplicator = RowDeduplicator(dedup_key)
+    accumulator = SummaryAccumulator()
+    preview = None
+    raw_rows = n_chunks = 0
+    try:
+        for raw in chunks:
+            raw_rows += len(raw)
+            n_chunks += 1
+            raw = prepare(raw)
+            if raw.shape[1] == 0:
+                continue
+            chunk = deduplicator.filter(raw)
+            if chunk.empty:
+                continue
+            if clean:
+                chunk = clean_df(chunk, report_memory=False)
+            accumulator.update(chunk)
+            writer.append(chunk)
+            if preview is None:
+                preview = chunk.head(PREVIEW_ROWS)
+
+        if writer.rows == 0:
+            writer.abort()
+            return IngestionResult(
+                rows=0, raw_rows=raw_rows, columns=[], missing={}, preview=None, summary={},
+                duplicates_removed=deduplicator.removed, chunks=n_chunks, streamed=True
+            )
+        stored = writer.finalize()
+    except BaseException:
+        writer.abort()
+        raise
+
+    if deduplicator.removed:
+        logger.info(f"تم إزالة {deduplicator.removed} صف مكرر عبر الأجزاء")
+    return IngestionResult(
+        rows=writer.rows,
+        raw_rows=raw_rows,
+        columns=accumulator.columns,
+        missing=dict(accumulator.missing),
+        preview=preview,
+        summary=accumulator.summary(writer.dtypes()),
+        duplicates_removed=deduplicator.removed,
+        chunks=n_chunks,
+        streamed=True,
+        path=stored
+    )
+
+
+def merge_parts(
+    parts: List[IngestionResult],
+    target: Path = CLEANED_DATASET_PATH,
+    dedup_key: Optional[str] = None,
+    base: Optional[Path] = None
+) -> IngestionResult:
+    """
+    دمج الأجزاء المنظفة في مخزن البيانات - Merge cleaned parts into the dataset store
+
+    الأعمدة هي اتحاد أعمدة الأجزاء (العمود الناقص فارغ)، والصفوف المكررة بين
+    الأجزاء تُحذف؛ ملفات الأجزاء تُحذف بعد الدمج
+    Columns are the union across parts (missing ones are empty) and rows
+    duplicated across parts are dropped; part files are deleted afterwards
+
+    Args:
+        parts: نتائج استيعاب الأجزاء - Per-part ingestion results
+        target: مسار البيانات المنظفة - Cleaned dataset path
+        dedup_key: عمود المعرف لإزالة التكرار (انظر RowDeduplicator) - Id column to deduplicate on (see RowDeduplicator)
+        base: بيانات منظفة موجودة تُضاف بعد الأجزاء ولا تُحذف؛ الأجزاء تسبقها عند تكرار المعرف
+            - Existing cleaned dataset appended after the parts and kept; the parts win on repeated ids
+
+    Returns:
+        نتيجة الدمج؛ path هو None إذا لم توجد صفوف - Merged result; path is None when there were no rows
+    """
+    parts_paths = [part.path for part in parts if part.path is not None]
+    stored = parts_paths + ([base] if base is not None else [])
+    columns: Dict[str, bool] = {}
+    for path in stored:
+        with pa.memory_map(str(path)) as source:
+            for item in ipc.open_file(source).schema:
+                text = pa.types.is_dictionary(item.type) or pa.types.is_string(item.type)
+                columns[item.name] = columns.get(item.name, False) or text
+
+    def chunks() -> Iterator[pd.DataFrame]:
+        for path in stored:
+            with pa.memory_map(str(path)) as source:
+                reader = ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield reader.get_batch(i).to_pandas()
+
+    def prepare(df: pd.DataFrame) -> pd.DataFrame:
+        for col, text in columns.items():
+            if col not in df.columns:
+                df[col] = pd.Series(None if text else np.nan, index=df.index, dtype=object if text else float)
+        return df[list(columns)]
+
+    try:
+        return _store_chunks(chunks(), target, prepare, clean=False, dedup_key=dedup_key)
+    finally:
+        for path in parts_paths:
+            path.unlink(missing_ok=True)
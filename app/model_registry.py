@@ -0,0 +1,272 @@
+"""
+سجل النماذج في الذاكرة - In-Memory Model Registry
+يحمّل النموذج مرة واحدة ويشاركه بين جميع الطلبات مع تبديل ذري عند حفظ نموذج جديد
+"""
+
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+from sklearn.pipeline import Pipeline
+
+from app.config import PROMOTION_MODEL_PATH, MODEL_VERSION_PATH, INFERENCE_BACKEND
+from app.i18n import get_message
+from app.feature_encoder import FeatureEncoder, build_feature_encoder
+from app.tree_engine import CompiledForest, is_compilable
+
+
+@dataclass(frozen=True)
+class _ModelEntry:
+    """نسخة محملة من النموذج - A loaded, immutable model snapshot"""
+    model: Pipeline
+    stamp: Tuple[int, int]
+    version: str
+    loaded_at: str
+
+
+class ModelRegistry:
+    """سجل النماذج - Process-wide model registry"""
+
+    def __init__(
+        self,
+        model_path: Path = PROMOTION_MODEL_PATH,
+        version_path: Path = MODEL_VERSION_PATH
+    ):
+        """
+        تهيئة السجل - Initialize registry
+
+        Args:
+            model_path: مسار النموذج - Model path
+            version_path: مسار ملف الإصدار - Version file path
+        """
+        self.model_path = model_path
+        self.version_path = version_path
+        self._entry: Optional[_ModelEntry] = None
+        self._lock = threading.Lock()
+        # المشتقات (المحرك المُجمّع، المُرمّز) مرتبطة بالنسخة التي بُنيت منها
+        # Derived artifacts (compiled forest, encoder) paired with the entry they were built from
+        self._derived: Dict[str, Tuple[_ModelEntry, Any]] = {}
+        self._derive_lock = threading.Lock()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        """بصمة ملف النموذج (الوقت، الحجم) - Model file stamp (mtime_ns, size)"""
+        try:
+            stat = self.model_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_version(self, model: Pipeline, stamp: Tuple[int, int]) -> str:
+        """قراءة معرف الإصدار - Read version id of a loaded model"""
+        version = getattr(model, "model_version_", None)
+        if version:
+            return str(version)
+        try:
+            with open(self.version_path, 'r', encoding='utf-8') as f:
+                version = json.load(f).get("version")
+            if version:
+                return str(version)
+        except Exception:
+            pass
+        # النماذج القديمة بدون معرف إصدار - Legacy models without a version id
+        return f"{stamp[0]}-{stamp[1]}"
+
+    def get(self) -> Pipeline:
+        """
+        الحصول على النموذج الحالي - Get current model
+
+        يعيد تحميل النموذج فقط إذا تغير الملف على القرص
+        Reloads only when the file on disk has changed
+
+        Returns:
+            النموذج - Model
+
+        Raises:
+            FileNotFoundError: إذا لم يوجد النموذج - If model not found
+        """
+        return self._current().model
+
+    def _current(self) -> _ModelEntry:
+        """النسخة الحالية مع التحقق من التغيير - Current entry, refreshed if stale"""
+        stamp = self._file_stamp()
+        entry = self._entry
+
+        if stamp is None:
+            if entry is not None:
+                return entry
+            logger.error(f"النموذج غير موجود: {self.model_path}")
+            raise FileNotFoundError(get_message("model_not_found"))
+
+        if entry is not None and entry.stamp == stamp:
+            return entry
+
+        with self._lock:
+            # ربما حمّله طلب آخر أثناء الانتظار - Another request may have reloaded it
+            entry = self._entry
+            if entry is not None and entry.stamp == stamp:
+                return entry
+
+            from app.model_utils import load_model
+            model = load_model(self.model_path)
+            entry = _ModelEntry(
+                model=model,
+                stamp=stamp,
+                version=self._read_version(model, stamp),
+                loaded_at=datetime.now().isoformat()
+            )
+            # تبديل ذري للمرجع - Atomic reference swap
+            self._entry = entry
+            logger.info(f"تم تحديث سجل النماذج إلى الإصدار: {entry.version}")
+            return entry
+
+    def snapshot(self) -> _ModelEntry:
+        """
+        النسخة الحالية الثابتة - Current immutable model snapshot
+
+        يستخدمها المستدعي ليأخذ النموذج ومشتقاته من نفس الإصدار
+        Lets callers take the model and its derived artifacts from one version
+
+        Returns:
+            النسخة الحالية - Current entry
+
+        Raises:
+            FileNotFoundError: إذا لم يوجد النموذج - If model not found
+        """
+        return self._current()
+
+    def _derive(self, name: str, entry: _ModelEntry, build: Callable[[Pipeline], Any]) -> Any:
+        """بناء مشتق مرة واحدة لكل إصدار - Build a derived artifact once per entry"""
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] is entry:
+            return cached[1]
+
+        with self._derive_lock:
+            cached = self._derived.get(name)
+            if cached is not None and cached[0] is entry:
+                return cached[1]
+            value = build(entry.model)
+            self._derived[name] = (entry, value)
+            return value
+
+    def get_compiled(self, entry: Optional[_ModelEntry] = None) -> Optional[CompiledForest]:
+        """
+        الحصول على المحرك المُجمّع للنموذج - Get the compiled forest for a model snapshot
+
+        يُبنى مرة واحدة لكل إصدار - Built once per model version
+
+        Args:
+            entry: النسخة (الافتراضي: الحالية) - Snapshot (defaults to the current one)
+
+        Returns:
+            المحرك المُجمّع أو None إذا لم يكن النموذج غابة - Compiled forest, or None if not a forest
+
+        Raises:
+            FileNotFoundError: إذا لم يوجد النموذج - If model not found
+        """
+        entry = entry or self._current()
+        if not is_compilable(entry.model):
+            return None
+
+        def build(model: Pipeline) -> CompiledForest:
+            compiled = CompiledForest(model)
+            logger.info(f"تم تجميع النموذج {entry.version}: {compiled.n_trees} شجرة، {compiled.n_nodes} عقدة")
+            return compiled
+
+        return self._derive("compiled", entry, build)
+
+    def get_encoder(self, entry: Optional[_ModelEntry] = None) -> Optional[FeatureEncoder]:
+        """
+        الحصول على مُرمّز الميزات للنموذج - Get the feature encoder for a model snapshot
+
+        يُبنى مرة واحدة لكل إصدار - Built once per model version
+
+        Args:
+            entry: النسخة (الافتراضي: الحالية) - Snapshot (defaults to the current one)
+
+        Returns:
+            المُرمّز أو None إذا كان المعالج غير مدعوم - Encoder, or None if prep is unsupported
+
+        Raises:
+            FileNotFoundError: إذا لم يوجد النموذج - If model not found
+        """
+        entry = entry or self._current()
+
+        def build(model: Pipeline) -> Optional[FeatureEncoder]:
+            encoder = build_feature_encoder(model)
+            if encoder is None:
+                logger.info(f"المعالج في الإصدار {entry.version} غير مدعوم للترميز المباشر، استخدام prep.transform")
+            return encoder
+
+        return self._derive("encoder", entry, build)
+
+    def publish(self, model: Pipeline, version: str) -> None:
+        """
+        نشر نموذج محفوظ حديثاً دون إعادة قراءته - Publish a freshly saved model
+
+        Args:
+            model: النموذج - Model
+            version: معرف الإصدار - Version id
+        """
+        stamp = self._file_stamp()
+        if stamp is None:
+            return
+        with self._lock:
+            self._entry = _ModelEntry(
+                model=model,
+                stamp=stamp,
+                version=version,
+                loaded_at=datetime.now().isoformat()
+            )
+        logger.info(f"تم نشر النموذج في السجل: {version}")
+
+    def preload(self) -> bool:
+        """
+        تحميل النموذج مسبقاً عند بدء التشغيل - Preload model at startup
+
+        Returns:
+            هل تم التحميل - Whether a model was loaded
+        """
+        try:
+            entry = self._current()
+            self.get_encoder(entry)
+            if INFERENCE_BACKEND != "sklearn":
+                self.get_compiled(entry)
+            return True
+        except FileNotFoundError:
+            logger.warning("لا يوجد نموذج مدرب للتحميل المسبق")
+            return False
+
+    @property
+    def version(self) -> Optional[str]:
+        """معرف الإصدار الحالي - Current version id"""
+        try:
+            return self._current().version
+        except FileNotFoundError:
+            return None
+
+    def info(self) -> Dict[str, Any]:
+        """
+        معلومات السجل - Registry information
+
+        Returns:
+            معلومات النموذج المحمل - Loaded model information
+        """
+        entry = self._entry
+        if entry is None:
+            return {"loaded": False, "model_path": str(self.model_path)}
+        return {
+            "loaded": True,
+            "model_path": str(self.model_path),
+            "version": entry.version,
+            "loaded_at": entry.loaded_at,
+            "model_type": type(entry.model.named_steps['clf']).__name__
+            if hasattr(entry.model, "named_steps") else type(entry.model).__name__
+        }
+
+
+# إنشاء نسخة عامة - Create global instance
+model_registry = ModelRegistry()
@@ -3,55 +3,212 @@
 يحتوي على وظائف بناء وتدريب وتقييم النماذج
 """
 
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import (
+    RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
+)
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     roc_auc_score, confusion_matrix, classification_report
 )
-from sklearn.model_selection import cross_val_score
+from sklearn.base import clone
+from sklearn.model_selection import check_cv
 from sklearn.pipeline import Pipeline
+from sklearn.utils import _safe_indexing
 import joblib
+from joblib import Parallel, delayed
 import json
+import os
+import time
+import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Tuple, Optional
+from typing import Callable, Dict, Any, Tuple, Optional
 from loguru import logger
 import pandas as pd
 import numpy as np
 
 from app.config import (
     PROMOTION_MODEL_PATH, METRICS_PATH, MODEL_VERSION_PATH,
-    RANDOM_STATE, N_ESTIMATORS, MAX_DEPTH, CV_FOLDS
+    RANDOM_STATE, N_ESTIMATORS, MAX_DEPTH, CV_FOLDS,
+    VALIDATION_MODES, TRAINING_VALIDATION_MODE, ONEHOT_SPARSE,
+    NUMERICAL_COLS, CATEGORICAL_COLS,
+    HGB_MAX_ITER, HGB_LEARNING_RATE, HGB_MAX_BINS, HGB_EARLY_STOPPING,
+    HGB_VALIDATION_FRACTION, HGB_N_ITER_NO_CHANGE
 )
 from app.data_utils import build_preprocessor
 from app.i18n import get_message
 
+# دالة تقرير التقدم: (المرحلة، الخطوة، عدد الخطوات) - Progress callback: (stage, step, total)
+ProgressCallback = Callable[[str, Optional[int], Optional[int]], None]
 
-def build_and_train(
-    X_train: pd.DataFrame,
-    y_train: pd.Series,
+
+# مقاييس كل طية - Per-fold validation metrics
+_FOLD_METRICS = ("accuracy", "precision", "recall", "f1_score", "roc_auc")
+# الطية التي يحتفظ cv_reuse بنموذجها - Fold whose pipeline cv_reuse keeps
+_REUSED_FOLD = 0
+
+
+def _validation_scores(y_true: pd.Series, preds: np.ndarray, proba: Optional[np.ndarray]) -> Dict[str, float]:
+    """مقاييس التحقق لمجموعة واحدة - Validation metrics for one held-out set"""
+    scores = {
+        "accuracy": float(accuracy_score(y_true, preds)),
+        "precision": float(precision_score(y_true, preds, zero_division=0)),
+        "recall": float(recall_score(y_true, preds, zero_division=0)),
+        "f1_score": float(f1_score(y_true, preds, zero_division=0)),
+    }
+    if proba is not None and len(np.unique(y_true)) > 1:
+        scores["roc_auc"] = float(roc_auc_score(y_true, proba))
+    return scores
+
+
+def _fit_and_score_fold(
+    model: Pipeline,
+    X: pd.DataFrame,
+    y: pd.Series,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+    return_estimator: bool
+) -> Tuple[Optional[Pipeline], Dict[str, float], float]:
+    """تدريب وتقييم طية واحدة - Fit and score one CV fold"""
+    start = time.perf_counter()
+    # X قد يكون DataFrame أو مصفوفة محولة (كثيفة أو CSR) - X may be a DataFrame or a transformed dense/CSR matrix
+    model.fit(_safe_indexing(X, train_idx), _safe_indexing(y, train_idx))
+    fit_time = time.perf_counter() - start
+
+    X_test, y_test = _safe_indexing(X, test_idx), _safe_indexing(y, test_idx)
+    proba = model.predict_proba(X_test)[:, 1] if hasattr(model, "predict_proba") else None
+    preds = model.predict(X_test)
+    # لا يُعاد النموذج من العامل إلا عند الحاجة - Ship the fitted pipeline back only when needed
+    return (model if return_estimator else None), _validation_scores(y_test, preds, proba), fit_time
+
+
+def cross_validate_folds(
+    model: Pipeline,
+    X: pd.DataFrame,
+    y: pd.Series,
+    progress: Optional[ProgressCallback] = None,
+    return_estimator: bool = False
+) -> Dict[str, Any]:
+    """
+    التحقق المتقاطع مع تقرير كل طية - Cross-validation with per-fold progress
+
+    يُرجع نفس مفاتيح sklearn.model_selection.cross_validate (test_<metric>,
+    fit_time، وestimator عند الطلب) بنفس الطيات (StratifiedKFold) وبالتوازي،
+    لكن النتائج تصل كمولّد فيمكن الإبلاغ عن اكتمال كل طية.
+    Returns the same keys as sklearn.model_selection.cross_validate
+    (test_<metric>, fit_time and, on request, estimator) over the same
+    StratifiedKFold splits, still in parallel, but results arrive through
+    a generator so each finished fold can be reported.
+
+    Args:
+        model: خط الأنابيب (غير مدرب) - Unfitted pipeline
+        X: الميزات - Features
+        y: الأهداف - Targets
+        progress: دالة تقرير التقدم - Progress callback
+        return_estimator: إرجاع نماذج الطيات المدربة - Return the fitted fold pipelines
+
+    Returns:
+        درجات كل طية - Per-fold scores
+    """
+    folds = list(check_cv(CV_FOLDS, y, classifier=True).split(X, y))
+    outputs = Parallel(n_jobs=-1, return_as="generator")(
+        delayed(_fit_and_score_fold)(clone(model), X, y, train_idx, test_idx, return_estimator)
+        for train_idx, test_idx in folds
+    )
+
+    estimators, scores, fit_times = [], [], []
+    for fold, (estimator, fold_scores, fit_time) in enumerate(outputs, start=1):
+        estimators.append(estimator)
+        scores.append(fold_scores)
+        fit_times.append(fit_time)
+        if progress is not None:
+            progress("cross_validation", fold, len(folds))
+
+    results: Dict[str, Any] = {"fit_time": np.array(fit_times)}
+    for metric in _FOLD_METRICS:
+        if all(metric in fold_scores for fold_scores in scores):
+            results[f"test_{metric}"] = np.array([fold_scores[metric] for fold_scores in scores])
+    if return_estimator:
+        results["estimator"] = estimators
+    return results
+
+
+def _summarize_cv(mode: str, cv_results: Dict[str, Any]) -> Dict[str, Any]:
+    """ملخص درجات الطيات للمقاييس - Fold scores summary for the reported metrics"""
+    summary: Dict[str, Any] = {"mode": mode, "folds": len(cv_results["fit_time"])}
+    for metric in _FOLD_METRICS:
+        values = cv_results.get(f"test_{metric}")
+        if values is not None:
+            summary[metric] = float(values.mean())
+            summary[f"{metric}_std"] = float(values.std())
+    summary["fold_accuracy"] = cv_results["test_accuracy"].tolist()
+    return summary
+
+
+def _summarize_oob(model: Pipeline, y_train: pd.Series) -> Dict[str, Any]:
+    """
+    ملخص تقييم خارج الحقيبة - Out-of-bag validation summary
+
+    كل عينة تُقيّم بالأشجار التي لم تتدرب عليها، فلا حاجة لطيات إضافية.
+    Each sample is scored by the trees that did not see it, so no extra
+    folds are fitted.
+    """
+    clf = model.named_steps["clf"]
+    decision = clf.oob_decision_function_
+    # عينات دخلت كل الأشجار ليس لها تقدير - Samples drawn by every tree have no estimate
+    scored = ~np.isnan(decision).any(axis=1)
+    y_true = np.asarray(y_train)[scored]
+    preds = clf.classes_[decision[scored].argmax(axis=1)]
+    proba = decision[scored, 1] if decision.shape[1] > 1 else None
+    return {
+        "mode": "oob",
+        "oob_samples": int(scored.sum()),
+        **_validation_scores(y_true, preds, proba)
+    }
+
+
+def build_pipeline(
     model_type: str = "random_forest",
-    use_cross_validation: bool = True
+    sparse_onehot: Optional[bool] = None,
+    oob_score: bool = False,
+    clf_params: Optional[Dict[str, Any]] = None
 ) -> Pipeline:
     """
-    بناء وتدريب النموذج - Build and train model
+    بناء خط الأنابيب (غير مدرب) - Build the unfitted pipeline
 
     Args:
-        X_train: بيانات التدريب - Training features
-        y_train: أهداف التدريب - Training targets
-        model_type: نوع النموذج - Model type (random_forest, gradient_boosting)
-        use_cross_validation: استخدام التحقق المتقاطع - Use cross-validation
+        model_type: نوع النموذج - Model type (random_forest, gradient_boosting, hist_gradient_boosting)
+        sparse_onehot: ترميز أحادي متناثر (الافتراضي ONEHOT_SPARSE) - Sparse one-hot path (default ONEHOT_SPARSE)
+        oob_score: حساب تقييم خارج الحقيبة لـ RandomForest - Compute RandomForest out-of-bag scores
+        clf_params: معاملات تتجاوز إعدادات المصنف الافتراضية - Overrides for the default classifier settings
 
     Returns:
-        النموذج المدرب - Trained model
+        خط الأنابيب (prep, clf) - (prep, clf) pipeline
     """
-    logger.info(get_message("training_started"))
-
     # بناء المعالج - Build preprocessor
-    prep = build_preprocessor()
+    # HistGradientBoosting يستخدم الفئات أصلياً دون ترميز أحادي
+    # HistGradientBoosting uses categoricals natively, without one-hot expansion
+    prep = build_preprocessor(
+        native_categorical=(model_type == "hist_gradient_boosting"),
+        sparse_onehot=ONEHOT_SPARSE if sparse_onehot is None else sparse_onehot
+    )
 
     # اختيار المصنف - Select classifier
-    if model_type == "gradient_boosting":
+    if model_type == "hist_gradient_boosting":
+        # مخرجات المعالج: الأعمدة الرقمية ثم الفئوية - Preprocessor output: numeric then categorical columns
+        categorical = list(range(len(NUMERICAL_COLS), len(NUMERICAL_COLS) + len(CATEGORICAL_COLS)))
+        clf = HistGradientBoostingClassifier(
+            max_iter=HGB_MAX_ITER,
+            learning_rate=HGB_LEARNING_RATE,
+            max_bins=HGB_MAX_BINS,
+            categorical_features=categorical,
+            early_stopping=HGB_EARLY_STOPPING,
+            validation_fraction=HGB_VALIDATION_FRACTION,
+            n_iter_no_change=HGB_N_ITER_NO_CHANGE,
+            random_state=RANDOM_STATE,
+            verbose=0
+        )
+    elif model_type == "gradient_boosting":
         clf = GradientBoostingClassifier(
             n_estimators=N_ESTIMATORS,
             max_depth=5,
@@ -63,32 +220,163 @@ def build_and_train(
             n_estimators=N_ESTIMATORS,
             max_depth=MAX_DEPTH,
             random_state=RANDOM_STATE,
+            oob_score=oob_score,
             n_jobs=-1,
             verbose=0
         )
 
+    if clf_params:
+        clf.set_params(**clf_params)
+
     # بناء خط الأنابيب - Build pipeline
-    model = Pipeline(steps=[
+    return Pipeline(steps=[
         ("prep", prep),
         ("clf", clf)
     ])
 
+
+def resolve_validation_mode(model_type: str, validation_mode: Optional[str] = None) -> str:
+    """
+    وضع التحقق الفعلي للنموذج - Effective validation mode for a model type
+
+    Args:
+        model_type: نوع النموذج - Model type
+        validation_mode: الوضع المطلوب (الافتراضي من الإعدادات) - Requested mode (default from config)
+
+    Returns:
+        الوضع؛ oob يصبح cv_reuse لغير RandomForest - The mode; oob becomes cv_reuse for non-RandomForest models
+
+    Raises:
+        ValueError: إذا كان وضع التحقق غير معروف - If the validation mode is unknown
+    """
+    mode = validation_mode or TRAINING_VALIDATION_MODE
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f"وضع تحقق غير معروف: {mode} - Unknown validation mode")
+    if mode == "oob" and model_type != "random_forest":
+        logger.warning(f"تقييم خارج الحقيبة متاح لـ RandomForest فقط، استخدام cv_reuse لـ {model_type}")
+        mode = "cv_reuse"
+    return mode
+
+
+def build_and_train(
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    model_type: str = "random_forest",
+    use_cross_validation: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    validation_mode: Optional[str] = None,
+    sparse_onehot: Optional[bool] = None,
+    preprocessor: Optional[Any] = None,
+    cv_features: Optional[pd.DataFrame] = None
+) -> Pipeline:
+    """
+    بناء وتدريب النموذج - Build and train model
+
+    أوضاع التحقق - Validation modes:
+        refit: تحقق متقاطع ثم تدريب نهائي على كل البيانات (السلوك الأصلي)
+               k-fold CV, then a final fit on all training data (original behaviour)
+        cv_reuse: تحقق متقاطع مع إعادة استخدام نموذج الطية الأولى بدلاً من تدريب سادس؛
+                  يُختار دون النظر للدرجات ويُدرب على (k-1)/k من الصفوف
+                  k-fold CV that keeps the first fold pipeline instead of a sixth fit;
+                  chosen without looking at the scores, trained on (k-1)/k of the rows
+        oob: تقييم خارج الحقيبة لـ RandomForest بتدريب واحد (لغيره يُستخدم cv_reuse)
+             RandomForest out-of-bag scoring with a single fit (others use cv_reuse)
+
+    ملخص التحقق يُحفظ في model.validation_ - The validation summary is stored in model.validation_
+
+    Args:
+        X_train: بيانات التدريب - Training features
+        y_train: أهداف التدريب - Training targets
+        model_type: نوع النموذج - Model type (random_forest, gradient_boosting, hist_gradient_boosting)
+        use_cross_validation: استخدام التحقق المتقاطع - Use cross-validation
+        progress: دالة تقرير التقدم - Progress callback (optional)
+        validation_mode: وضع التحقق - Validation mode (refit, cv_reuse, oob; default from config)
+        sparse_onehot: ترميز أحادي متناثر (الافتراضي ONEHOT_SPARSE) - Sparse one-hot path (default ONEHOT_SPARSE)
+        preprocessor: معالج مدرب مسبقاً؛ عندها X_train محولة ويُدرب المصنف فقط
+            A fitted preprocessor; X_train is then already transformed and only the classifier is fit
+        cv_features: بيانات التدريب الأولية (بترتيب X_train) للتحقق المتقاطع مع preprocessor؛
+            كل طية تدرب معالجاً جديداً حتى لا تدخل صفوفها المحجوزة في إحصاءاته
+            - Raw training features (in X_train order) for CV when preprocessor is given;
+            each fold fits a fresh preprocessor so its held-out rows never reach its statistics
+
+    Returns:
+        النموذج المدرب - Trained model
+
+    Raises:
+        ValueError: إذا كان وضع التحقق غير معروف، أو إذا طُلب تحقق متقاطع مع preprocessor
+            دون cv_features أو بوضع cv_reuse
+            - If the validation mode is unknown, or CV is requested with preprocessor
+            but without cv_features or in cv_reuse mode
+    """
+    logger.info(get_message("training_started"))
+
+    mode = resolve_validation_mode(model_type, validation_mode)
+    run_cv = use_cross_validation and mode != "oob" and X_train.shape[0] > CV_FOLDS
+    if preprocessor is not None and run_cv and (cv_features is None or mode == "cv_reuse"):
+        # نماذج الطيات لها معالجاتها الخاصة فلا تُستخدم المصفوفات المحولة - Fold models carry their own preprocessors
+        raise ValueError(
+            "التحقق المتقاطع مع معالج مدرب يتطلب cv_features ووضع refit"
+            " - CV with a fitted preprocessor needs cv_features and refit mode"
+        )
+
+    model = build_pipeline(
+        model_type,
+        sparse_onehot=sparse_onehot,
+        oob_score=use_cross_validation and mode == "oob"
+    )
+    if preprocessor is not None:
+        # المعالج يُركَّب بعد التدريب - The fitted preprocessor is put back after fitting
+        model.steps[0] = ("prep", "passthrough")
+
+    validation: Optional[Dict[str, Any]] = None
+    fitted = False
+
     # التحقق المتقاطع - Cross-validation
-    if use_cross_validation and len(X_train) > CV_FOLDS:
+    if run_cv:
         try:
-            cv_scores = cross_val_score(
-                model, X_train, y_train,
-                cv=CV_FOLDS,
-                scoring='accuracy',
-                n_jobs=-1
+            if preprocessor is not None:
+                # خط أنابيب كامل على البيانات الأولية: معالج جديد لكل طية - Full pipeline on raw features: a fresh preprocessor per fold
+                cv_model, cv_X = build_pipeline(model_type, sparse_onehot=sparse_onehot), cv_features
+            else:
+                cv_model, cv_X = model, X_train
+            cv_results = cross_validate_folds(
+                cv_model, cv_X, y_train, progress,
+                return_estimator=(mode == "cv_reuse")
             )
+            cv_scores = cv_results["test_accuracy"]
+            validation = _summarize_cv(mode, cv_results)
             logger.info(f"درجات التحقق المتقاطع: {cv_scores}")
             logger.info(f"متوسط الدقة: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
+
+            if mode == "cv_reuse":
+                # طية ثابتة: الاختيار بأعلى درجة يجعل درجة الطية المختارة متفائلة
+                # A fixed fold: picking the top-scoring fold would bias its own score upwards
+                model = cv_results["estimator"][_REUSED_FOLD]
+                validation["selected_fold"] = _REUSED_FOLD + 1
+                validation["selected_fold_accuracy"] = float(cv_scores[_REUSED_FOLD])
+                validation["training_fraction"] = (CV_FOLDS - 1) / CV_FOLDS
+                fitted = True
+                logger.info(
+                    f"إعادة استخدام نموذج الطية {_REUSED_FOLD + 1} "
+                    f"({validation['training_fraction']:.0%} من بيانات التدريب)"
+                )
         except Exception as e:
             logger.warning(f"فشل التحقق المتقاطع: {e}")
 
     # تدريب النموذج - Train model
-    model.fit(X_train, y_train)
+    if not fitted:
+        if progress is not None:
+            progress("fitting", None, None)
+        model.fit(X_train, y_train)
+        if hasattr(model.named_steps["clf"], "n_iter_"):
+            logger.info(f"عدد دورات التعزيز بعد الإيقاف المبكر: {model.named_steps['clf'].n_iter_}")
+        if use_cross_validation and mode == "oob":
+            validation = _summarize_oob(model, y_train)
+            logger.info(f"دقة خارج الحقيبة: {validation['accuracy']:.4f}")
+
+    if preprocessor is not None:
+        model.steps[0] = ("prep", preprocessor)
+    model.validation_ = validation
     logger.info(get_message("training_completed"))
 
     return model
@@ -171,20 +459,37 @@ def save_model(
         metadata: بيانات إضافية - Additional metadata
     """
     try:
-        # حفظ النموذج - Save model
-        joblib.dump(model, model_path)
+        # حفظ النموذج بشكل ذري - Save model atomically
+        # الكتابة في ملف مؤقت ثم الاستبدال حتى لا يقرأ أحد ملفاً نصف مكتوب
+        # Write to a temp file then replace so readers never see a partial file
+        # معرف الإصدار يُحفظ داخل النموذج نفسه ليبقى متسقاً مع الملف
+        # The version id travels inside the pickle so it always matches the file
+        version = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        model.model_version_ = version
+
+        tmp_path = model_path.with_name(model_path.name + ".tmp")
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, model_path)
         logger.info(f"تم حفظ النموذج في: {model_path}")
 
         # حفظ معلومات الإصدار - Save version info
         version_info = {
+            "version": version,
             "model_path": str(model_path),
             "saved_at": datetime.now().isoformat(),
             "model_type": type(model.named_steps['clf']).__name__,
             "metadata": metadata or {}
         }
 
-        with open(MODEL_VERSION_PATH, 'w', encoding='utf-8') as f:
+        tmp_version_path = MODEL_VERSION_PATH.with_name(MODEL_VERSION_PATH.name + ".tmp")
+        with open(tmp_version_path, 'w', encoding='utf-8') as f:
             json.dump(version_info, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_version_path, MODEL_VERSION_PATH)
+
+        # نشر النموذج في سجل الذاكرة - Publish to the in-memory registry
+        if model_path == PROMOTION_MODEL_PATH:
+            from app.model_registry import model_registry
+            model_registry.publish(model, version)
 
     except Exception as e:
         logger.error(f"فشل في حفظ النموذج: {e}")
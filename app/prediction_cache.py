@@ -0,0 +1,190 @@
+"""
+ذاكرة تخزين نتائج التنبؤ - Prediction Result Cache
+ذاكرة LRU مع مدة صلاحية وحد للذاكرة، مفتاحها بصمة ميزات الموظف وإصدار النموذج
+"""
+
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.config import (
+    FEATURE_COLS, NUMERICAL_COLS,
+    PREDICTION_CACHE_ENABLED, PREDICTION_CACHE_MAX_MB, PREDICTION_CACHE_TTL_SECONDS
+)
+
+# (التصنيف، الاحتمالات) - (label, probabilities)
+CachedPrediction = Tuple[Any, Tuple[float, ...]]
+
+# تكلفة تقريبية لعقدة OrderedDict وحقل الانتهاء - Approximate OrderedDict node + expiry overhead
+_ENTRY_OVERHEAD = 120
+
+_NUMERICAL = frozenset(NUMERICAL_COLS)
+
+
+def feature_key(record: Dict[str, Any]) -> bytes:
+    """
+    بصمة ميزات الموظف - Digest of the canonical employee feature tuple
+
+    الأعمدة الرقمية تُوحَّد إلى float حتى يتطابق 35 و 35.0
+    Numeric columns are normalized to float so 35 and 35.0 share a key
+
+    Args:
+        record: بيانات الموظف - Employee record
+
+    Returns:
+        بصمة من 16 بايت - 16-byte digest
+    """
+    values = []
+    for column in FEATURE_COLS:
+        value = record.get(column)
+        if column in _NUMERICAL and value is not None:
+            value = float(value)
+        values.append(value)
+    return hashlib.blake2b(repr(tuple(values)).encode("utf-8"), digest_size=16).digest()
+
+
+class PredictionCache:
+    """ذاكرة LRU/TTL للتنبؤات - LRU/TTL prediction cache"""
+
+    def __init__(
+        self,
+        max_bytes: int = int(PREDICTION_CACHE_MAX_MB * 1024 * 1024),
+        ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS,
+        enabled: bool = PREDICTION_CACHE_ENABLED
+    ):
+        """
+        تهيئة الذاكرة - Initialize cache
+
+        Args:
+            max_bytes: الحد الأقصى للذاكرة (بايت) - Memory cap in bytes
+            ttl_seconds: مدة صلاحية النتيجة (0 بلا حد) - Entry lifetime (0 = no expiry)
+            enabled: تفعيل الذاكرة - Enable the cache
+        """
+        self.max_bytes = max(int(max_bytes), 0)
+        self.ttl = max(float(ttl_seconds), 0.0)
+        self.enabled = enabled and self.max_bytes > 0
+
+        self._entries: "OrderedDict[bytes, Tuple[CachedPrediction, float, int]]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # العدادات - Counters
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def _check_version(self, version: str) -> None:
+        """مسح الذاكرة عند نشر نموذج جديد (يُستدعى مع القفل) - Drop everything when the model changes"""
+        if version != self._version:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get_many(self, version: str, keys: Sequence[bytes]) -> List[Optional[CachedPrediction]]:
+        """
+        البحث عن عدة مفاتيح - Look up several keys
+
+        Args:
+            version: إصدار النموذج الحالي - Current model version
+            keys: البصمات - Feature digests
+
+        Returns:
+            النتيجة أو None لكل مفتاح - Cached prediction or None per key
+        """
+        now = time.monotonic()
+        found: List[Optional[CachedPrediction]] = []
+        with self._lock:
+            self._check_version(version)
+            for key in keys:
+                item = self._entries.get(key)
+                if item is None:
+                    self._misses += 1
+                    found.append(None)
+                    continue
+                value, expires_at, size = item
+                if self.ttl and expires_at <= now:
+                    del self._entries[key]
+                    self._bytes -= size
+                    self._expirations += 1
+                    self._misses += 1
+                    found.append(None)
+                    continue
+                self._entries.move_to_end(key)
+                self._hits += 1
+                found.append(value)
+        return found
+
+    def put_many(self, version: str, items: Sequence[Tuple[bytes, CachedPrediction]]) -> None:
+        """
+        تخزين عدة نتائج - Store several predictions
+
+        Args:
+            version: إصدار النموذج الذي أنتجها - Model version that produced them
+            items: (البصمة، النتيجة) - (digest, prediction) pairs
+        """
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            # نتيجة نموذج قديم انتهى تقييمها بعد التبديل - Late result from a replaced model
+            if version != self._version and self._version is not None:
+                return
+            self._check_version(version)
+            for key, value in items:
+                size = (
+                    _ENTRY_OVERHEAD + sys.getsizeof(key) + sys.getsizeof(value)
+                    + sys.getsizeof(value[1]) + 24 * len(value[1])
+                )
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[2]
+                self._entries[key] = (value, expires_at, size)
+                self._bytes += size
+
+            # إخلاء الأقدم استخداماً حتى حد الذاكرة - Evict least recently used down to the cap
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, _, size) = self._entries.popitem(last=False)
+                self._bytes -= size
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """مسح الذاكرة - Clear the cache"""
+        with self._lock:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        مقاييس الذاكرة - Cache metrics
+
+        Returns:
+            الإصابات والإخفاقات والإخلاء والحجم - Hits, misses, evictions and size
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "model_version": self._version,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations
+            }
+
+
+# إنشاء نسخة عامة - Create global instance
+prediction_cache = PredictionCache()
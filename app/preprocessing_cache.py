@@ -0,0 +1,177 @@
+"""
+ذاكرة المعالجة المسبقة - Preprocessing Artifact Cache
+تقسيم البيانات والمعالج المدرب والمصفوفات المحولة محفوظة كملفات .npy قابلة للربط بالذاكرة،
+مفتاحها بصمة محتوى البيانات وإعدادات التقسيم والمعالج
+Split indices, the fitted preprocessor and the transformed matrices stored as
+memory-mappable .npy files, keyed by the dataset contents plus split and
+preprocessor settings
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from loguru import logger
+from sklearn.compose import ColumnTransformer
+
+from app.config import (
+    PREPROCESSING_CACHE_DIR, PREPROCESSING_CACHE_ENABLED, PREPROCESSING_CACHE_MAX_ENTRIES,
+    RANDOM_STATE, TEST_SIZE, NUMERICAL_COLS, CATEGORICAL_COLS, TARGET_COL, ONEHOT_SPARSE
+)
+from app.incremental import preprocessing_fingerprint
+
+_META = "meta.json"
+
+
+@dataclass
+class PreparedData:
+    """بيانات جاهزة للتدريب - Data ready for the classifier"""
+    key: str
+    preprocessor: ColumnTransformer
+    X_train: Any
+    X_test: Any
+    y_train: np.ndarray
+    y_test: np.ndarray
+    train_index: np.ndarray
+    test_index: np.ndarray
+    hit: bool = False
+
+
+def cache_key(dataset_path: Path, model_type: str, sparse_onehot: Optional[bool] = None) -> str:
+    """
+    مفتاح المحتوى - Content-addressed key
+
+    Args:
+        dataset_path: مسار البيانات المنظفة - Cleaned dataset path
+        model_type: نوع النموذج (يحدد المعالج) - Model type (selects the preprocessor)
+        sparse_onehot: الترميز الأحادي المتناثر - Sparse one-hot path
+
+    Returns:
+        بصمة سداسية عشرية - Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(dataset_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    settings = {
+        "random_state": RANDOM_STATE,
+        "test_size": TEST_SIZE,
+        "numerical": NUMERICAL_COLS,
+        "categorical": CATEGORICAL_COLS,
+        "target": TARGET_COL,
+        "preprocessor": preprocessing_fingerprint(
+            model_type, ONEHOT_SPARSE if sparse_onehot is None else sparse_onehot
+        ),
+    }
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _save_matrix(directory: Path, name: str, matrix: Any) -> dict:
+    """حفظ مصفوفة كثيفة أو CSR كملفات .npy - Save a dense or CSR matrix as .npy files"""
+    if sp.issparse(matrix):
+        matrix = matrix.tocsr()
+        for part in ("data", "indices", "indptr"):
+            np.save(directory / f"{name}.{part}.npy", getattr(matrix, part))
+        return {"format": "csr", "shape": list(matrix.shape)}
+    np.save(directory / f"{name}.npy", np.ascontiguousarray(matrix))
+    return {"format": "dense"}
+
+
+def _load_matrix(directory: Path, name: str, info: dict) -> Any:
+    """تحميل مصفوفة مربوطة بالذاكرة - Load a matrix memory-mapped"""
+    if info["format"] == "csr":
+        parts = [np.load(directory / f"{name}.{part}.npy", mmap_mode="r") for part in ("data", "indices", "indptr")]
+        return sp.csr_matrix(tuple(parts), shape=tuple(info["shape"]), copy=False)
+    return np.load(directory / f"{name}.npy", mmap_mode="r")
+
+
+def load(key: str) -> Optional[PreparedData]:
+    """
+    تحميل بيانات محفوظة - Load a cached entry
+
+    Args:
+        key: مفتاح المحتوى - Content key
+
+    Returns:
+        البيانات الجاهزة أو None - Prepared data, or None on a miss
+    """
+    if not PREPROCESSING_CACHE_ENABLED:
+        return None
+    directory = PREPROCESSING_CACHE_DIR / key
+    meta_path = directory / _META
+    if not meta_path.exists():
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        prepared = PreparedData(
+            key=key,
+            preprocessor=joblib.load(directory / "preprocessor.joblib"),
+            X_train=_load_matrix(directory, "X_train", meta["X_train"]),
+            X_test=_load_matrix(directory, "X_test", meta["X_test"]),
+            y_train=np.load(directory / "y_train.npy", mmap_mode="r"),
+            y_test=np.load(directory / "y_test.npy", mmap_mode="r"),
+            train_index=np.load(directory / "train_index.npy", mmap_mode="r"),
+            test_index=np.load(directory / "test_index.npy", mmap_mode="r"),
+            hit=True
+        )
+    except Exception as e:
+        logger.warning(f"تعذر قراءة ذاكرة المعالجة {key}: {e}")
+        return None
+
+    # آخر استخدام يحدد ما يُحذف أولاً - Last use decides eviction order
+    os.utime(meta_path)
+    logger.info(f"استخدام المعالجة المحفوظة {key[:12]} - Preprocessing cache hit")
+    return prepared
+
+
+def store(prepared: PreparedData) -> None:
+    """
+    حفظ البيانات الجاهزة بشكل ذري - Atomically store prepared data
+
+    Args:
+        prepared: البيانات الجاهزة - Prepared data
+    """
+    if not PREPROCESSING_CACHE_ENABLED:
+        return
+    directory = PREPROCESSING_CACHE_DIR / prepared.key
+    if directory.exists():
+        return
+    tmp_dir = PREPROCESSING_CACHE_DIR / f".{prepared.key}.{os.getpid()}.tmp"
+    try:
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        joblib.dump(prepared.preprocessor, tmp_dir / "preprocessor.joblib")
+        meta = {
+            "created_at": time.time(),
+            "X_train": _save_matrix(tmp_dir, "X_train", prepared.X_train),
+            "X_test": _save_matrix(tmp_dir, "X_test", prepared.X_test),
+        }
+        for name in ("y_train", "y_test", "train_index", "test_index"):
+            np.save(tmp_dir / f"{name}.npy", np.asarray(getattr(prepared, name)))
+        with open(tmp_dir / _META, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_dir, directory)
+    except OSError as e:
+        # عملية أخرى حفظت نفس المفتاح أو القرص ممتلئ - Another process stored it first, or the disk is full
+        logger.warning(f"تعذر حفظ ذاكرة المعالجة: {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return
+    logger.info(f"تم حفظ المعالجة {prepared.key[:12]} في {directory}")
+    _prune()
+
+
+def _prune() -> None:
+    """حذف الأقدم استخداماً فوق الحد - Drop least recently used entries over the limit"""
+    entries = [p for p in PREPROCESSING_CACHE_DIR.iterdir() if (p / _META).exists()]
+    entries.sort(key=lambda p: (p / _META).stat().st_mtime, reverse=True)
+    for stale in entries[max(PREPROCESSING_CACHE_MAX_ENTRIES, 1):]:
+        shutil.rmtree(stale, ignore_errors=True)
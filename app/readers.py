@@ -0,0 +1,311 @@
+"""
+قارئات الملفات - File Readers
+طبقة قراءة بمحركات قابلة للتبديل: pyarrow لـ CSV (متعدد الخيوط وبأنواع صريحة
+للأعمدة المعروفة) وcalamine لـ Excel، مع الرجوع إلى pandas/openpyxl عند الفشل.
+الأعمدة تُختار أثناء القراءة
+Pluggable reader layer: pyarrow for CSV (multithreaded, explicit types for the
+known columns) and calamine for Excel, falling back to pandas/openpyxl on
+failure. Columns are projected at read time
+"""
+
+import io
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from loguru import logger
+
+from app.config import (
+    CSV_READER_ENGINE, EXCEL_READER_ENGINE, NUMERICAL_COLS, CATEGORICAL_COLS, FEATURE_COLS,
+    TARGET_COL, ID_COL, INCREMENTAL_WATERMARK_COL
+)
+from app.file_format import FileFormat, SNIFF_BYTES, WHITESPACE_DELIMITER
+
+try:
+    import python_calamine  # noqa: F401 - محرك pandas "calamine" - pandas' "calamine" engine
+except ImportError:  # pragma: no cover - python-calamine مدرج في requirements.txt
+    python_calamine = None
+
+# pyarrow يحول الترميزات أحادية البايت عبر Python؛ UTF-16/32 تبقى لـ pandas
+# Arrow transcodes single-byte encodings through Python; UTF-16/32 stay with pandas
+_ARROW_ENCODINGS = {
+    "utf-8": "utf8", "utf-8-sig": "utf8", "cp1256": "cp1256", "cp1252": "cp1252", "latin1": "latin1"
+}
+# نفس القيم الفارغة الافتراضية في pandas - pandas' default NA strings
+_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+# محركات Excel بالترتيب لكل امتداد - Excel engines in order per extension
+_EXCEL_ENGINES = {
+    ".xlsx": ("calamine", "openpyxl"),
+    ".xlsm": ("calamine", "openpyxl"),
+    ".xls": ("calamine", "xlrd", "openpyxl"),
+    ".xlsb": ("calamine", "pyxlsb"),
+}
+EXCEL_EXTENSIONS = tuple(_EXCEL_ENGINES)
+
+
+def model_columns() -> List[str]:
+    """أعمدة النموذج والهدف والمعرف - Model, target and id columns"""
+    return list(dict.fromkeys(FEATURE_COLS + [TARGET_COL, ID_COL, INCREMENTAL_WATERMARK_COL]))
+
+
+def projection(names: Sequence[str], columns: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """
+    الأعمدة المقروءة من ملف - Columns to read from a file
+
+    الاختيار يُطبق فقط إذا احتوى الملف كل أعمدة النموذج؛ غير ذلك يُقرأ كاملاً
+    حتى تعكس التحذيرات والمعاينة الملف الفعلي
+    Projection only applies when the file has every feature column; otherwise
+    it is read whole so warnings and the preview reflect the actual file
+
+    Args:
+        names: أعمدة الملف - File columns
+        columns: الأعمدة المطلوبة أو None للكل - Wanted columns, or None for all
+
+    Returns:
+        الأعمدة بترتيب الملف، أو None لقراءة الكل - Columns in file order, or None to read all
+    """
+    if columns is None or not set(FEATURE_COLS).issubset(names):
+        return None
+    wanted = set(columns)
+    return [name for name in names if name in wanted]
+
+
+def select_columns(df: pd.DataFrame, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    """اختيار الأعمدة بعد القراءة للصيغ التي لا تدعمه - Project after reading for formats that cannot"""
+    keep = projection([str(c) for c in df.columns], columns)
+    return df if keep is None else df[keep]
+
+
+def arrow_schema_names(path: Path, file_extension: str) -> List[str]:
+    """أسماء أعمدة ملف Parquet/Feather دون قراءة البيانات - Parquet/Feather column names without reading data"""
+    if file_extension == ".parquet":
+        return pq.read_schema(path).names
+    with pa.memory_map(str(path)) as source:
+        return ipc.open_file(source).schema.names
+
+
+def _use_arrow(file_format: FileFormat) -> bool:
+    """
+    هل يُقرأ الملف بـ pyarrow - Whether to read the file with pyarrow
+
+    الملفات التي تتسع لها العينة أسرع مع pandas لأن تهيئة pyarrow أكبر من التحليل
+    Files that fit in the sample are faster with pandas: pyarrow's setup costs more than the parse
+    """
+    return (
+        CSV_READER_ENGINE == "pyarrow"
+        and file_format.sample_bytes >= SNIFF_BYTES
+        and file_format.encoding in _ARROW_ENCODINGS
+        and file_format.delimiter != WHITESPACE_DELIMITER
+    )
+
+
+def _arrow_options(
+    path: Path,
+    file_format: FileFormat,
+    columns: Optional[Sequence[str]],
+    chunk_rows: Optional[int] = None
+) -> dict:
+    """
+    إعدادات pyarrow من عينة الملف - pyarrow options from the file sample
+
+    أعمدة النموذج بأنواع صريحة؛ التواريخ تبقى نصاً كما في pandas
+    Model columns get explicit types; dates stay text as in pandas
+    """
+    with open(path, "rb") as f:
+        sample = f.read(SNIFF_BYTES)
+        complete = not f.read(1)
+    if not complete:
+        sample = sample[:sample.rfind(b"\n") + 1]
+
+    read_options = pacsv.ReadOptions(encoding=_ARROW_ENCODINGS[file_format.encoding], use_threads=True)
+    parse_options = pacsv.ParseOptions(delimiter=file_format.delimiter)
+    convert_options = pacsv.ConvertOptions(null_values=_NULL_VALUES, strings_can_be_null=True)
+    schema = pacsv.read_csv(
+        io.BytesIO(sample), read_options=read_options,
+        parse_options=parse_options, convert_options=convert_options
+    ).schema
+    if len(set(schema.names)) != len(schema.names):
+        # pandas يعيد تسمية الأعمدة المكررة، pyarrow لا - pandas renames duplicate columns, pyarrow does not
+        raise pa.ArrowInvalid("duplicate column names")
+
+    types = {}
+    for field in schema:
+        if field.name in NUMERICAL_COLS:
+            # نص في العينة يبقى نصاً وclean_df يحوله - Text in the sample stays text for clean_df to coerce
+            numeric = pa.types.is_integer(field.type) or pa.types.is_floating(field.type) or pa.types.is_null(field.type)
+            types[field.name] = pa.float64() if numeric else pa.string()
+        elif field.name in CATEGORICAL_COLS or pa.types.is_temporal(field.type):
+            types[field.name] = pa.string()
+    convert_options.column_types = types
+    convert_options.include_columns = projection(schema.names, columns) or []
+
+    if chunk_rows:
+        # حجم الكتلة يقارب chunk_rows صفاً - Block size close to chunk_rows rows
+        row_bytes = len(sample) / max(sample.count(b"\n"), 1)
+        read_options.block_size = max(int(chunk_rows * row_bytes), 1 << 16)
+    return {"read_options": read_options, "parse_options": parse_options, "convert_options": convert_options}
+
+
+def _pandas_dtypes() -> dict:
+    """
+    أنواع pandas الصريحة - Explicit pandas types
+
+    الأعمدة الفئوية نص كما في _arrow_options فيعطي المحركان نفس المستويات
+    Categorical columns are text as in _arrow_options, so both engines give the same levels
+    """
+    return {col: str for col in CATEGORICAL_COLS}
+
+
+def _pandas_usecols(path: Path, file_format: FileFormat, columns: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """الأعمدة لـ usecols من سطر العنوان - usecols from the header line"""
+    if columns is None:
+        return None
+    header = pd.read_csv(path, nrows=0, **file_format.csv_kwargs()).columns
+    return projection(list(header), columns)
+
+
+def read_csv(path: Path, file_format: FileFormat, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    قراءة ملف نصي مفصول - Read a delimited text file
+
+    Args:
+        path: مسار الملف - File path
+        file_format: الإعدادات المكتشفة؛ engine يُسجل فيها - Detected settings; the engine is recorded on it
+        columns: الأعمدة المطلوبة - Wanted columns
+
+    Returns:
+        البيانات - Data
+    """
+    if _use_arrow(file_format):
+        try:
+            table = pacsv.read_csv(path, **_arrow_options(path, file_format, columns))
+            file_format.engine = "pyarrow"
+            return table.to_pandas(split_blocks=True, self_destruct=True)
+        except pa.ArrowInvalid as e:
+            logger.warning(f"تعذرت القراءة بـ pyarrow، الرجوع إلى pandas: {e}")
+
+    file_format.engine = "pandas"
+    return pd.read_csv(
+        path, usecols=_pandas_usecols(path, file_format, columns), dtype=_pandas_dtypes(), **file_format.csv_kwargs()
+    )
+
+
+def iter_csv(
+    path: Path,
+    file_format: FileFormat,
+    chunk_rows: int,
+    columns: Optional[Sequence[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    قراءة ملف نصي مفصول على أجزاء - Read a delimited text file in chunks
+
+    pyarrow يستنتج أنواع الأعمدة الأخرى من أول كتلة؛ قيمة مخالفة لاحقاً ترفع
+    ArrowInvalid ويعيد المستدعي القراءة بـ engine="pandas"
+    pyarrow infers the other columns from the first block; a conflicting value
+    later raises ArrowInvalid and the caller re-reads with engine="pandas"
+
+    Args:
+        path: مسار الملف - File path
+        file_format: الإعدادات المكتشفة - Detected settings
+        chunk_rows: عدد الصفوف التقريبي في كل جزء - Approximate rows per chunk
+        columns: الأعمدة المطلوبة - Wanted columns
+
+    Yields:
+        أجزاء البيانات - Data chunks
+    """
+    if file_format.engine is None:
+        file_format.engine = "pyarrow" if _use_arrow(file_format) else "pandas"
+
+    if file_format.engine == "pyarrow":
+        with pacsv.open_csv(path, **_arrow_options(path, file_format, columns, chunk_rows)) as reader:
+            for batch in reader:
+                yield batch.to_pandas(split_blocks=True)
+    else:
+        usecols = _pandas_usecols(path, file_format, columns)
+        with pd.read_csv(
+            path, chunksize=chunk_rows, usecols=usecols, dtype=_pandas_dtypes(), **file_format.csv_kwargs()
+        ) as reader:
+            yield from reader
+
+
+def _excel_engines(file_format: FileFormat) -> List[str]:
+    """محركات Excel المسموحة بالترتيب - Allowed Excel engines in order"""
+    return [
+        engine for engine in _EXCEL_ENGINES[file_format.extension]
+        if engine != "calamine" or (EXCEL_READER_ENGINE == "calamine" and python_calamine is not None)
+    ]
+
+
+def excel_sheet_names(path: Path, file_format: FileFormat) -> List[str]:
+    """
+    أسماء أوراق ملف Excel دون قراءة الخلايا - Sheet names of a workbook without reading cells
+
+    Args:
+        path: مسار الملف - File path
+        file_format: الإعدادات - Settings
+
+    Returns:
+        أسماء الأوراق بالترتيب - Sheet names in order
+    """
+    engines = _excel_engines(file_format)
+    for i, engine in enumerate(engines):
+        try:
+            with pd.ExcelFile(path, engine=engine) as workbook:
+                return [str(name) for name in workbook.sheet_names]
+        except ImportError:
+            continue
+        except Exception:
+            if i == len(engines) - 1:
+                raise
+    raise ValueError(f"No installed engine for {file_format.extension}: {', '.join(engines)}")
+
+
+def read_excel(
+    path: Path,
+    file_format: FileFormat,
+    columns: Optional[Sequence[str]] = None,
+    sheet_name: Union[int, str] = 0
+) -> pd.DataFrame:
+    """
+    قراءة ملف Excel بأسرع محرك متاح - Read an Excel file with the fastest available engine
+
+    المحركان يقرآن كل الخلايا على أي حال، فالأعمدة تُختار بعد القراءة دون قراءة
+    سطر العنوان مرتين
+    Both engines parse every cell anyway, so columns are selected after the
+    read instead of loading the header twice
+
+    Args:
+        path: مسار الملف - File path
+        file_format: الإعدادات؛ engine يُسجل فيها - Settings; the engine is recorded on it
+        columns: الأعمدة المطلوبة - Wanted columns
+        sheet_name: الورقة (رقم أو اسم) - Sheet (index or name)
+
+    Returns:
+        البيانات - Data
+
+    Raises:
+        ValueError: إذا لم يتوفر أي محرك للامتداد - If no engine for the extension is installed
+    """
+    engines = _excel_engines(file_format)
+    for i, engine in enumerate(engines):
+        try:
+            df = pd.read_excel(path, engine=engine, sheet_name=sheet_name)
+            file_format.engine = engine
+            return select_columns(df, columns)
+        except ImportError:
+            continue
+        except Exception as e:
+            if i == len(engines) - 1:
+                raise
+            logger.warning(f"تعذرت قراءة Excel بـ {engine}، تجربة المحرك التالي: {e}")
+    raise ValueError(
+        f"لا يوجد محرك مثبت لقراءة ملفات {file_format.extension} - "
+        f"No installed engine for {file_format.extension}: {', '.join(engines)}"
+    )
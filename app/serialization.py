@@ -0,0 +1,59 @@
+"""
+التسلسل السريع - Fast JSON Serialization
+يستخدم orjson (مع دعم مصفوفات NumPy) عند توفره، وإلا مكتبة json القياسية
+"""
+
+import json
+from typing import Any
+
+import numpy as np
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson مدرج في requirements.txt
+    orjson = None
+
+# orjson يسلسل مصفوفات NumPy مباشرة دون تحويلها إلى قوائم
+# orjson serializes NumPy arrays natively without building Python lists
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(value: Any) -> Any:
+    """تحويل أنواع NumPy للمكتبة القياسية - Convert NumPy types for the stdlib encoder"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    تسلسل إلى JSON بترميز UTF-8 - Serialize to UTF-8 JSON
+
+    Args:
+        content: المحتوى (يقبل مصفوفات NumPy) - Content (NumPy arrays allowed)
+
+    Returns:
+        بايتات JSON - JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    استجابة JSON سريعة - JSON response that skips FastAPI's jsonable_encoder
+
+    تُعيد نقاط النهاية هذه الاستجابة مباشرة فلا يمر المحتوى عبر
+    jsonable_encoder الذي يزور كل قيمة في بايثون.
+    Endpoints return it directly, so the body never goes through
+    jsonable_encoder, which visits every value in Python.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,227 @@
+"""
+أدوات التدفق - Streaming Utilities
+قراءة طلبات NDJSON و CSV تدريجياً وإرسال النتائج أثناء قراءة الطلب
+"""
+
+import asyncio
+import codecs
+import csv
+import json
+import tempfile
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+# (رقم الصف، السجل أو رسالة الخطأ) - (row number, record or error message)
+RowItem = Tuple[int, Union[Dict[str, Any], str]]
+
+# أقصى حجم للتخزين المؤقت في الذاكرة قبل الانتقال إلى القرص
+# In-memory spool size before the buffered request body rolls over to disk
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+# حجم القراءة من التخزين المؤقت - Read size from the spool
+SPOOL_READ_SIZE = 64 * 1024
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    استجابة متدفقة تُرسل أثناء قراءة جسم الطلب - Streams while the request body is still being read
+
+    StreamingResponse في Starlette يستهلك رسائل receive بحثاً عن قطع الاتصال،
+    وهذا يسرق أجزاء جسم الطلب من المولّد. هنا المولّد نفسه يقرأ الطلب،
+    و request.stream() يرفع ClientDisconnect عند انقطاع العميل.
+    Starlette's StreamingResponse drains receive() looking for a disconnect,
+    which would steal body chunks from the generator. Here the generator
+    reads the body itself and request.stream() raises ClientDisconnect.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+class SpooledBody:
+    """
+    جسم طلب مخزّن مؤقتاً - Request body buffered by a background reader
+
+    معظم عملاء HTTP/1.1 يرسلون الجسم كاملاً قبل قراءة الاستجابة؛ لو قرأ
+    المولّد الجسم مباشرة لتوقف عند امتلاء مخزن الإرسال وتجمّد الطرفان.
+    هنا مهمة خلفية تنسخ الجسم إلى ملف مؤقت (في الذاكرة ثم على القرص)
+    فيستمر الرفع دائماً، والمولّد يقرأ من الملف بسرعته.
+    Most HTTP/1.1 clients upload the whole body before reading the
+    response; a generator reading the body directly would stall once the
+    send buffer fills and both sides would deadlock. A background task
+    copies the body into a spooled temp file (memory, then disk) so the
+    upload always progresses, and the generator reads at its own pace.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], max_memory: int = SPOOL_MAX_MEMORY):
+        """
+        تهيئة التخزين المؤقت - Initialize spool
+
+        Args:
+            chunks: أجزاء جسم الطلب - Request body chunks
+            max_memory: الحجم في الذاكرة قبل القرص - Bytes kept in memory before disk
+        """
+        self._chunks = chunks
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self._written = 0
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _fill(self) -> None:
+        """نسخ جسم الطلب إلى الملف - Copy the request body into the spool"""
+        try:
+            async for chunk in self._chunks:
+                if chunk:
+                    self._file.seek(self._written)
+                    self._file.write(chunk)
+                    self._written += len(chunk)
+                    self._changed.set()
+        except BaseException as e:
+            self._error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self._done = True
+            self._changed.set()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """قراءة الجسم بالترتيب - Read the body back in order"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._fill())
+        position = 0
+        try:
+            while True:
+                if position < self._written:
+                    self._file.seek(position)
+                    data = self._file.read(min(self._written - position, SPOOL_READ_SIZE))
+                    position += len(data)
+                    yield data
+                    continue
+                if self._done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                self._changed.clear()
+                await self._changed.wait()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """إيقاف القراءة وحذف الملف - Stop reading and discard the spool"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._file.close()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    تقسيم تدفق البايتات إلى أسطر - Split a byte stream into text lines
+
+    Args:
+        chunks: أجزاء جسم الطلب - Request body chunks
+
+    Yields:
+        الأسطر بدون فواصل الأسطر - Lines without line terminators
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[RowItem]:
+    """
+    قراءة سجلات NDJSON - Read NDJSON records
+
+    Args:
+        lines: أسطر الطلب - Request lines
+
+    Yields:
+        (رقم الصف، السجل أو الخطأ) - (row number, record or error)
+    """
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, f"JSON غير صالح: {e.msg}"
+        else:
+            if isinstance(record, dict):
+                yield row, record
+            else:
+                yield row, "كل سطر يجب أن يكون كائن JSON"
+        row += 1
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[RowItem]:
+    """
+    قراءة سجلات CSV (السطر الأول للعناوين) - Read CSV records (first row is the header)
+
+    الخلايا الفارغة تُحذف لتُطبق القيم الافتراضية للحقول
+    Empty cells are dropped so field defaults apply
+
+    Args:
+        lines: أسطر الطلب - Request lines
+
+    Yields:
+        (رقم الصف، السجل أو الخطأ) - (row number, record or error)
+    """
+    header: List[str] = []
+    buffer = ""
+    row = 0
+    async for line in lines:
+        buffer = f"{buffer}\n{line}" if buffer else line
+        # حقل بين علامتي تنصيص قد يمتد عبر عدة أسطر - A quoted field may span lines
+        if buffer.count('"') % 2:
+            continue
+        text, buffer = buffer, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if not header:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield row, f"عدد الأعمدة {len(values)} لا يطابق العناوين ({len(header)})"
+        else:
+            yield row, {name: value for name, value in zip(header, values) if value != ""}
+        row += 1
+
+    if buffer.strip():
+        yield row, "علامة تنصيص غير مغلقة في نهاية الملف"
+
+
+async def iter_chunks(items: AsyncIterator[Any], size: int) -> AsyncIterator[List[Any]]:
+    """
+    تجميع العناصر في أجزاء ثابتة الحجم - Group items into fixed-size chunks
+
+    Args:
+        items: العناصر - Items
+        size: حجم الجزء - Chunk size
+
+    Yields:
+        قوائم بطول size (الأخير قد يكون أقصر) - Lists of up to size items
+    """
+    size = max(int(size), 1)
+    chunk: List[Any] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,453 @@
+"""
+مهام التدريب - Training Tasks
+دوال تدريب مستقلة قابلة للتشغيل في عملية منفصلة (مجمع العمليات)
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from loguru import logger
+
+from app.config import (
+    FEATURE_COLS, TARGET_COL, RANDOM_STATE,
+    INCREMENTAL_WATERMARK_COL, INCREMENTAL_MIN_ROWS, PREPROCESSING_CACHE_ENABLED
+)
+from app.data_utils import (
+    split_data, validate_dataframe, prepare_employee_data,
+    clean_df, create_promotion_target
+)
+from app.dataset_store import load_cleaned_dataset, save_cleaned_dataset
+from app.incremental import (
+    HOLDOUT_COL, load_base, merge_delta, add_trees, save_snapshot,
+    watermark_value, preprocessing_fingerprint
+)
+from app.model_utils import (
+    ProgressCallback, build_pipeline, build_and_train, evaluate, save_model, get_feature_importance,
+    resolve_validation_mode
+)
+from app import preprocessing_cache
+
+
+class DatasetValidationError(ValueError):
+    """بيانات التدريب غير صالحة - Training data rejected (maps to HTTP 422)"""
+
+    def __init__(self, message_key: str, errors: Optional[List[str]] = None):
+        super().__init__(message_key, errors or [])
+        self.message_key = message_key
+        self.errors = errors or []
+
+
+def _report(progress: Optional[ProgressCallback], stage: str) -> None:
+    """الإبلاغ عن بدء مرحلة - Report the start of a stage"""
+    if progress is not None:
+        progress(stage, None, None)
+
+
+def run_training(
+    df: Optional[pd.DataFrame],
+    model_type: str = "random_forest",
+    use_cross_validation: bool = True,
+    metadata: Optional[Dict[str, Any]] = None,
+    progress: Optional[ProgressCallback] = None,
+    validation_mode: Optional[str] = None,
+    split: Optional[Tuple[Any, Any, Any, Any]] = None,
+    preprocessor: Optional[Any] = None,
+    cv_features: Optional[pd.DataFrame] = None
+) -> Dict[str, Any]:
+    """
+    تقسيم وتدريب وتقييم وحفظ النموذج - Split, train, evaluate and save the model
+
+    Args:
+        df: البيانات المنظفة مع عمود الهدف - Cleaned data with target column
+        model_type: نوع النموذج - Model type
+        use_cross_validation: استخدام التحقق المتقاطع - Use cross-validation
+        metadata: بيانات إضافية للإصدار - Extra version metadata
+        progress: دالة تقرير التقدم - Progress callback (optional)
+        validation_mode: وضع التحقق (refit, cv_reuse, oob) - Validation mode
+        split: تقسيم جاهز (X_train, X_test, y_train, y_test) - Precomputed split (optional)
+        preprocessor: معالج مدرب؛ عندها split يحتوي مصفوفات محولة - Fitted preprocessor; split then holds transformed matrices
+        cv_features: بيانات التدريب الأولية للتحقق المتقاطع مع preprocessor (انظر build_and_train)
+            - Raw training features for CV when preprocessor is given (see build_and_train)
+
+    Returns:
+        المقاييس ومعلومات التدريب - Metrics and training information
+    """
+    if split is None:
+        logger.info("تقسيم البيانات...")
+        split = split_data(df)
+    X_train, X_test, y_train, y_test = split
+
+    logger.info(f"بدء تدريب النموذج ({model_type})...")
+    model = build_and_train(
+        X_train, y_train,
+        model_type=model_type,
+        use_cross_validation=use_cross_validation,
+        progress=progress,
+        validation_mode=validation_mode,
+        preprocessor=preprocessor,
+        cv_features=cv_features
+    )
+
+    logger.info("تقييم النموذج...")
+    _report(progress, "evaluating")
+    # بيانات الاختبار المحولة تذهب للمصنف مباشرة - Transformed test data goes straight to the classifier
+    evaluator = model.named_steps["clf"] if preprocessor is not None else model
+    metrics = evaluate(evaluator, X_test, y_test, detailed=True)
+    # نتائج التحقق (الطيات أو خارج الحقيبة) مع مقاييس الاختبار - Fold / OOB results next to the test metrics
+    validation = getattr(model, "validation_", None)
+    if validation is not None:
+        metrics["validation"] = validation
+
+    logger.info("حفظ النموذج...")
+    _report(progress, "saving")
+    save_model(
+        model,
+        metadata={
+            "model_type": model_type,
+            "training_samples": X_train.shape[0],
+            "test_samples": X_test.shape[0],
+            "validation_mode": validation["mode"] if validation else None,
+            # cv_reuse يحفظ نموذج طية مدرباً على جزء من بيانات التدريب - cv_reuse saves a fold model fit on part of the training rows
+            "training_fraction": validation.get("training_fraction", 1.0) if validation else 1.0,
+            **(metadata or {})
+        }
+    )
+
+    return {
+        "metrics": metrics,
+        "feature_importance": get_feature_importance(model),
+        "model_type": model_type,
+        "model_version": getattr(model, "model_version_", None),
+        "training_samples": X_train.shape[0],
+        "test_samples": X_test.shape[0],
+        "total_features": len(FEATURE_COLS)
+    }
+
+
+def train_from_dataset_file(
+    dataset_path: str,
+    model_type: str = "random_forest",
+    use_cross_validation: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    validation_mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    التدريب من ملف البيانات المنظفة - Train from the cleaned dataset file
+
+    مع PREPROCESSING_CACHE_ENABLED يُحفظ التقسيم والمعالج المدرب والمصفوفات المحولة
+    بمفتاح محتوى الملف والإعدادات، فإعادة التدريب على نفس البيانات تدرب المصنف فقط.
+    المصفوفات المحفوظة للتدريب النهائي فقط: طيات التحقق المتقاطع تدرب معالجاً جديداً
+    على بياناتها الأولية (صفوف التقسيم المحفوظ)، ووضع cv_reuse لا يستخدم الذاكرة
+    لأن نماذج الطيات تحمل معالجاتها.
+    With PREPROCESSING_CACHE_ENABLED the split, fitted preprocessor and
+    transformed matrices are cached under a key of the file contents and
+    settings, so re-training on the same data only fits the classifier.
+    The cached matrices only feed the final fit: CV folds fit a fresh
+    preprocessor on their raw rows (taken by the cached split indices), and
+    cv_reuse skips the cache because its fold models carry their own
+    preprocessors.
+
+    Args:
+        dataset_path: مسار البيانات المنظفة - Cleaned dataset path
+        model_type: نوع النموذج - Model type
+        use_cross_validation: استخدام التحقق المتقاطع - Use cross-validation
+        progress: دالة تقرير التقدم - Progress callback (optional)
+        validation_mode: وضع التحقق (refit, cv_reuse, oob) - Validation mode
+
+    Returns:
+        نتائج التدريب - Training results
+
+    Raises:
+        DatasetValidationError: إذا كانت البيانات فارغة أو غير صالحة - If data is empty or invalid
+    """
+    path = Path(dataset_path)
+    mode = resolve_validation_mode(model_type, validation_mode)
+    folds = use_cross_validation and mode != "oob"
+    use_cache = PREPROCESSING_CACHE_ENABLED and not (folds and mode == "cv_reuse")
+    key = preprocessing_cache.cache_key(path, model_type) if use_cache else None
+    prepared = preprocessing_cache.load(key) if key else None
+    cv_features = None
+
+    if prepared is None:
+        logger.info("قراءة مجموعة البيانات...")
+        _report(progress, "reading")
+        df = load_cleaned_dataset(path, FEATURE_COLS + [TARGET_COL])
+
+        if df.empty:
+            raise DatasetValidationError("dataset_empty")
+
+        _report(progress, "cleaning")
+        is_valid, errors = validate_dataframe(df, require_target=True)
+        if not is_valid:
+            raise DatasetValidationError("invalid_input", errors)
+
+        if key is None:
+            return run_training(
+                df, model_type, use_cross_validation,
+                progress=progress,
+                validation_mode=validation_mode
+            )
+
+        # المعالج يُدرب مرة على بيانات التدريب ويُحفظ مع المصفوفات المحولة
+        # The preprocessor is fit once on the training split and cached with the transformed matrices
+        logger.info("تقسيم وتحويل البيانات...")
+        X_train, X_test, y_train, y_test = split_data(df)
+        cv_features = X_train if folds else None
+        prep = build_pipeline(model_type).named_steps["prep"]
+        prepared = preprocessing_cache.PreparedData(
+            key=key,
+            preprocessor=prep,
+            X_train=prep.fit_transform(X_train, y_train),
+            X_test=prep.transform(X_test),
+            y_train=y_train.to_numpy(),
+            y_test=y_test.to_numpy(),
+            train_index=X_train.index.to_numpy(),
+            test_index=X_test.index.to_numpy()
+        )
+        preprocessing_cache.store(prepared)
+    elif folds:
+        # الطيات تحتاج البيانات الأولية لصفوف التدريب المحفوظة - Folds need the raw rows of the cached training split
+        _report(progress, "reading")
+        cv_features = load_cleaned_dataset(path, FEATURE_COLS).loc[prepared.train_index, FEATURE_COLS]
+
+    return run_training(
+        None, model_type, use_cross_validation,
+        metadata={"preprocessing_cache": {"key": key, "hit": prepared.hit}},
+        progress=progress,
+        validation_mode=validation_mode,
+        split=(prepared.X_train, prepared.X_test, prepared.y_train, prepared.y_test),
+        preprocessor=prepared.preprocessor,
+        cv_features=cv_features
+    )
+
+
+def _holdout_split(df: pd.DataFrame, holdout: pd.Series) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+    """التقسيم حسب قناع صفوف الاختبار - Split by the held-out row mask"""
+    return (
+        df.loc[~holdout, FEATURE_COLS], df.loc[holdout, FEATURE_COLS],
+        df.loc[~holdout, TARGET_COL], df.loc[holdout, TARGET_COL]
+    )
+
+
+def _warm_start(
+    model: Any,
+    df: pd.DataFrame,
+    holdout: pd.Series,
+    is_new: pd.Series,
+    metadata: Dict[str, Any],
+    progress: Optional[ProgressCallback]
+) -> Optional[Dict[str, Any]]:
+    """
+    إضافة أشجار للغابة الحالية وتقييمها وحفظها - Grow the current forest, evaluate and save it
+
+    الأشجار الجديدة تُدرب على صفوف التدريب الجديدة مع عينة بنفس الحجم من الصفوف
+    المحفوظة، حتى لا تنحاز لأحدث الموظفين وحتى تحتوي الفئتين.
+    New trees are fit on the new training rows plus an equal-sized sample of
+    cached training rows, so they do not skew towards the newest employees
+    and always see both classes.
+
+    Returns:
+        نتائج التدريب، أو None إذا لم تحتوِ البيانات فئتين - Training results, None if only one class is present
+    """
+    new_rows = df[is_new & ~holdout]
+    old_rows = df[~is_new & ~holdout]
+    replay = old_rows.sample(n=min(len(new_rows), len(old_rows)), random_state=RANDOM_STATE)
+    fit_rows = pd.concat([new_rows, replay])
+    if fit_rows[TARGET_COL].nunique() < 2:
+        return None
+
+    X_test, y_test = df.loc[holdout, FEATURE_COLS], df.loc[holdout, TARGET_COL]
+
+    logger.info(f"إضافة أشجار على {len(new_rows)} صف جديد و{len(replay)} صف محفوظ")
+    _report(progress, "fitting")
+    previous_trees = model.named_steps["clf"].n_estimators
+    total_trees = add_trees(model, fit_rows[FEATURE_COLS], fit_rows[TARGET_COL])
+    model.validation_ = None
+
+    logger.info("تقييم النموذج...")
+    _report(progress, "evaluating")
+    metrics = evaluate(model, X_test, y_test, detailed=True)
+
+    logger.info("حفظ النموذج...")
+    _report(progress, "saving")
+    metadata["incremental"].update({
+        "trees_added": total_trees - previous_trees,
+        "total_trees": total_trees,
+        "replayed_rows": len(replay)
+    })
+    save_model(
+        model,
+        metadata={
+            "model_type": "random_forest",
+            "training_samples": len(fit_rows),
+            "test_samples": len(X_test),
+            "validation_mode": None,
+            **metadata
+        }
+    )
+
+    return {
+        "metrics": metrics,
+        "feature_importance": get_feature_importance(model),
+        "model_type": "random_forest",
+        "model_version": getattr(model, "model_version_", None),
+        "training_samples": len(fit_rows),
+        "test_samples": len(X_test),
+        "total_features": len(FEATURE_COLS)
+    }
+
+
+def train_from_database_source(
+    connection: Dict[str, Any],
+    table_name: Optional[str] = None,
+    query: Optional[str] = None,
+    limit: Optional[int] = None,
+    model_type: str = "random_forest",
+    use_cross_validation: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    validation_mode: Optional[str] = None,
+    incremental: bool = False
+) -> Dict[str, Any]:
+    """
+    التدريب من قاعدة بيانات SQL Server - Train from SQL Server
+
+    في الوضع التزايدي تُسحب الصفوف بعد علامة model_version.json فقط وتُدمج مع
+    نسخة بيانات التدريب السابقة؛ ثم تُضاف أشجار للغابة، أو يُعاد التدريب من
+    البيانات المدمجة إذا تغير نوع النموذج أو المعالج أو بلغت الغابة حدها.
+    يُعاد تحميل الجدول كاملاً فقط عند غياب النسخة أو تغير مخطط البيانات.
+    In incremental mode only rows past the model_version.json high-water
+    mark are pulled and merged into the cached previous training set; the
+    forest then grows new trees, or is refit on the merged data when the
+    model type or preprocessing changed or the forest hit its size limit.
+    The table is reloaded in full only without a usable snapshot or after a
+    schema change.
+
+    Args:
+        connection: إعدادات الاتصال (host, port, ...) - Connection settings
+        table_name: اسم الجدول - Table name
+        query: استعلام SQL مخصص - Custom SQL query
+        limit: حد عدد الصفوف - Row limit
+        model_type: نوع النموذج - Model type
+        use_cross_validation: استخدام التحقق المتقاطع - Use cross-validation
+        progress: دالة تقرير التقدم - Progress callback (optional)
+        validation_mode: وضع التحقق (refit, cv_reuse, oob) - Validation mode
+        incremental: التدريب على الصفوف الجديدة فقط - Train on newly arrived rows only
+
+    Returns:
+        نتائج التدريب مع معلومات مصدر البيانات - Training results with data source info
+
+    Raises:
+        ConnectionError: إذا فشل الاتصال - If the connection fails
+        DatasetValidationError: إذا كانت البيانات فارغة أو الصفوف الجديدة قليلة - If data is empty or too few rows arrived
+    """
+    from app.database import DatabaseConnection
+
+    _report(progress, "reading")
+    db = DatabaseConnection(**connection)
+    connection_test = db.test_connection()
+    if not connection_test["success"]:
+        raise ConnectionError(connection_test.get("message", "Unknown error"))
+
+    snapshot, base_model, plan = None, None, "full"
+    if incremental:
+        snapshot, base_model, plan = load_base(model_type)
+        logger.info(f"خطة التدريب التزايدي - Incremental plan: {plan}")
+
+    logger.info("تحميل بيانات الموظفين من قاعدة البيانات...")
+    if snapshot is not None:
+        df = db.load_employee_data(
+            table_name=table_name, query=query, limit=limit,
+            watermark_column=INCREMENTAL_WATERMARK_COL, since=snapshot["watermark"]
+        )
+        # العلامة لا تتقدم فتُسحب هذه الصفوف في المرة القادمة - The mark stays put, so these rows come back next run
+        if len(df) < INCREMENTAL_MIN_ROWS:
+            raise DatasetValidationError(
+                "incremental_not_enough_rows", [f"{len(df)} < {INCREMENTAL_MIN_ROWS}"]
+            )
+    else:
+        df = db.load_employee_data(table_name=table_name, query=query, limit=limit)
+        if df.empty:
+            raise DatasetValidationError("dataset_empty")
+    loaded_rows = len(df)
+    if snapshot is None and limit:
+        # تحميل كامل محدود بلا ترتيب: أعلى علامة فيه قد تتخطى صفوفاً لم تُحمّل، فلا تُحفظ
+        # والتشغيل التزايدي التالي يعيد التحميل كاملاً
+        # A limited full load is unordered: its highest mark could skip rows that were
+        # not loaded, so none is recorded and the next incremental run reloads in full
+        watermark = None
+    else:
+        watermark = watermark_value(df)
+    if watermark is None and snapshot is not None:
+        watermark = snapshot["watermark"]
+
+    logger.info("تحضير وتنظيف البيانات...")
+    _report(progress, "cleaning")
+    df = prepare_employee_data(df)
+    df = clean_df(df)
+
+    if snapshot is not None:
+        df, is_new = merge_delta(snapshot["data"], df)
+        holdout = df.pop(HOLDOUT_COL).astype("boolean")
+    else:
+        is_new = pd.Series(True, index=df.index)
+        holdout = pd.Series(pd.NA, index=df.index, dtype="boolean")
+    # الهدف يُحسب على كامل البيانات (يعتمد على الوسيط) - Target is derived over all rows (uses the median)
+    df = create_promotion_target(df)
+
+    # تقسيم الصفوف الجديدة فقط؛ الصفوف المحفوظة تبقى في جهتها السابقة
+    # Only new rows are split; cached rows keep the side they were on
+    fresh = df[holdout.isna()]
+    try:
+        _, X_fresh_test, _, _ = split_data(fresh)
+        holdout[holdout.isna()] = fresh.index.isin(X_fresh_test.index)
+    except ValueError as e:
+        if snapshot is None:
+            raise
+        logger.warning(f"تعذر تقسيم الصفوف الجديدة، استخدامها كلها للتدريب: {e}")
+        holdout[holdout.isna()] = False
+    holdout = holdout.astype(bool)
+
+    # حفظ البيانات المنظفة - Save cleaned data
+    save_cleaned_dataset(df)
+
+    # نكمل التدريب مع التحذيرات - Continue training with warnings
+    is_valid, errors = validate_dataframe(df, require_target=True)
+    if not is_valid:
+        logger.warning(f"تحذيرات في البيانات: {errors}")
+
+    metadata = {
+        "source": "database",
+        "watermark": {"column": INCREMENTAL_WATERMARK_COL, "value": watermark},
+        "preprocessing_fingerprint": preprocessing_fingerprint(model_type),
+        "incremental": {
+            "plan": plan,
+            "loaded_rows": loaded_rows,
+            "new_rows": int(is_new.sum()),
+            "previous_watermark": snapshot["watermark"] if snapshot is not None else None
+        }
+    }
+
+    result = None
+    if base_model is not None:
+        result = _warm_start(base_model, df, holdout, is_new, metadata, progress)
+        if result is None:
+            logger.warning("الصفوف الجديدة من فئة واحدة، إعادة التدريب من البيانات المدمجة")
+            metadata["incremental"]["plan"] = "single_class"
+    if result is None:
+        result = run_training(
+            df, model_type, use_cross_validation,
+            metadata=metadata,
+            progress=progress,
+            validation_mode=validation_mode,
+            split=_holdout_split(df, holdout)
+        )
+
+    save_snapshot(df, holdout, result["model_version"], model_type)
+
+    result["incremental"] = metadata["incremental"]
+    result["watermark"] = metadata["watermark"]
+    result["total_rows"] = len(df)
+    result["total_columns"] = len(df.columns)
+    result["data_warnings"] = errors if not is_valid else []
+    return result
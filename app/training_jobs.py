@@ -0,0 +1,513 @@
+"""
+مهام التدريب غير المتزامنة - Asynchronous Training Jobs
+كل مهمة تدريب تعمل في عملية مستقلة مع تقرير التقدم والإلغاء وسجل محفوظ على القرص
+"""
+
+import asyncio
+import copy
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.config import (
+    TRAINING_JOBS_PATH, TRAINING_MAX_WORKERS, TRAINING_MAX_QUEUE,
+    TRAINING_JOB_NICE, TRAINING_JOB_HISTORY
+)
+from app.executors import ExecutorSaturatedError
+from app.serialization import dumps
+
+# حالات المهمة - Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# نطاق النسبة المئوية لكل مرحلة - Percent range covered by each stage
+STAGE_RANGES: Dict[str, Tuple[int, int]] = {
+    "reading": (0, 10),
+    "cleaning": (10, 20),
+    # البحث عن المعاملات (/train/tune) - Hyperparameter search
+    "tuning": (10, 65),
+    "cross_validation": (20, 65),
+    "fitting": (65, 85),
+    "evaluating": (85, 95),
+    "saving": (95, 100),
+}
+
+
+def _describe_error(error: BaseException) -> Dict[str, Any]:
+    """وصف الخطأ بشكل قابل للتسلسل - Picklable / JSON-safe error description"""
+    return {
+        "type": type(error).__name__,
+        "message": str(error),
+        "message_key": getattr(error, "message_key", None),
+        "errors": list(getattr(error, "errors", None) or [])
+    }
+
+
+def _job_process(fn: Callable, kwargs: Dict[str, Any], events: Any, nice: int) -> None:
+    """
+    نقطة دخول عملية التدريب - Training worker process entry point
+
+    Args:
+        fn: دالة التدريب (تقبل progress) - Training function (accepts progress)
+        kwargs: معاملات الدالة - Function arguments
+        events: طابور الأحداث إلى العملية الأم - Event queue back to the parent
+        nice: خفض أولوية العملية - Process niceness increment
+    """
+    # مجموعة عمليات خاصة حتى يصل الإلغاء إلى عمال joblib أيضاً
+    # Own process group so cancellation also reaches joblib workers
+    if hasattr(os, "setsid"):
+        os.setsid()
+    if nice > 0 and hasattr(os, "nice"):
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+
+    def progress(stage: str, step: Optional[int] = None, total: Optional[int] = None) -> None:
+        events.put(("progress", stage, step, total))
+
+    try:
+        result = fn(progress=progress, **kwargs)
+    except BaseException as e:
+        events.put(("error", _describe_error(e)))
+    else:
+        events.put(("result", result))
+
+
+def _stage_percent(stage: str, step: Optional[int], total: Optional[int]) -> float:
+    """النسبة المئوية التقريبية للتقدم - Approximate overall percent for a stage"""
+    start, end = STAGE_RANGES.get(stage, (0, 0))
+    if step is not None and total:
+        return round(start + (end - start) * min(step, total) / total, 1)
+    return float(start)
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+class TrainingJobManager:
+    """مدير مهام التدريب - Runs training jobs in worker processes and keeps their history"""
+
+    def __init__(
+        self,
+        history_path: Path = TRAINING_JOBS_PATH,
+        max_running: int = TRAINING_MAX_WORKERS,
+        max_queued: int = TRAINING_MAX_QUEUE,
+        history_size: int = TRAINING_JOB_HISTORY,
+        nice: int = TRAINING_JOB_NICE
+    ):
+        """
+        تهيئة المدير - Initialize manager
+
+        Args:
+            history_path: ملف سجل المهام - Job history file
+            max_running: أقصى عدد مهام جارية - Max concurrently running jobs
+            max_queued: أقصى عدد مهام منتظرة - Max jobs waiting to start
+            history_size: عدد المهام المنتهية المحفوظة - Finished jobs kept in history
+            nice: خفض أولوية عمليات التدريب - Niceness of training processes
+        """
+        self.history_path = Path(history_path)
+        self.max_running = max(int(max_running), 1)
+        self.max_queued = max(int(max_queued), 0)
+        self.history_size = max(int(history_size), 1)
+        self.nice = max(int(nice), 0)
+
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending: Deque[str] = deque()
+        self._specs: Dict[str, Tuple[Callable, Dict[str, Any]]] = {}
+        self._processes: Dict[str, Any] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    # ------------------------------------------------------------------
+    # السجل - History
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        """تحميل السجل عند أول استخدام (مع القفل) - Load history on first use (lock held)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.history_path.exists():
+            return
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                jobs = json.load(f)
+        except Exception as e:
+            logger.error(f"فشل في تحميل سجل مهام التدريب: {e}")
+            return
+
+        interrupted = False
+        for job in jobs:
+            # مهمة كانت جارية عند إيقاف الخادم - Job that was running when the server stopped
+            if job.get("status") not in FINISHED_STATES:
+                job["status"] = FAILED
+                job["finished_at"] = job.get("finished_at") or _now()
+                job["error"] = {
+                    "type": "Interrupted",
+                    "message": "server restarted",
+                    "message_key": "training_job_interrupted",
+                    "errors": []
+                }
+                interrupted = True
+            self._jobs[job["job_id"]] = job
+        if interrupted:
+            self._persist()
+
+    def _persist(self) -> None:
+        """حفظ السجل بشكل ذري (مع القفل) - Save history atomically (lock held)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in FINISHED_STATES]
+        for job_id in finished[:max(len(finished) - self.history_size, 0)]:
+            del self._jobs[job_id]
+
+        try:
+            tmp_path = self.history_path.with_name(self.history_path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(list(self._jobs.values()), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.history_path)
+        except Exception as e:
+            logger.error(f"فشل في حفظ سجل مهام التدريب: {e}")
+
+    # ------------------------------------------------------------------
+    # الإرسال والتشغيل - Submission and execution
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable,
+        kwargs: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        إرسال مهمة تدريب - Submit a training job
+
+        Args:
+            kind: نوع المهمة (dataset / database) - Job kind
+            fn: دالة التدريب على مستوى الوحدة (تقبل progress) - Module-level training function
+            kwargs: معاملات الدالة (لا تُحفظ في السجل) - Function arguments (never persisted)
+            params: معاملات تُعرض وتُحفظ مع المهمة - Parameters shown and stored with the job
+
+        Returns:
+            حالة المهمة - Job state
+
+        Raises:
+            ExecutorSaturatedError: إذا امتلأت المهام الجارية والمنتظرة - If running and queued slots are full
+        """
+        with self._lock:
+            self._ensure_loaded()
+            active = len(self._processes) + len(self._pending)
+            if active >= self.max_running + self.max_queued:
+                raise ExecutorSaturatedError(
+                    f"مهام التدريب ممتلئة ({active}/{self.max_running + self.max_queued})"
+                )
+
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "kind": kind,
+                "status": QUEUED,
+                "params": params or {},
+                "progress": {"stage": QUEUED, "step": None, "total": None, "percent": 0.0},
+                "stages": [],
+                "cancel_requested": False,
+                "created_at": _now(),
+                "started_at": None,
+                "finished_at": None,
+                "model_version": None,
+                "result": None,
+                "error": None
+            }
+            self._specs[job_id] = (fn, kwargs)
+            self._futures[job_id] = Future()
+            self._pending.append(job_id)
+            logger.info(f"تم إرسال مهمة التدريب {job_id} ({kind})")
+
+            self._dispatch()
+            self._persist()
+            return self._view(job_id)
+
+    def _dispatch(self) -> None:
+        """تشغيل المهام المنتظرة حسب السعة (مع القفل) - Start queued jobs while capacity allows (lock held)"""
+        while self._pending and len(self._processes) < self.max_running:
+            self._start(self._pending.popleft())
+
+    def _start(self, job_id: str) -> None:
+        """تشغيل مهمة في عملية جديدة (مع القفل) - Start one job in a new process (lock held)"""
+        fn, kwargs = self._specs.pop(job_id)
+        job = self._jobs[job_id]
+
+        # spawn بدلاً من fork لأن العملية الأم تحتوي على خيوط
+        # spawn rather than fork because the parent process runs threads
+        context = multiprocessing.get_context("spawn")
+        events = context.Queue()
+        process = context.Process(
+            target=_job_process,
+            args=(fn, kwargs, events, self.nice),
+            name=f"training-{job_id}"
+        )
+        try:
+            process.start()
+        except Exception as e:
+            logger.error(f"فشل في تشغيل مهمة التدريب {job_id}: {e}")
+            self._complete(job_id, FAILED, error=_describe_error(e))
+            return
+
+        self._processes[job_id] = process
+        job["status"] = RUNNING
+        job["started_at"] = _now()
+        logger.info(f"بدء مهمة التدريب {job_id} في العملية {process.pid}")
+
+        threading.Thread(
+            target=self._monitor,
+            args=(job_id, process, events),
+            name=f"training-monitor-{job_id}",
+            daemon=True
+        ).start()
+
+    def _monitor(self, job_id: str, process: Any, events: Any) -> None:
+        """متابعة أحداث العملية حتى انتهائها - Follow worker events until it exits"""
+        outcome = None
+        while outcome is None:
+            try:
+                message = events.get(timeout=0.5)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                # قراءة أخيرة لما كُتب قبل الخروج - Last read for anything written before exit
+                try:
+                    message = events.get(timeout=0.1)
+                except queue.Empty:
+                    break
+
+            if message[0] == "progress":
+                self._on_progress(job_id, *message[1:])
+            else:
+                outcome = message
+
+        process.join()
+        events.close()
+
+        with self._lock:
+            self._processes.pop(job_id, None)
+            if outcome is not None and outcome[0] == "result":
+                self._complete(job_id, SUCCEEDED, result=json.loads(dumps(outcome[1])))
+            elif outcome is not None:
+                self._complete(job_id, FAILED, error=outcome[1])
+            elif self._jobs[job_id]["cancel_requested"]:
+                self._complete(job_id, CANCELLED)
+            else:
+                self._complete(job_id, FAILED, error={
+                    "type": "WorkerExited",
+                    "message": f"exit code {process.exitcode}",
+                    "message_key": None,
+                    "errors": []
+                })
+            self._dispatch()
+            self._persist()
+
+    def _on_progress(self, job_id: str, stage: str, step: Optional[int], total: Optional[int]) -> None:
+        """
+        تحديث تقدم المهمة في الذاكرة - Update job progress in memory
+
+        السجل يُحفظ عند تغير الحالة فقط؛ آخر تقدم يُكتب مع الحفظ التالي
+        History is written on state changes only; the latest progress goes out with the next write
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            job["progress"] = {
+                "stage": stage,
+                "step": step,
+                "total": total,
+                "percent": _stage_percent(stage, step, total)
+            }
+            if not job["stages"] or job["stages"][-1]["stage"] != stage:
+                job["stages"].append({"stage": stage, "started_at": _now()})
+
+    def _complete(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """إنهاء المهمة وإبلاغ المنتظرين (مع القفل) - Finish a job and wake up waiters (lock held)"""
+        job = self._jobs[job_id]
+        job["status"] = status
+        job["finished_at"] = _now()
+        job["result"] = result
+        job["error"] = error
+        if status == SUCCEEDED:
+            job["progress"] = {"stage": "done", "step": None, "total": None, "percent": 100.0}
+            job["model_version"] = (result or {}).get("model_version")
+
+        logger.info(f"انتهت مهمة التدريب {job_id}: {status}")
+        future = self._futures.pop(job_id, None)
+        if future is not None:
+            future.set_result(None)
+
+    # ------------------------------------------------------------------
+    # الاستعلام والإلغاء - Queries and cancellation
+    # ------------------------------------------------------------------
+
+    def _view(self, job_id: str, include_result: bool = True) -> Dict[str, Any]:
+        """نسخة من حالة المهمة (مع القفل) - Copy of the job state (lock held)"""
+        job = self._jobs[job_id]
+        if include_result:
+            return copy.deepcopy(job)
+        return copy.deepcopy({k: v for k, v in job.items() if k != "result"})
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        حالة مهمة - Job state
+
+        Args:
+            job_id: معرف المهمة - Job id
+
+        Returns:
+            حالة المهمة أو None - Job state or None
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if job_id not in self._jobs:
+                return None
+            return self._view(job_id)
+
+    def list(self, limit: int = 20, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        سجل المهام (الأحدث أولاً) - Job history, newest first
+
+        Args:
+            limit: الحد الأقصى - Max jobs
+            status: تصفية حسب الحالة - Status filter
+
+        Returns:
+            المهام بدون النتائج الكاملة - Jobs without full results
+        """
+        with self._lock:
+            self._ensure_loaded()
+            jobs = []
+            for job_id in reversed(self._jobs):
+                if status and self._jobs[job_id]["status"] != status:
+                    continue
+                jobs.append(self._view(job_id, include_result=False))
+                if len(jobs) >= limit:
+                    break
+            return jobs
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        إلغاء مهمة - Cancel a job
+
+        المهمة المنتظرة تُلغى فوراً، والجارية تُنهى عمليتها (وعمال joblib التابعة لها).
+        A queued job is cancelled at once; a running job has its process
+        (and its joblib workers) terminated.
+
+        Args:
+            job_id: معرف المهمة - Job id
+
+        Returns:
+            حالة المهمة أو None إذا لم توجد - Job state or None if unknown
+
+        Raises:
+            ValueError: إذا كانت المهمة منتهية - If the job already finished
+        """
+        with self._lock:
+            self._ensure_loaded()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] in FINISHED_STATES:
+                raise ValueError(f"مهمة التدريب {job_id} منتهية ({job['status']})")
+
+            job["cancel_requested"] = True
+            if job["status"] == QUEUED:
+                self._pending.remove(job_id)
+                self._specs.pop(job_id, None)
+                self._complete(job_id, CANCELLED)
+            else:
+                logger.info(f"إلغاء مهمة التدريب {job_id}")
+                self._terminate(self._processes[job_id])
+            self._persist()
+            return self._view(job_id)
+
+    @staticmethod
+    def _terminate(process: Any) -> None:
+        """إنهاء عملية التدريب ومجموعتها - Terminate a training process and its group"""
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(process.pid, signal.SIGTERM)
+                return
+            except (ProcessLookupError, PermissionError):
+                # لم تُنشئ العملية مجموعتها بعد - Process has not created its group yet
+                pass
+        process.terminate()
+
+    async def wait(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        انتظار انتهاء مهمة دون حجب حلقة الأحداث - Wait for a job without blocking the loop
+
+        Args:
+            job_id: معرف المهمة - Job id
+
+        Returns:
+            الحالة النهائية للمهمة - Final job state
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            await asyncio.wrap_future(future)
+        return self.get(job_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        مقاييس المهام - Job counters
+
+        Returns:
+            عدد المهام حسب الحالة - Jobs per state
+        """
+        with self._lock:
+            self._ensure_loaded()
+            counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {
+                "max_running": self.max_running,
+                "max_queued": self.max_queued,
+                **counts
+            }
+
+    def shutdown(self) -> None:
+        """إلغاء المهام الجارية والمنتظرة عند إيقاف الخادم - Cancel running and queued jobs on shutdown"""
+        with self._lock:
+            processes = list(self._processes.values())
+            for job_id in list(self._pending) + list(self._processes):
+                try:
+                    self.cancel(job_id)
+                except ValueError:
+                    pass
+
+        # إعطاء خيوط المتابعة فرصة لتسجيل الإلغاء - Let monitor threads record the cancellation
+        for process in processes:
+            process.join(timeout=5)
+
+
+# إنشاء نسخة عامة - Create global instance
+training_jobs = TrainingJobManager()
@@ -0,0 +1,172 @@
+"""
+محرك أشجار مُجمّع - Compiled Array-Based Tree Engine
+يحوّل غابة RandomForest المدربة إلى مصفوفات NumPy مسطحة ويقيّم جميع الأشجار بمرور موجه
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.pipeline import Pipeline
+
+
+class CompiledForest:
+    """غابة مُجمّعة - Flat-array forest evaluator"""
+
+    def __init__(self, model: Pipeline):
+        """
+        تجميع خط الأنابيب - Compile a fitted pipeline
+
+        Args:
+            model: خط أنابيب مدرب بخطوتي prep و clf - Fitted pipeline with 'prep' and 'clf' steps
+
+        Raises:
+            ValueError: إذا لم يكن المصنف غابة أشجار - If the classifier is not a tree forest
+        """
+        clf = model.named_steps['clf']
+        if not isinstance(clf, (RandomForestClassifier, ExtraTreesClassifier)):
+            raise ValueError(f"المحرك المُجمّع يدعم غابات الأشجار فقط، وليس {type(clf).__name__}")
+        if clf.n_outputs_ != 1:
+            raise ValueError("المحرك المُجمّع يدعم مخرجاً واحداً فقط")
+
+        self.prep = model.named_steps['prep']
+        self.classes_ = clf.classes_
+        self.n_features = clf.n_features_in_
+        self.n_trees = len(clf.estimators_)
+
+        features, thresholds, lefts, rights, values, missing_left = [], [], [], [], [], []
+        roots = np.empty(self.n_trees, dtype=np.int64)
+        max_depth = 0
+        offset = 0
+
+        for i, estimator in enumerate(clf.estimators_):
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n_nodes, dtype=np.int64)
+
+            # الأوراق تشير إلى نفسها لتبقى ثابتة أثناء المرور
+            # Leaves point at themselves so they stay put during traversal
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(tree.threshold.astype(np.float64))
+
+            # احتمالات كل عقدة (مطبّعة كما في predict_proba) - Per-node class probabilities
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            if hasattr(tree, "missing_go_to_left"):
+                missing_left.append(np.asarray(tree.missing_go_to_left, dtype=bool))
+            else:
+                missing_left.append(np.ones(n_nodes, dtype=bool))
+
+            roots[i] = offset
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.value = np.concatenate(values)
+        self.missing_go_to_left = np.concatenate(missing_left)
+        self.is_leaf = self.left == np.arange(offset)
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_nodes = offset
+
+    def transform(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """
+        تحويل الإدخال إلى مصفوفة float32 - Encode input as a float32 matrix
+
+        Args:
+            X: بيانات خام أو مصفوفة مُرمّزة مسبقاً - Raw frame or pre-encoded matrix
+
+        Returns:
+            المصفوفة المُرمّزة - Encoded matrix
+        """
+        if isinstance(X, pd.DataFrame):
+            X = self.prep.transform(X)
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        # sklearn يحوّل المدخلات إلى float32 قبل المرور على الأشجار
+        # sklearn casts inputs to float32 before walking the trees
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def apply(self, Xt: np.ndarray) -> np.ndarray:
+        """
+        إيجاد ورقة كل عينة في كل شجرة - Find the leaf reached in every tree
+
+        Args:
+            Xt: المصفوفة المُرمّزة - Encoded matrix (n_samples, n_features)
+
+        Returns:
+            فهارس الأوراق (n_samples, n_trees) - Global leaf indices
+        """
+        n_samples = Xt.shape[0]
+        flat_X = Xt.ravel()
+
+        # عقدة حالية لكل زوج (عينة، شجرة) - Current node per (sample, tree) pair
+        node = np.tile(self.roots, n_samples)
+        row_offset = np.repeat(np.arange(n_samples, dtype=np.int64) * self.n_features, self.n_trees)
+        active = np.flatnonzero(~self.is_leaf[node])
+
+        # نتابع فقط الأزواج التي لم تصل إلى ورقة - Only keep walking pairs not yet at a leaf
+        while active.size:
+            current = node[active]
+            x = flat_X[row_offset[active] + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            nan_mask = np.isnan(x)
+            if nan_mask.any():
+                go_left[nan_mask] = self.missing_go_to_left[current[nan_mask]]
+            current = np.where(go_left, self.left[current], self.right[current])
+            node[active] = current
+            active = active[~self.is_leaf[current]]
+
+        return node.reshape(n_samples, self.n_trees)
+
+    def predict_proba(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """
+        احتمالات الفئات - Class probabilities (mean over trees)
+
+        Args:
+            X: بيانات خام أو مصفوفة مُرمّزة - Raw frame or encoded matrix
+
+        Returns:
+            الاحتمالات (n_samples, n_classes) - Probabilities
+        """
+        leaves = self.apply(self.transform(X))
+        return self.value[leaves].mean(axis=1)
+
+    def predict_with_proba(self, X: Union[pd.DataFrame, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        التصنيفات والاحتمالات في تمريرة واحدة - Labels and probabilities in one pass
+
+        Args:
+            X: بيانات خام أو مصفوفة مُرمّزة - Raw frame or encoded matrix
+
+        Returns:
+            (التصنيفات، الاحتمالات) - (labels, probabilities)
+        """
+        proba = self.predict_proba(X)
+        return self.classes_.take(np.argmax(proba, axis=1), axis=0), proba
+
+
+def is_compilable(model: Pipeline) -> bool:
+    """
+    هل يمكن تجميع النموذج - Whether the model can be compiled
+
+    Args:
+        model: النموذج - Model
+
+    Returns:
+        True إذا كان المصنف غابة أشجار - True if the classifier is a tree forest
+    """
+    steps = getattr(model, "named_steps", {})
+    return "prep" in steps and isinstance(
+        steps.get("clf"), (RandomForestClassifier, ExtraTreesClassifier)
+    )
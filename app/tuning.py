@@ -0,0 +1,363 @@
+"""
+البحث عن المعاملات - Hyperparameter Search
+تنصيف متتالي على غرار HalvingRandomSearchCV بعدد أنوية محدود ونقاط حفظ للاستئناف
+HalvingRandomSearchCV-style successive halving on a bounded core budget, checkpointed for resume
+"""
+
+import hashlib
+import json
+import math
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from loguru import logger
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+from threadpoolctl import threadpool_limits
+
+from app.config import (
+    TUNING_DIR, TUNING_SEARCH_SPACES, TUNING_N_JOBS, TUNING_N_CANDIDATES, TUNING_FACTOR,
+    TUNING_MIN_RESOURCES, TUNING_CV_FOLDS, TUNING_SCORING, RANDOM_STATE, FEATURE_COLS, TARGET_COL
+)
+from app.dataset_store import load_cleaned_dataset
+from app.data_utils import split_data, validate_dataframe
+from app.model_utils import (
+    ProgressCallback, build_pipeline, evaluate, save_model, get_feature_importance,
+    _fit_and_score_fold
+)
+from app.training import DatasetValidationError, _report
+
+
+def _file_digest(path: Path) -> str:
+    """بصمة محتوى ملف البيانات - Digest of the dataset file contents"""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _plan_rounds(n_candidates: int, factor: int, n_samples: int, min_resources: int) -> List[Tuple[int, int]]:
+    """
+    جدول الجولات (عدد المرشحين، عدد الصفوف) - Round schedule (candidates, rows)
+
+    كما في HalvingRandomSearchCV(min_resources="exhaust"): الجولة الأخيرة تستخدم كل الصفوف
+    As HalvingRandomSearchCV(min_resources="exhaust"): the last round uses every row
+    """
+    needed = 1
+    while factor ** needed <= n_candidates:
+        needed += 1
+    possible = 1
+    while min_resources * factor ** possible <= n_samples:
+        possible += 1
+    n_rounds = max(min(needed, possible), 1)
+
+    first = n_samples // factor ** (n_rounds - 1)
+    rounds = [
+        (math.ceil(n_candidates / factor ** i), min(first * factor ** i, n_samples))
+        for i in range(n_rounds)
+    ]
+    rounds[-1] = (rounds[-1][0], n_samples)
+    return rounds
+
+
+def _candidate_params(model_type: str, params: Dict[str, Any], n_jobs: int) -> Dict[str, Any]:
+    """معاملات المصنف مع حد الأنوية - Classifier parameters with the core budget applied"""
+    if model_type == "random_forest":
+        return {**params, "n_jobs": n_jobs}
+    return dict(params)
+
+
+def _score_fold(
+    candidate: int,
+    model_type: str,
+    params: Dict[str, Any],
+    X: pd.DataFrame,
+    y: pd.Series,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray
+) -> Tuple[int, Dict[str, float], float]:
+    """تدريب وتقييم مرشح على طية واحدة بخيط واحد - Fit and score one candidate fold on a single thread"""
+    model = build_pipeline(model_type, clf_params=_candidate_params(model_type, params, 1))
+    # HistGradientBoosting يستخدم OpenMP؛ كل عامل يأخذ نواة واحدة فقط
+    # HistGradientBoosting uses OpenMP; each worker gets exactly one core
+    with threadpool_limits(limits=1):
+        _, scores, fit_time = _fit_and_score_fold(model, X, y, train_idx, test_idx, False)
+    return candidate, scores, fit_time
+
+
+class SearchCheckpoint:
+    """نقطة حفظ البحث على القرص - On-disk search checkpoint"""
+
+    def __init__(self, path: Path):
+        """
+        تهيئة نقطة الحفظ - Initialize checkpoint
+
+        Args:
+            path: مسار ملف JSON - JSON file path
+        """
+        self.path = path
+        self.state: Dict[str, Any] = {}
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"تعذر قراءة نقطة حفظ البحث {path}: {e}")
+
+    def save(self) -> None:
+        """كتابة ذرية - Atomic write"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def successive_halving(
+    X: pd.DataFrame,
+    y: pd.Series,
+    model_type: str,
+    checkpoint: SearchCheckpoint,
+    n_candidates: int = TUNING_N_CANDIDATES,
+    factor: int = TUNING_FACTOR,
+    random_state: int = RANDOM_STATE,
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    البحث بالتنصيف المتتالي - Successive-halving search
+
+    كل جولة تقيّم المرشحين الباقين بالتحقق المتقاطع على عينة طبقية تكبر بمعامل
+    factor، ويبقى أفضل 1/factor منهم. طيات كل المرشحين تُوزع على TUNING_N_JOBS
+    عملية، وكل مرشح مكتمل يُحفظ فوراً فيُتخطى عند الاستئناف.
+    Each round cross-validates the surviving candidates on a stratified
+    sample that grows by `factor`, keeping the best 1/factor. All candidate
+    folds are spread over TUNING_N_JOBS processes and every finished
+    candidate is checkpointed at once, so a resumed search skips it.
+
+    Args:
+        X: ميزات التدريب - Training features
+        y: أهداف التدريب - Training targets
+        model_type: نوع النموذج - Model type
+        checkpoint: نقطة الحفظ - Search checkpoint
+        n_candidates: عدد المرشحين - Candidate count
+        factor: معامل التنصيف - Halving factor
+        random_state: البذرة - Seed
+        progress: دالة تقرير التقدم - Progress callback (optional)
+
+    Returns:
+        حالة البحث (المرشحون والجولات) - Search state (candidates and rounds)
+    """
+    state = checkpoint.state
+    if not state.get("candidates"):
+        space = TUNING_SEARCH_SPACES[model_type]
+        state.update({
+            "model_type": model_type,
+            "scoring": TUNING_SCORING,
+            "candidates": list(ParameterSampler(space, n_iter=n_candidates, random_state=random_state)),
+            "rounds": [],
+            "status": "running"
+        })
+        checkpoint.save()
+    else:
+        logger.info(f"استئناف البحث من {checkpoint.path} - Resuming search")
+
+    candidates = state["candidates"]
+    schedule = _plan_rounds(len(candidates), factor, len(y), TUNING_MIN_RESOURCES)
+    total = sum(n for n, _ in schedule)
+    done = 0
+    survivors = list(range(len(candidates)))
+
+    for round_index, (_, resources) in enumerate(schedule):
+        if round_index < len(state["rounds"]):
+            record = state["rounds"][round_index]
+        else:
+            record = {"resources": resources, "candidates": survivors, "results": {}}
+            state["rounds"].append(record)
+            checkpoint.save()
+
+        # عينة طبقية ثابتة لكل جولة - Fixed stratified sample per round
+        positions = np.arange(len(y))
+        if resources < len(y):
+            positions, _ = train_test_split(
+                positions, train_size=resources, stratify=y,
+                random_state=random_state + round_index
+            )
+        X_round, y_round = X.iloc[positions], y.iloc[positions]
+        folds = list(StratifiedKFold(TUNING_CV_FOLDS, shuffle=True, random_state=random_state).split(X_round, y_round))
+
+        pending = [c for c in record["candidates"] if str(c) not in record["results"]]
+        done += len(record["candidates"]) - len(pending)
+        logger.info(
+            f"الجولة {round_index + 1}/{len(schedule)}: {len(record['candidates'])} مرشح على {resources} صف "
+            f"({len(pending)} متبقٍ)"
+        )
+
+        outputs = Parallel(n_jobs=TUNING_N_JOBS, return_as="generator_unordered")(
+            delayed(_score_fold)(c, model_type, candidates[c], X_round, y_round, train_idx, test_idx)
+            for c in pending
+            for train_idx, test_idx in folds
+        )
+        fold_results: Dict[int, List[Tuple[Dict[str, float], float]]] = defaultdict(list)
+        for candidate, scores, fit_time in outputs:
+            fold_results[candidate].append((scores, fit_time))
+            if len(fold_results[candidate]) < len(folds):
+                continue
+            values = np.array([s.get(TUNING_SCORING, np.nan) for s, _ in fold_results[candidate]])
+            record["results"][str(candidate)] = {
+                "score": float(np.nanmean(values)) if not np.isnan(values).all() else None,
+                "std": float(np.nanstd(values)) if not np.isnan(values).all() else None,
+                "fit_time": round(sum(t for _, t in fold_results[candidate]), 3)
+            }
+            checkpoint.save()
+            done += 1
+            if progress is not None:
+                progress("tuning", done, total)
+
+        ranked = sorted(
+            record["candidates"],
+            key=lambda c: record["results"][str(c)]["score"] if record["results"][str(c)]["score"] is not None else -np.inf,
+            reverse=True
+        )
+        keep = schedule[round_index + 1][0] if round_index + 1 < len(schedule) else 1
+        survivors = ranked[:keep]
+        best = record["results"][str(ranked[0])]
+        logger.info(f"أفضل {TUNING_SCORING} في الجولة {round_index + 1}: {best['score']} ({candidates[ranked[0]]})")
+
+    state["best_candidate"] = survivors[0]
+    checkpoint.save()
+    return state
+
+
+def tune_from_dataset_file(
+    dataset_path: str,
+    model_type: str = "random_forest",
+    n_candidates: int = TUNING_N_CANDIDATES,
+    factor: int = TUNING_FACTOR,
+    random_state: int = RANDOM_STATE,
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    البحث عن أفضل المعاملات ونشر النموذج - Search hyperparameters and promote the best model
+
+    معرف البحث مشتق من محتوى البيانات والإعدادات، فإعادة نفس الطلب بعد انقطاع
+    تستأنف من نقطة الحفظ. أفضل مرشح يُدرب على كل بيانات التدريب ويُحفظ عبر save_model.
+    The search id derives from the data contents and settings, so
+    resubmitting the same request after an interruption resumes from the
+    checkpoint. The best candidate is refit on all training rows and saved
+    through save_model.
+
+    Args:
+        dataset_path: مسار البيانات المنظفة - Cleaned dataset path
+        model_type: نوع النموذج - Model type
+        n_candidates: عدد المرشحين - Candidate count
+        factor: معامل التنصيف - Halving factor
+        random_state: البذرة - Seed
+        progress: دالة تقرير التقدم - Progress callback (optional)
+
+    Returns:
+        المقاييس وأفضل المعاملات وملخص الجولات - Metrics, best parameters and round summary
+
+    Raises:
+        DatasetValidationError: إذا كانت البيانات فارغة أو غير صالحة - If data is empty or invalid
+        ValueError: إذا لم يكن لنوع النموذج فضاء بحث - If the model type has no search space
+    """
+    if model_type not in TUNING_SEARCH_SPACES:
+        raise ValueError(f"لا يوجد فضاء بحث لـ {model_type} - No search space for model type")
+
+    _report(progress, "reading")
+    path = Path(dataset_path)
+    df = load_cleaned_dataset(path, FEATURE_COLS + [TARGET_COL])
+    if df.empty:
+        raise DatasetValidationError("dataset_empty")
+    is_valid, errors = validate_dataframe(df, require_target=True)
+    if not is_valid:
+        raise DatasetValidationError("invalid_input", errors)
+
+    key = json.dumps({
+        "data": _file_digest(path),
+        "model_type": model_type,
+        "n_candidates": n_candidates,
+        "factor": factor,
+        "random_state": random_state,
+        "space": TUNING_SEARCH_SPACES[model_type],
+        "folds": TUNING_CV_FOLDS,
+        "scoring": TUNING_SCORING
+    }, sort_keys=True, default=repr)
+    search_id = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+    checkpoint = SearchCheckpoint(TUNING_DIR / f"{search_id}.json")
+    resumed = sum(len(r["results"]) for r in checkpoint.state.get("rounds", []))
+
+    X_train, X_test, y_train, y_test = split_data(df)
+    state = successive_halving(
+        X_train, y_train, model_type, checkpoint,
+        n_candidates=n_candidates, factor=factor,
+        random_state=random_state, progress=progress
+    )
+    best_params = state["candidates"][state["best_candidate"]]
+    best_score = state["rounds"][-1]["results"][str(state["best_candidate"])]["score"]
+
+    logger.info(f"تدريب أفضل مرشح على كل بيانات التدريب: {best_params}")
+    _report(progress, "fitting")
+    model = build_pipeline(model_type, clf_params=_candidate_params(model_type, best_params, TUNING_N_JOBS))
+    with threadpool_limits(limits=TUNING_N_JOBS):
+        model.fit(X_train, y_train)
+    model.validation_ = None
+
+    _report(progress, "evaluating")
+    metrics = evaluate(model, X_test, y_test, detailed=True)
+
+    _report(progress, "saving")
+    tuning = {
+        "search_id": search_id,
+        "scoring": TUNING_SCORING,
+        "best_params": best_params,
+        "best_score": best_score,
+        "candidates": len(state["candidates"]),
+        "resumed_candidates": resumed
+    }
+    save_model(
+        model,
+        metadata={
+            "model_type": model_type,
+            "training_samples": len(X_train),
+            "test_samples": len(X_test),
+            "validation_mode": None,
+            "tuning": tuning
+        }
+    )
+
+    state["status"] = "completed"
+    state["model_version"] = getattr(model, "model_version_", None)
+    checkpoint.save()
+
+    rounds = []
+    for record in state["rounds"]:
+        scores = [r["score"] for r in record["results"].values() if r["score"] is not None]
+        rounds.append({
+            "resources": record["resources"],
+            "candidates": len(record["candidates"]),
+            "best_score": max(scores) if scores else None,
+            "fit_time": round(sum(r["fit_time"] for r in record["results"].values()), 3)
+        })
+    last = state["rounds"][-1]["results"]
+    leaderboard = sorted(
+        ({"params": state["candidates"][int(c)], **r} for c, r in last.items()),
+        key=lambda r: r["score"] if r["score"] is not None else -np.inf,
+        reverse=True
+    )
+
+    return {
+        "metrics": metrics,
+        "feature_importance": get_feature_importance(model),
+        "model_type": model_type,
+        "model_version": state["model_version"],
+        "tuning": {**tuning, "rounds": rounds, "leaderboard": leaderboard[:10]},
+        "training_samples": len(X_train),
+        "test_samples": len(X_test),
+        "total_features": X_train.shape[1]
+    }
@@ -0,0 +1,159 @@
+"""
+ذاكرة الملفات المرفوعة - Upload Result Cache
+بصمة الملف تُحسب أثناء حفظه؛ الرفع المتكرر لنفس المحتوى يستعيد البيانات المنظفة
+ونتيجة الرفع المحفوظتين بدلاً من القراءة والتنظيف والحفظ من جديد
+The file hash is computed while the upload is written to disk; a repeat
+upload of the same content restores the stored cleaned dataset and upload
+result instead of parsing, cleaning and writing again
+
+البيانات المنظفة تُربط (hard link) ولا تُنسخ: كل كتابة للمخزن تستبدل الملف
+بشكل ذري (os.replace) فلا تُعدل النسخة المحفوظة
+Cleaned datasets are hard-linked, not copied: every store write replaces the
+file atomically (os.replace), so the cached copy is never modified in place
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+
+from loguru import logger
+
+from app.config import (
+    UPLOAD_CACHE_DIR, UPLOAD_CACHE_ENABLED, UPLOAD_CACHE_MAX_ENTRIES, CLEANED_DATASET_PATH,
+    UPLOAD_PROJECT_COLUMNS, NUMERICAL_COLS, CATEGORICAL_COLS, TARGET_COL, NUMERIC_VALUE_RANGES
+)
+
+_META = "meta.json"
+_DATASET = "cleaned_dataset.feather"
+_BLOCK = 1 << 20
+
+
+def save_and_hash(source: BinaryIO, path: Path) -> str:
+    """
+    حفظ الملف المرفوع وحساب بصمته في قراءة واحدة - Save an upload and hash it in one pass
+
+    Args:
+        source: محتوى الملف - Upload stream
+        path: مسار الحفظ - Target path
+
+    Returns:
+        بصمة المحتوى السداسية عشرية - Hex digest of the content
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "wb") as target:
+        for block in iter(lambda: source.read(_BLOCK), b""):
+            digest.update(block)
+            target.write(block)
+    return digest.hexdigest()
+
+
+def cache_key(content_hash: str, file_extension: str) -> str:
+    """
+    مفتاح المحتوى مع إعدادات القراءة والتنظيف - Content key plus read and cleaning settings
+
+    Args:
+        content_hash: بصمة الملف - File hash from save_and_hash
+        file_extension: امتداد الملف - File extension
+
+    Returns:
+        بصمة سداسية عشرية - Hex digest
+    """
+    settings = {
+        "content": content_hash,
+        "extension": file_extension,
+        "project_columns": UPLOAD_PROJECT_COLUMNS,
+        "numerical": NUMERICAL_COLS,
+        "categorical": CATEGORICAL_COLS,
+        "target": TARGET_COL,
+        "ranges": NUMERIC_VALUE_RANGES,
+    }
+    return hashlib.blake2b(json.dumps(settings, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _link(source: Path, target: Path) -> None:
+    """ربط الملف أو نسخه إن تعذر الربط - Hard-link a file, copying when linking is not possible"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def load(key: str, target: Path = CLEANED_DATASET_PATH) -> Optional[Dict[str, Any]]:
+    """
+    استعادة نتيجة رفع سابق - Restore a previous upload
+
+    Args:
+        key: مفتاح المحتوى - Content key
+        target: مسار البيانات المنظفة - Cleaned dataset path
+
+    Returns:
+        استجابة الرفع المحفوظة أو None - Stored upload response, or None on a miss
+    """
+    if not UPLOAD_CACHE_ENABLED:
+        return None
+    directory = UPLOAD_CACHE_DIR / key
+    meta_path = directory / _META
+    if not meta_path.exists():
+        return None
+    cached = directory / _DATASET
+    tmp_path = target.with_name(f"{target.name}.{key[:8]}.{os.getpid()}.tmp")
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            response = json.load(f)["response"]
+        # الملف الحالي رابط لنفس النسخة: rename لا يفعل شيئاً ويبقى الملف المؤقت
+        # The live file already links the cached copy: rename would be a no-op and leave the tmp file
+        if not (target.exists() and os.path.samefile(cached, target)):
+            _link(cached, tmp_path)
+            os.replace(tmp_path, target)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"تعذر استعادة الرفع المحفوظ {key}: {e}")
+        return None
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    # آخر استخدام يحدد ما يُحذف أولاً - Last use decides eviction order
+    os.utime(meta_path)
+    logger.info(f"استخدام نتيجة الرفع المحفوظة {key[:12]} - Upload cache hit")
+    return response
+
+
+def store(key: str, dataset_path: Path, response: Dict[str, Any]) -> None:
+    """
+    حفظ نتيجة الرفع بشكل ذري - Atomically store an upload result
+
+    Args:
+        key: مفتاح المحتوى - Content key
+        dataset_path: البيانات المنظفة الناتجة - Resulting cleaned dataset
+        response: استجابة الرفع (قابلة للتحويل إلى JSON) - Upload response (JSON-serializable)
+    """
+    if not UPLOAD_CACHE_ENABLED:
+        return
+    directory = UPLOAD_CACHE_DIR / key
+    if directory.exists():
+        return
+    tmp_dir = UPLOAD_CACHE_DIR / f".{key}.{os.getpid()}.tmp"
+    try:
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        _link(dataset_path, tmp_dir / _DATASET)
+        with open(tmp_dir / _META, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "response": response}, f, ensure_ascii=False)
+        os.replace(tmp_dir, directory)
+    except OSError as e:
+        # عملية أخرى حفظت نفس المفتاح أو القرص ممتلئ - Another process stored it first, or the disk is full
+        logger.warning(f"تعذر حفظ نتيجة الرفع: {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return
+    logger.info(f"تم حفظ نتيجة الرفع {key[:12]} في {directory}")
+    _prune()
+
+
+def _prune() -> None:
+    """حذف الأقدم استخداماً فوق الحد - Drop least recently used entries over the limit"""
+    entries = [p for p in UPLOAD_CACHE_DIR.iterdir() if (p / _META).exists()]
+    entries.sort(key=lambda p: (p / _META).stat().st_mtime, reverse=True)
+    for stale in entries[max(UPLOAD_CACHE_MAX_ENTRIES, 1):]:
+        shutil.rmtree(stale, ignore_errors=True)
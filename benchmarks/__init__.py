@@ -0,0 +1,4 @@
+"""
+سكربتات قياس الأداء - Performance benchmarks
+تشغيل من جذر المشروع: python -m benchmarks.<name>
+"""
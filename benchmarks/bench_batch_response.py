@@ -0,0 +1,92 @@
+"""
+قياس تسلسل استجابة التنبؤ الجماعي - Batch prediction response serialization benchmark
+
+يقارن المسار القديم (قاموس لكل موظف + jsonable_encoder + json) بالأعمدة
+الموجهة مع orjson بالشكلين rows و columnar.
+
+Usage:
+    python -m benchmarks.bench_batch_response
+"""
+
+import json
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from app.i18n import get_message
+from app.serialization import FastJSONResponse
+from routers.predict import _format_result, _result_columns
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    """أفضل زمن من عدة تكرارات - Best wall time over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _legacy(preds, probas, lang):
+    """المسار السابق - Previous per-row dict path through FastAPI's default encoder"""
+    results = []
+    for i, (pred, proba) in enumerate(zip(preds, probas)):
+        results.append({
+            "employee_index": i,
+            "prediction": get_message("promotion_eligible", lang) if pred == 1 else get_message("promotion_not_eligible", lang),
+            "promotion_eligible": bool(pred),
+            "probability": {"no": round(proba[0], 4), "yes": round(proba[1], 4)},
+            "confidence": round(max(proba), 4)
+        })
+    body = {"total_employees": len(preds), "results": results}
+    return json.dumps(jsonable_encoder(body), ensure_ascii=False).encode("utf-8")
+
+
+def _rows(preds, probas, lang):
+    """الشكل الحالي عبر الأعمدة - Row shape built from columns"""
+    columns = _result_columns(preds, probas)
+    labels = [get_message("promotion_not_eligible", lang), get_message("promotion_eligible", lang)]
+    results = [
+        {"employee_index": i, "prediction": labels[e], "promotion_eligible": e,
+         "probability": {"no": n, "yes": y}, "confidence": c}
+        for i, e, n, y, c in zip(
+            columns["employee_index"].tolist(), columns["promotion_eligible"].tolist(),
+            columns["probability_no"].tolist(), columns["probability_yes"].tolist(),
+            columns["confidence"].tolist()
+        )
+    ]
+    return FastJSONResponse({"total_employees": len(preds), "results": results}).body
+
+
+def _columnar(preds, probas, lang):
+    """الشكل العمودي - Columnar shape"""
+    return FastJSONResponse({"total_employees": len(preds), "columns": _result_columns(preds, probas)}).body
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>8} {'legacy (ms)':>12} {'rows (ms)':>10} {'columnar (ms)':>14} {'legacy KB':>10} {'columnar KB':>12}")
+    for n_rows in (100, 1000, 10000):
+        yes = rng.random(n_rows)
+        probas = np.column_stack([1.0 - yes, yes])
+        preds = (yes > 0.5).astype(np.int64)
+
+        legacy = json.loads(_legacy(preds, probas, "ar"))["results"]
+        rows = json.loads(_rows(preds, probas, "ar"))["results"]
+        assert len(legacy) == len(rows)
+        for old, new in zip(legacy, rows):
+            assert old["prediction"] == new["prediction"] and old["promotion_eligible"] == new["promotion_eligible"]
+            assert abs(old["probability"]["yes"] - new["probability"]["yes"]) <= 1e-4
+        assert _format_result(preds[0], probas[0], "ar")["prediction"] == rows[0]["prediction"]
+
+        t_legacy = _best_of(lambda: _legacy(preds, probas, "ar"))
+        t_rows = _best_of(lambda: _rows(preds, probas, "ar"))
+        t_columnar = _best_of(lambda: _columnar(preds, probas, "ar"))
+        print(f"{n_rows:>8} {t_legacy * 1000:>12.2f} {t_rows * 1000:>10.2f} {t_columnar * 1000:>14.2f} "
+              f"{len(_legacy(preds, probas, 'ar')) / 1024:>10.1f} {len(_columnar(preds, probas, 'ar')) / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+قياس المُرمّز المُجمّع - Compiled feature encoder benchmark
+
+يقارن بناء DataFrame مع prep.transform بالترميز المباشر لسجلات JSON
+ويتحقق من التطابق التام بعد التحويل إلى نوع المصنف.
+
+Usage:
+    python -m benchmarks.bench_feature_encoder
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.config import FEATURE_COLS, TARGET_COL
+from app.feature_encoder import FeatureEncoder
+from app.model_utils import build_and_train
+from benchmarks.synthetic import make_employees
+
+
+def _best_of(fn, repeat: int = 20) -> float:
+    """أفضل زمن من عدة تكرارات - Best wall time over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    train = make_employees(5000, seed=1)
+    model = build_and_train(train[FEATURE_COLS], train[TARGET_COL], use_cross_validation=False)
+    prep = model.named_steps['prep']
+
+    start = time.perf_counter()
+    encoder = FeatureEncoder(model)
+    print(f"compiled encoder ({encoder.n_features} features, {encoder.dtype.__name__}) "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"{'rows':>8} {'DataFrame+prep (ms)':>20} {'encoder (ms)':>13} {'speedup':>8}")
+    for n_rows in (1, 10, 64, 1000):
+        records = make_employees(n_rows, seed=2)[FEATURE_COLS].to_dict('records')
+
+        expected = prep.transform(pd.DataFrame(records))
+        if hasattr(expected, "toarray"):
+            expected = expected.toarray()
+        got = encoder.encode_records(records)
+        assert np.array_equal(got, expected.astype(encoder.dtype)), "encoder output differs from prep.transform"
+
+        t_pandas = _best_of(lambda: prep.transform(pd.DataFrame(records)))
+        t_encoder = _best_of(lambda: encoder.encode_records(records))
+        print(f"{n_rows:>8} {t_pandas * 1000:>20.3f} {t_encoder * 1000:>13.3f} {t_pandas / t_encoder:>7.1f}x")
+
+    print("encoder output matches prep.transform: OK")
+
+
+if __name__ == "__main__":
+    main()
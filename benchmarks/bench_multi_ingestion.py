@@ -0,0 +1,90 @@
+"""
+قياس الاستيعاب المتوازي لعدة ملفات وأوراق - Multi-file and multi-sheet ingestion benchmark
+
+يقارن قراءة الأجزاء (ملفات CSV وأوراق Excel) بالتتابع في العملية نفسها مع
+قراءتها في مجمع عمليات كما تفعل /upload/datasets؛ الدمج بعدها واحد في الحالتين.
+التسريع محدود بعدد الأنوية المتاحة.
+
+Usage:
+    python -m benchmarks.bench_multi_ingestion [files] [rows_per_part] [workers]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from app.ingestion import ingest_file, list_parts, merge_parts
+from benchmarks.synthetic import make_employees
+
+# أوراق ملف Excel الواحد - Sheets in the Excel workbook
+EXCEL_SHEETS = 3
+
+
+def _write_inputs(directory: Path, n_files: int, rows: int):
+    """ملفات CSV بأسماء أعمدة متباينة وملف Excel متعدد الأوراق - CSVs with varied column names and one multi-sheet workbook"""
+    paths = []
+    for i in range(n_files):
+        df = make_employees(rows, seed=i)
+        if i % 2:
+            df.columns = [col.lower() for col in df.columns]
+        path = directory / f"part_{i}.csv"
+        df.to_csv(path, index=False)
+        paths.append(path)
+
+    workbook = directory / "sheets.xlsx"
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        for i in range(EXCEL_SHEETS):
+            make_employees(rows, seed=n_files + i).to_excel(writer, sheet_name=f"sheet_{i}", index=False)
+    paths.append(workbook)
+    return [(path, sheet) for path in paths for sheet in list_parts(path, path.suffix)]
+
+
+def _quiet() -> None:
+    """إيقاف السجلات في العمال - Silence logs in the workers"""
+    logger.remove()
+
+
+def _ingest(args):
+    """استيعاب جزء واحد - Ingest one part"""
+    path, sheet, target = args
+    return ingest_file(path, path.suffix, target=target, sheet_name=sheet, harmonize=True)
+
+
+def main():
+    logger.remove()
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else min(os.cpu_count() or 1, 4)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        parts = _write_inputs(directory, n_files, rows)
+        print(f"{len(parts)} parts ({n_files} CSV + {EXCEL_SHEETS} sheets) of {rows} rows, {workers} workers, "
+              f"{os.cpu_count()} CPUs")
+        print(f"{'mode':>10} {'parse (s)':>10} {'merge (s)':>10} {'total (s)':>10} {'rows':>9}")
+
+        for mode in ("sequential", "pool"):
+            jobs = [(path, sheet, directory / f"{mode}-{i}.feather") for i, (path, sheet) in enumerate(parts)]
+            start = time.perf_counter()
+            if mode == "sequential":
+                results = [_ingest(job) for job in jobs]
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_quiet
+                ) as pool:
+                    results = list(pool.map(_ingest, jobs))
+            parsed = time.perf_counter()
+            merged = merge_parts(results, directory / f"{mode}.feather")
+            done = time.perf_counter()
+            print(f"{mode:>10} {parsed - start:>10.2f} {done - parsed:>10.2f} {done - start:>10.2f} {merged.rows:>9}")
+
+
+if __name__ == "__main__":
+    main()
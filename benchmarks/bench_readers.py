@@ -0,0 +1,129 @@
+"""
+قياس قارئات الملفات - File reader benchmark
+
+يقارن القراءة السابقة (محرك pandas C واستنتاج كامل للأنواع، openpyxl لـ Excel)
+مع read_data_file (pyarrow/calamine واختيار الأعمدة) على كل ملفات data/ وtest_data/،
+ثم على نسخ مكبرة منها لأن ملفات العينة صغيرة جداً.
+
+Usage:
+    python -m benchmarks.bench_readers [rows]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from app.config import BASE_DIR, ALLOWED_DATA_EXTENSIONS
+from app.data_utils import read_data_file
+from app.file_format import detect_file_format
+from app.readers import model_columns
+
+SAMPLE_DIRS = (BASE_DIR / "data", BASE_DIR / "test_data")
+# ملفات في data/ ليست بيانات - Files in data/ that are not datasets
+NON_DATASETS = ("cleaned_dataset", "db_config")
+# كتابة Excel بـ openpyxl بطيئة؛ النسخ المكبرة أصغر - Writing Excel with openpyxl is slow; scaled copies are smaller
+EXCEL_SCALE_CAP = 20_000
+
+
+def _legacy_read(path: Path) -> pd.DataFrame:
+    """القراءة السابقة لكل صيغة - The previous read for each format"""
+    ext = path.suffix.lower()
+    if ext in (".csv", ".tsv"):
+        for encoding in ("utf-8", "utf-8-sig", "latin1"):
+            try:
+                return pd.read_csv(path, sep="\t" if ext == ".tsv" else ",", encoding=encoding)
+            except UnicodeDecodeError:
+                continue
+    if ext == ".txt":
+        return pd.read_csv(path, encoding="utf-8")
+    if ext == ".json":
+        for orient in ("records", "index", "columns", "values"):
+            try:
+                return pd.read_json(path, orient=orient)
+            except Exception:
+                continue
+    if ext in (".xlsx", ".xlsm"):
+        return pd.read_excel(path, engine="openpyxl")
+    if ext == ".xlsb":
+        return pd.read_excel(path, engine="pyxlsb")
+    if ext == ".xls":
+        return pd.read_excel(path, engine="xlrd")
+    if ext == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_feather(path)
+
+
+def _scaled_copy(path: Path, directory: Path, n_rows: int):
+    """نسخة مكبرة بنفس الصيغة، أو None إذا تعذرت كتابتها - Scaled copy in the same format, or None if unwritable"""
+    ext = path.suffix.lower()
+    df = _legacy_read(path)
+    if ext in (".xlsx", ".xlsm"):
+        n_rows = min(n_rows, EXCEL_SCALE_CAP)
+    df = pd.concat([df] * (n_rows // max(len(df), 1) + 1), ignore_index=True).iloc[:n_rows]
+    target = directory / f"{path.stem}_{ext[1:]}_{n_rows}{'.xlsx' if ext == '.xlsm' else ext}"
+    if ext in (".csv", ".txt"):
+        df.to_csv(target, index=False)
+    elif ext == ".tsv":
+        df.to_csv(target, sep="\t", index=False)
+    elif ext == ".json":
+        df.to_json(target, orient="records")
+    elif ext in (".xlsx", ".xlsm"):
+        df.to_excel(target, index=False, engine="openpyxl")
+    else:
+        return None
+    return target
+
+
+def _best_of(fn, repeat: int) -> float:
+    """أفضل زمن من عدة تكرارات - Best wall time over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _compare(path: Path, repeat: int) -> None:
+    """طباعة سطر مقارنة لملف واحد - Print one comparison row"""
+    file_format = detect_file_format(path)
+    df = read_data_file(path, path.suffix.lower(), file_format, model_columns())
+    legacy = _best_of(lambda: _legacy_read(path), repeat)
+    current = _best_of(lambda: read_data_file(path, path.suffix.lower(), columns=model_columns()), repeat)
+    print(
+        f"{path.name:<32} {len(df):>8} {df.shape[1]:>5} {file_format.engine or '-':>9} "
+        f"{legacy:>11.4f} {current:>11.4f} {legacy / current:>7.1f}x"
+    )
+
+
+def main():
+    # سجلات القراءة لكل تكرار تغطي الجدول - Per-read logs would bury the table
+    logger.remove()
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    files = sorted(
+        p for directory in SAMPLE_DIRS if directory.exists() for p in directory.iterdir()
+        if p.suffix.lower() in ALLOWED_DATA_EXTENSIONS and p.stem not in NON_DATASETS
+    )
+    header = f"{'file':<32} {'rows':>8} {'cols':>5} {'engine':>9} {'legacy (s)':>11} {'current (s)':>11} {'speedup':>8}"
+
+    print("Sample files")
+    print(header)
+    for path in files:
+        _compare(path, repeat=5)
+
+    print(f"\nScaled copies (up to {n_rows} rows)")
+    print(header)
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in files:
+            scaled = _scaled_copy(path, Path(tmp), n_rows)
+            if scaled is not None:
+                _compare(scaled, repeat=3 if scaled.suffix in (".csv", ".tsv", ".txt") else 1)
+
+
+if __name__ == "__main__":
+    main()
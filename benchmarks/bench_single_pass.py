@@ -0,0 +1,58 @@
+"""
+قياس التنبؤ بتمريرة واحدة - Single-pass predict benchmark
+
+يقارن predict ثم predict_proba (المسار القديم) مع predict_with_proba
+ويتحقق من تطابق التصنيفات.
+
+Usage:
+    python -m benchmarks.bench_single_pass
+"""
+
+import time
+
+import numpy as np
+
+from app.config import FEATURE_COLS, TARGET_COL
+from app.inference import predict_with_proba
+from app.model_utils import build_and_train
+from benchmarks.synthetic import make_employees
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    """أفضل زمن من عدة تكرارات - Best wall time over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    train = make_employees(5000, seed=1)
+    model = build_and_train(train[FEATURE_COLS], train[TARGET_COL], use_cross_validation=False)
+
+    print(f"{'rows':>8} {'predict+proba (ms)':>20} {'single pass (ms)':>18} {'speedup':>8}")
+    for n_rows in (1, 100, 10000):
+        X = make_employees(n_rows, seed=2)[FEATURE_COLS]
+
+        def old_path():
+            return model.predict(X), model.predict_proba(X)
+
+        def new_path():
+            return predict_with_proba(model, X)
+
+        old_preds, old_proba = old_path()
+        new_preds, new_proba = new_path()
+        assert np.array_equal(old_preds, new_preds), "labels differ from model.predict"
+        assert np.array_equal(old_proba, new_proba), "probabilities differ from model.predict_proba"
+
+        t_old = _best_of(old_path)
+        t_new = _best_of(new_path)
+        print(f"{n_rows:>8} {t_old * 1000:>20.2f} {t_new * 1000:>18.2f} {t_old / t_new:>7.2f}x")
+
+    print("labels identical to model.predict: OK")
+
+
+if __name__ == "__main__":
+    main()
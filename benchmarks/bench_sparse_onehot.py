@@ -0,0 +1,93 @@
+"""
+قياس الترميز الأحادي المتناثر - Sparse one-hot training benchmark
+
+يدرّب RandomForest بالترميز الأحادي الكثيف ثم المتناثر (CSR مع دمج
+المستويات النادرة)، ثم المتناثر مع حد لعدد الأعمدة لكل ميزة، على أعمدة
+فئوية كثيرة المستويات. كل وضع في عملية مستقلة حتى تكون ذروة الذاكرة
+(ru_maxrss) خاصة به.
+
+Usage:
+    python -m benchmarks.bench_sparse_onehot [rows] [trees] [max_categories]
+"""
+
+import multiprocessing
+import resource
+import sys
+import time
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.pipeline import Pipeline
+
+from app.config import MAX_DEPTH, RANDOM_STATE
+from app.data_utils import build_preprocessor, split_data
+from benchmarks.synthetic import make_employees
+
+# مستويات كثيرة كما في بيانات الشركات الكبيرة - High cardinality as in large workforces
+LEVELS = {"Jop_Name": 600, "Dept_Name": 300, "Governorate": 300}
+
+
+def _train_one(sparse: bool, max_categories: int, n_rows: int, n_trees: int, results) -> None:
+    """تدريب وضع واحد في عملية مستقلة - Train one mode in its own process"""
+    X_train, X_test, y_train, y_test = split_data(make_employees(n_rows, seed=1, n_levels=LEVELS))
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    prep = build_preprocessor(sparse_onehot=sparse)
+    if max_categories:
+        prep.set_params(cat__onehot__max_categories=max_categories)
+
+    # نفس مصنف build_and_train بعدد أشجار أقل - Same classifier as build_and_train, fewer trees
+    model = Pipeline(steps=[
+        ("prep", prep),
+        ("clf", RandomForestClassifier(
+            n_estimators=n_trees, max_depth=MAX_DEPTH, random_state=RANDOM_STATE, n_jobs=-1
+        ))
+    ])
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    preds = model.predict(X_test)
+    predict_time = time.perf_counter() - start
+
+    results.put((
+        _label(sparse, max_categories),
+        model.named_steps["prep"].transform(X_test.head(1)).shape[1],
+        fit_time,
+        predict_time,
+        # ru_maxrss بالكيلوبايت على لينكس - ru_maxrss is in KiB on Linux
+        (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024,
+        accuracy_score(y_test, preds)
+    ))
+
+
+def _label(sparse: bool, max_categories: int) -> str:
+    """اسم الوضع - Mode label"""
+    if not sparse:
+        return "dense"
+    return f"sparse/{max_categories}" if max_categories else "sparse"
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    n_trees = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    max_categories = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+    print(f"{n_rows} rows, {n_trees} trees, levels {LEVELS}")
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    print(f"{'mode':>10} {'columns':>8} {'fit (s)':>9} {'predict (s)':>12} {'peak RSS +MB':>13} {'accuracy':>9}")
+    for sparse, limit in ((False, 0), (True, 0), (True, max_categories)):
+        process = context.Process(target=_train_one, args=(sparse, limit, n_rows, n_trees, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f"{_label(sparse, limit):>10} failed (exit code {process.exitcode})")
+            continue
+        mode, columns, fit_time, predict_time, rss_mb, accuracy = results.get()
+        print(f"{mode:>10} {columns:>8} {fit_time:>9.2f} {predict_time:>12.2f} {rss_mb:>13.1f} {accuracy:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+قياس أنواع النماذج في التدريب - Training model type benchmark
+
+يقارن random_forest و gradient_boosting (الترميز الأحادي) مع
+hist_gradient_boosting (فئات أصلية وإيقاف مبكر) من حيث زمن التدريب
+وذروة الذاكرة ودقة الاختبار. كل نموذج يُدرّب في عملية مستقلة حتى تكون
+ذروة الذاكرة (ru_maxrss) خاصة به.
+
+Usage:
+    python -m benchmarks.bench_training_models [rows] [jop_levels]
+"""
+
+import multiprocessing
+import resource
+import sys
+import time
+
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from app.data_utils import split_data
+from app.model_utils import build_and_train
+from benchmarks.synthetic import make_employees
+
+
+def _train_one(model_type: str, n_rows: int, jop_levels: int, results) -> None:
+    """تدريب نموذج واحد في عملية مستقلة - Train one model in its own process"""
+    df = make_employees(n_rows, seed=1, n_levels={"Jop_Name": jop_levels})
+    X_train, X_test, y_train, y_test = split_data(df)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    model = build_and_train(X_train, y_train, model_type=model_type, use_cross_validation=False)
+    elapsed = time.perf_counter() - start
+
+    proba = model.predict_proba(X_test)[:, 1]
+    results.put((
+        model_type,
+        elapsed,
+        # ru_maxrss بالكيلوبايت على لينكس - ru_maxrss is in KiB on Linux
+        (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024,
+        accuracy_score(y_test, model.predict(X_test)),
+        roc_auc_score(y_test, proba)
+    ))
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    jop_levels = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    print(f"{n_rows} rows, {jop_levels} job titles")
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    print(f"{'model':>24} {'fit (s)':>9} {'peak RSS +MB':>13} {'accuracy':>9} {'roc_auc':>8}")
+    for model_type in ("random_forest", "gradient_boosting", "hist_gradient_boosting"):
+        process = context.Process(target=_train_one, args=(model_type, n_rows, jop_levels, results))
+        process.start()
+        name, elapsed, rss_mb, accuracy, auc = results.get()
+        process.join()
+        print(f"{name:>24} {elapsed:>9.2f} {rss_mb:>13.1f} {accuracy:>9.4f} {auc:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+قياس أوضاع التحقق في التدريب - Training validation mode benchmark
+
+يقارن refit (تحقق متقاطع ثم تدريب سادس) بـ cv_reuse (إعادة استخدام نموذج
+الطية الأولى) و oob (تدريب واحد مع تقييم خارج الحقيبة) من حيث الزمن ودقة الاختبار.
+
+Usage:
+    python -m benchmarks.bench_training_modes [rows]
+"""
+
+import sys
+import time
+
+from sklearn.metrics import accuracy_score
+
+from app.data_utils import split_data
+from app.model_utils import build_and_train
+from benchmarks.synthetic import make_employees
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    X_train, X_test, y_train, y_test = split_data(make_employees(n_rows, seed=1))
+    print(f"{n_rows} rows ({len(X_train)} train / {len(X_test)} test)")
+
+    print(f"{'mode':>10} {'fit (s)':>9} {'speedup':>8} {'validation acc':>15} {'test acc':>9}")
+    baseline = None
+    for mode in ("refit", "cv_reuse", "oob"):
+        start = time.perf_counter()
+        model = build_and_train(X_train, y_train, validation_mode=mode)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+
+        test_accuracy = accuracy_score(y_test, model.predict(X_test))
+        print(f"{mode:>10} {elapsed:>9.2f} {baseline / elapsed:>7.1f}x "
+              f"{model.validation_['accuracy']:>15.4f} {test_accuracy:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
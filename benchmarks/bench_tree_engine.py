@@ -0,0 +1,62 @@
+"""
+قياس محرك الأشجار المُجمّع - Compiled tree engine benchmark
+
+يقارن predict_proba في sklearn مع CompiledForest ويتحقق من التطابق
+ضمن حدود دقة الفاصلة العائمة.
+
+Usage:
+    python -m benchmarks.bench_tree_engine
+"""
+
+import time
+
+import numpy as np
+
+from app.config import FEATURE_COLS, TARGET_COL
+from app.model_utils import build_and_train
+from app.tree_engine import CompiledForest
+from benchmarks.synthetic import make_employees
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    """أفضل زمن من عدة تكرارات - Best wall time over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    train = make_employees(5000, seed=1)
+    model = build_and_train(train[FEATURE_COLS], train[TARGET_COL], use_cross_validation=False)
+
+    start = time.perf_counter()
+    compiled = CompiledForest(model)
+    print(f"compiled {compiled.n_trees} trees / {compiled.n_nodes} nodes "
+          f"(max depth {compiled.max_depth}) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"{'rows':>8} {'sklearn (ms)':>14} {'compiled (ms)':>14} {'walk only (ms)':>15} {'max |diff|':>11}")
+    for n_rows in (1, 10, 64, 100, 1000):
+        X = make_employees(n_rows, seed=2)[FEATURE_COLS]
+        Xt = compiled.transform(X)
+
+        expected = model.predict_proba(X)
+        got = compiled.predict_proba(X)
+        np.testing.assert_allclose(got, expected, rtol=0, atol=1e-12)
+        assert np.array_equal(
+            compiled.predict_with_proba(X)[0], model.predict(X)
+        ), "labels differ from sklearn"
+
+        t_sklearn = _best_of(lambda: model.predict_proba(X))
+        t_compiled = _best_of(lambda: compiled.predict_proba(X))
+        t_walk = _best_of(lambda: compiled.predict_proba(Xt))
+        print(f"{n_rows:>8} {t_sklearn * 1000:>14.2f} {t_compiled * 1000:>14.2f} "
+              f"{t_walk * 1000:>15.2f} {np.abs(got - expected).max():>11.1e}")
+
+    print("compiled output matches sklearn: OK")
+
+
+if __name__ == "__main__":
+    main()
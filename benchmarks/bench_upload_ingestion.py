@@ -0,0 +1,92 @@
+"""
+قياس استيعاب الملفات المرفوعة - Upload ingestion benchmark
+
+يقارن المسار الكامل (read_data_file ثم clean_df ثم save_cleaned_dataset) مع
+الاستيعاب على أجزاء لملف CSV عريض (أعمدة إضافية كسحب SQL Server). كل مسار في
+عملية مستقلة حتى تكون ذروة الذاكرة (ru_maxrss) خاصة به.
+
+Usage:
+    python -m benchmarks.bench_upload_ingestion [rows] [chunk_rows]
+"""
+
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import make_employees
+
+# أعمدة إضافية نصية ورقمية - Extra text and numeric columns
+EXTRA_TEXT_COLS = 12
+EXTRA_NUMERIC_COLS = 6
+
+
+def _write_csv(path: Path, n_rows: int) -> None:
+    """كتابة ملف CSV عريض على أجزاء - Write a wide CSV in parts"""
+    part_rows = 100_000
+    for start in range(0, n_rows, part_rows):
+        rows = min(part_rows, n_rows - start)
+        df = make_employees(rows, seed=start)
+        rng = np.random.default_rng(start)
+        df.insert(0, "Emp_ID", np.arange(start, start + rows))
+        for i in range(EXTRA_TEXT_COLS):
+            df[f"Text_{i}"] = rng.choice([f"value {k}" for k in range(50)], rows)
+        for i in range(EXTRA_NUMERIC_COLS):
+            df[f"Number_{i}"] = rng.integers(0, 1000, rows)
+        df.to_csv(path, mode="a", header=(start == 0), index=False)
+
+
+def _run_one(mode: str, csv_path: str, chunk_rows: int, results) -> None:
+    """تشغيل مسار واحد في عملية مستقلة - Run one path in its own process"""
+    from loguru import logger
+    logger.remove()
+
+    from app.data_utils import clean_df, read_data_file
+    from app.dataset_store import save_cleaned_dataset
+    from app.ingestion import ingest_file
+
+    path = Path(csv_path)
+    out = path.with_suffix(".feather")
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "in-memory":
+        df = clean_df(read_data_file(path, ".csv"))
+        save_cleaned_dataset(df, out)
+        rows = len(df)
+    else:
+        rows = ingest_file(path, ".csv", chunk_rows=chunk_rows, target=out).rows
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss بالكيلوبايت على لينكس - ru_maxrss is in KiB on Linux
+    results.put((mode, rows, elapsed, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024))
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    chunk_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "upload.csv"
+        _write_csv(csv_path, n_rows)
+        print(f"{n_rows} rows, {csv_path.stat().st_size / 1e6:.0f} MB CSV, chunks of {chunk_rows}")
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        print(f"{'mode':>10} {'rows':>9} {'time (s)':>9} {'peak RSS +MB':>13}")
+        for mode in ("in-memory", "chunked"):
+            process = context.Process(target=_run_one, args=(mode, str(csv_path), chunk_rows, results))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"{mode:>10} failed (exit code {process.exitcode})")
+                continue
+            mode, rows, elapsed, rss_mb = results.get()
+            print(f"{mode:>10} {rows:>9} {elapsed:>9.2f} {rss_mb:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
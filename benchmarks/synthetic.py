@@ -0,0 +1,52 @@
+"""
+بيانات موظفين اصطناعية للقياس - Synthetic employee data for benchmarks
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import NUMERICAL_COLS, CATEGORICAL_COLS, TARGET_COL, FEATURE_COLS
+
+
+def make_employees(
+    n_rows: int,
+    seed: int = 0,
+    n_levels: Optional[Dict[str, int]] = None
+) -> pd.DataFrame:
+    """
+    إنشاء بيانات موظفين اصطناعية - Build a synthetic employee frame
+
+    Args:
+        n_rows: عدد الصفوف - Number of rows
+        seed: بذرة العشوائية - Random seed
+        n_levels: عدد المستويات لكل عمود فئوي - Levels per categorical column
+
+    Returns:
+        البيانات مع عمود الهدف - Frame with FEATURE_COLS and target
+    """
+    rng = np.random.default_rng(seed)
+    n_levels = n_levels or {}
+
+    df = pd.DataFrame({col: rng.normal(50, 20, n_rows).round(1) for col in NUMERICAL_COLS})
+    df["Age"] = rng.integers(18, 70, n_rows)
+    df["Awards"] = rng.integers(0, 6, n_rows)
+    df["Skill_level_measurement_certificate"] = rng.integers(0, 11, n_rows)
+    df["Remaining_Contract_Renewal"] = rng.integers(0, 61, n_rows)
+    df["Salary_Total"] = rng.normal(8000, 2500, n_rows).round(0)
+
+    for col in CATEGORICAL_COLS:
+        levels = np.array([f"{col}_{i}" for i in range(n_levels.get(col, 8))])
+        # توزيع غير منتظم لمحاكاة المستويات النادرة - Skewed to mimic rare levels
+        weights = 1.0 / np.arange(1, len(levels) + 1)
+        df[col] = levels[rng.choice(len(levels), n_rows, p=weights / weights.sum())]
+    df["gender"] = rng.choice(["male", "female"], n_rows)
+
+    # قيم مفقودة - Missing values
+    df.loc[rng.random(n_rows) < 0.05, "Salary_Total"] = np.nan
+    df.loc[rng.random(n_rows) < 0.05, "Governorate"] = np.nan
+
+    score = (df["Performance_Score"] + 2 * df["Awards"] + rng.normal(0, 10, n_rows))
+    df[TARGET_COL] = (score > score.median()).astype(int)
+    return df[FEATURE_COLS + [TARGET_COL]]
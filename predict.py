@@ -8,13 +8,14 @@ This file provides the Cog-compatible prediction interface for the HR promotion
 from cog import BasePredictor, Input, Path as CogPath
 from typing import Dict, Any, List, Optional
 import joblib
-import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
 from datetime import datetime
 
 # Import our existing utilities
+from app.feature_encoder import build_feature_encoder
+from app.inference import predict_encoded
 from app.config import (
     PROMOTION_MODEL_PATH,
     MIN_EXPERIENCE, MAX_EXPERIENCE,
@@ -54,6 +55,9 @@ class Predictor(BasePredictor):
         self.model = joblib.load(PROMOTION_MODEL_PATH)
         print(f"✅ Model loaded successfully from {PROMOTION_MODEL_PATH}")
         
+        # Compile the fitted preprocessor once (None falls back to prep.transform)
+        self.encoder = build_feature_encoder(self.model)
+        
         # Store valid values for validation
         self.valid_departments = VALID_DEPARTMENTS
         self.valid_genders = VALID_GENDERS
@@ -148,7 +152,7 @@ class Predictor(BasePredictor):
             }
         
         # Prepare input data
-        input_data = pd.DataFrame([{
+        input_data = {
             'experience': experience,
             'education_level': education_level,
             'performance_score': performance_score,
@@ -157,12 +161,13 @@ class Predictor(BasePredictor):
             'avg_work_hours': avg_work_hours,
             'department': department,
             'gender': gender
-        }])
+        }
         
         # Make prediction
         try:
-            prediction = self.model.predict(input_data)[0]
-            probabilities = self.model.predict_proba(input_data)[0]
+            predictions, all_probabilities = predict_encoded(self.model, [input_data], self.encoder)
+            prediction = predictions[0]
+            probabilities = all_probabilities[0]
             
             # Get probability for promotion
             promotion_probability = float(probabilities[1])
@@ -173,7 +178,7 @@ class Predictor(BasePredictor):
             
             # Generate recommendations
             recommendations = self._generate_recommendations(
-                prediction, promotion_probability, input_data.iloc[0], language
+                prediction, promotion_probability, input_data, language
             )
             
             # Prepare response based on language
@@ -228,7 +233,7 @@ class Predictor(BasePredictor):
         self,
         prediction: int,
         probability: float,
-        employee_data: pd.Series,
+        employee_data: Dict[str, Any],
         language: str
     ) -> List[str]:
         """
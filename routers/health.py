@@ -14,6 +14,7 @@ from app.config import (
     DATA_DIR, MODELS_DIR, LOGS_DIR, POLICIES_DIR,
     PROMOTION_MODEL_PATH, API_VERSION
 )
+from app.dataset_store import cleaned_dataset_path
 from app.i18n import get_message
 
 router = APIRouter(prefix="/health", tags=["الفحص الصحي - Health"])
@@ -45,8 +46,7 @@ async def health_check(
         model_exists = PROMOTION_MODEL_PATH.exists()
         
         # فحص البيانات - Check dataset
-        dataset_path = DATA_DIR / "cleaned_dataset.csv"
-        dataset_exists = dataset_path.exists()
+        dataset_exists = cleaned_dataset_path() is not None
         
         # حساب الحالة العامة - Calculate overall status
         all_dirs_ok = all(directories_status.values())
@@ -117,18 +117,23 @@ async def detailed_health_check(
             model_info = {"exists": False}
         
         # معلومات البيانات - Dataset information
-        dataset_path = DATA_DIR / "cleaned_dataset.csv"
+        dataset_path = cleaned_dataset_path()
         dataset_info = {}
-        if dataset_path.exists():
+        if dataset_path is not None:
             dataset_stat = dataset_path.stat()
             dataset_info = {
                 "exists": True,
+                "format": dataset_path.suffix.lstrip("."),
                 "size_mb": round(dataset_stat.st_size / (1024 * 1024), 2),
                 "modified": datetime.fromtimestamp(dataset_stat.st_mtime).isoformat()
             }
         else:
             dataset_info = {"exists": False}
         
+        # النموذج المحمل في الذاكرة - Model loaded in memory
+        from app.model_registry import model_registry
+        model_info["registry"] = model_registry.info()
+
         # معلومات السياسات - Policies information
         from app.policy_manager import policy_manager
         policies_stats = policy_manager.get_statistics()
@@ -168,6 +173,21 @@ async def detailed_health_check(
         }
 
 
+@router.get("/executors")
+async def executors_check():
+    """
+    حالة مجمعات التنفيذ - Executor pools status
+
+    Returns:
+        استخدام كل مجمع وطابوره - Per-pool utilization and queue
+    """
+    from app.executors import executors_metrics
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "pools": executors_metrics()
+    }
+
+
 @router.get("/readiness")
 async def readiness_check():
     """
@@ -3,14 +3,31 @@
 يوفر نقاط نهاية للتنبؤ بالترقيات
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional
-import pandas as pd
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel, Field, ValidationError, validator
+from starlette.requests import ClientDisconnect
+from typing import Any, Dict, List, Optional, Tuple
 from loguru import logger
-
-from app.model_utils import load_model
+import numpy as np
+
+from app.inference import predict_records
+from app.batching import MicroBatcher
+from app.executors import inference_executor, scoring_executor, ExecutorSaturatedError
+from app.bulk_scoring import score_database_source
+from app.database import get_db
+from app.model_registry import model_registry
+from app.serialization import FastJSONResponse, dumps
+from app.prediction_cache import prediction_cache
+from app.streaming import (
+    DuplexStreamingResponse, SpooledBody, iter_lines, iter_ndjson_records,
+    iter_csv_records, iter_chunks
+)
 from app.config import (
+    PREDICT_BATCHING_ENABLED, INFERENCE_BACKEND,
+    PREDICT_STREAM_CHUNK_SIZE, ID_COL,
+    DEFAULT_EMPLOYEE_TABLE, BULK_SCORING_RESULTS_TABLE, BULK_SCORING_CHUNK_SIZE,
+    BULK_SCORING_SOURCE_TABLES, BULK_SCORING_RESULTS_TABLES,
     MIN_AGE, MAX_AGE,
     MIN_YEARS_EXPERIENCE, MAX_YEARS_EXPERIENCE,
     MIN_SALARY, MAX_SALARY,
@@ -185,10 +202,173 @@ class BatchPredictionRequest(BaseModel):
     employees: List[Employee]
 
 
+def _format_result(pred: Any, proba: Any, lang: str) -> Dict[str, Any]:
+    """
+    تنسيق نتيجة موظف واحد - Format one employee's result
+
+    Args:
+        pred: التنبؤ - Prediction
+        proba: الاحتماليات - Probabilities
+        lang: اللغة - Language
+
+    Returns:
+        النتيجة - Result
+    """
+    return {
+        "prediction": get_message("promotion_eligible", lang) if pred == 1 else get_message("promotion_not_eligible", lang),
+        "promotion_eligible": bool(pred),
+        "probability": {
+            "no": round(float(proba[0]), 4),
+            "yes": round(float(proba[1]), 4)
+        },
+        "confidence": round(float(max(proba)), 4)
+    }
+
+
+def _result_columns(preds: np.ndarray, probas: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    أعمدة النتائج كمصفوفات - Result fields as NumPy columns
+
+    تقريب موجه بدلاً من round() لكل قيمة - Vectorized rounding instead of per-value round()
+
+    Args:
+        preds: التنبؤات - Predictions
+        probas: الاحتماليات - Probabilities
+
+    Returns:
+        عمود لكل حقل - One array per field
+    """
+    probas = np.asarray(probas, dtype=np.float64)
+    return {
+        "employee_index": np.arange(len(preds), dtype=np.int64),
+        "promotion_eligible": np.asarray(preds) == 1,
+        "probability_no": np.round(probas[:, 0], 4),
+        "probability_yes": np.round(probas[:, 1], 4),
+        "confidence": np.round(probas.max(axis=1), 4)
+    }
+
+
+def _score_stream_chunk(
+    chunk: List[Tuple[int, Any]],
+    lang: str,
+    backend: Optional[str] = None
+) -> Tuple[bytes, Dict[str, int]]:
+    """
+    التحقق من جزء وتقييمه وتحويله إلى NDJSON - Validate, score and serialize one chunk
+
+    يعمل بالكامل في مجمع الاستدلال ليبقى حلقة الأحداث حرة
+    Runs entirely in the inference pool so the event loop stays free
+
+    Args:
+        chunk: (رقم الصف، السجل أو الخطأ) - (row number, record or error)
+        lang: اللغة - Language
+        backend: محرك الاستدلال - Inference backend
+
+    Returns:
+        (أسطر NDJSON، الإحصائيات) - (NDJSON text, counters)
+    """
+    lines: List[Optional[Dict[str, Any]]] = []
+    valid: List[Tuple[int, int, Any, Dict[str, Any]]] = []
+
+    for row, item in chunk:
+        if isinstance(item, str):
+            lines.append({"row": row, "error": item})
+            continue
+        try:
+            employee = Employee.model_validate(item)
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+                for err in e.errors(include_url=False)
+            )
+            lines.append({"row": row, "error": errors})
+            continue
+        valid.append((len(lines), row, item.get(ID_COL), employee.model_dump()))
+        lines.append(None)
+
+    eligible = 0
+    if valid:
+        try:
+            preds, probas = predict_records([record for *_, record in valid], backend)
+        except Exception as e:
+            logger.error(f"فشل تقييم جزء من التدفق: {e}")
+            for position, row, _, _ in valid:
+                lines[position] = {"row": row, "error": get_message("prediction_error", lang, error=str(e))}
+            valid = []
+        else:
+            for (position, row, emp_id, _), pred, proba in zip(valid, preds, probas):
+                line = {"row": row}
+                if emp_id is not None:
+                    line[ID_COL] = emp_id
+                line.update(_format_result(pred, proba, lang))
+                lines[position] = line
+            eligible = int(preds.sum())
+
+    text = b"".join(dumps(line) + b"\n" for line in lines)
+    return text, {"rows": len(chunk), "scored": len(valid), "eligible": eligible}
+
+
+async def _stream_predictions(request: Request, lang: str, backend: Optional[str]):
+    """
+    مولّد نتائج التنبؤ المتدفقة - Streaming prediction generator
+
+    يقرأ الطلب ويقيّمه جزءاً بجزء فيبقى استهلاك الذاكرة ثابتاً مهما كان حجم الإدخال
+    Reads and scores the body chunk by chunk, so memory stays flat whatever the input size
+    """
+    content_type = request.headers.get("content-type", "")
+    lines = iter_lines(SpooledBody(request.stream()))
+    items = iter_csv_records(lines) if "csv" in content_type else iter_ndjson_records(lines)
+
+    totals = {"rows": 0, "scored": 0, "eligible": 0}
+    chunks = 0
+    try:
+        async for chunk in iter_chunks(items, PREDICT_STREAM_CHUNK_SIZE):
+            while True:
+                try:
+                    text, stats = await inference_executor.run(_score_stream_chunk, chunk, lang, backend)
+                    break
+                except ExecutorSaturatedError:
+                    # الاستجابة بدأت بالفعل، ننتظر بدلاً من 503 - Response already started: wait instead of 503
+                    await asyncio.sleep(0.05)
+            chunks += 1
+            for key in totals:
+                totals[key] += stats[key]
+            yield text
+    except ClientDisconnect:
+        logger.warning(f"انقطع العميل أثناء التنبؤ المتدفق بعد {totals['rows']} صف")
+        return
+
+    logger.info(f"تنبؤ متدفق لـ {totals['rows']} صف في {chunks} جزء")
+    summary = {
+        "summary": {
+            "total_rows": totals["rows"],
+            "scored": totals["scored"],
+            "failed": totals["rows"] - totals["scored"],
+            "eligible_count": totals["eligible"],
+            "not_eligible_count": totals["scored"] - totals["eligible"],
+            "chunks": chunks
+        }
+    }
+    yield dumps(summary) + b"\n"
+
+
+# معامل اختيار المحرك لكل طلب - Per-request backend selector
+BACKEND_QUERY = Query(
+    None,
+    pattern="^(sklearn|compiled|auto)$",
+    description="محرك الاستدلال - Inference backend (sklearn/compiled/auto)"
+)
+
+
+# مُجمّع طلبات التنبؤ الفردية - Coalescer for single-employee predictions
+predict_batcher = MicroBatcher(predict_records, executor=inference_executor)
+
+
 @router.post("/")
 async def predict_promotion(
     emp: Employee,
-    lang: str = Query("ar", description="اللغة - Language (ar/en)")
+    lang: str = Query("ar", description="اللغة - Language (ar/en)"),
+    backend: Optional[str] = BACKEND_QUERY
 ):
     """
     التنبؤ بأهلية الترقية لموظف واحد - Predict promotion eligibility for single employee
@@ -196,26 +376,31 @@ async def predict_promotion(
     Args:
         emp: بيانات الموظف - Employee data
         lang: اللغة - Language
+        backend: محرك الاستدلال (اختياري) - Inference backend (optional)
 
     Returns:
         نتيجة التنبؤ - Prediction result
     """
     try:
-        # تحميل النموذج - Load model
+        # التنبؤ عبر المُجمّع أو مباشرة - Predict through the batcher or directly
         try:
-            model = load_model()
+            # طلبات المحرك المخصص تتجاوز المُجمّع - Per-request backends bypass the batcher
+            if PREDICT_BATCHING_ENABLED and backend is None:
+                pred, proba = await predict_batcher.submit(emp.model_dump())
+            else:
+                preds, probas = await inference_executor.run(predict_records, [emp.model_dump()], backend)
+                pred, proba = preds[0], probas[0]
         except FileNotFoundError:
             raise HTTPException(
                 status_code=503,
                 detail=get_message("model_not_found", lang)
             )
-
-        # تحضير البيانات - Prepare data
-        df = pd.DataFrame([emp.model_dump()])
-
-        # التنبؤ - Make prediction
-        pred = model.predict(df)[0]
-        proba = model.predict_proba(df)[0].tolist()
+        except ExecutorSaturatedError:
+            raise HTTPException(
+                status_code=503,
+                detail=get_message("server_busy", lang)
+            )
+        proba = proba.tolist()
 
         # تحديد مستوى الثقة - Determine confidence level
         confidence = max(proba)
@@ -256,7 +441,14 @@ async def predict_promotion(
 @router.post("/batch")
 async def predict_batch(
     request: BatchPredictionRequest,
-    lang: str = Query("ar", description="اللغة - Language (ar/en)")
+    lang: str = Query("ar", description="اللغة - Language (ar/en)"),
+    backend: Optional[str] = BACKEND_QUERY,
+    response_format: str = Query(
+        "rows",
+        alias="format",
+        pattern="^(rows|columnar)$",
+        description="شكل الاستجابة - Response shape (rows: object per employee, columnar: one array per field)"
+    )
 ):
     """
     التنبؤ بأهلية الترقية لعدة موظفين - Predict promotion eligibility for multiple employees
@@ -264,52 +456,67 @@ async def predict_batch(
     Args:
         request: طلب التنبؤ الجماعي - Batch prediction request
         lang: اللغة - Language
+        backend: محرك الاستدلال (اختياري) - Inference backend (optional)
+        response_format: rows أو columnar - Response format
 
     Returns:
         نتائج التنبؤ - Prediction results
     """
     try:
-        # تحميل النموذج - Load model
+        # التنبؤ في مجمع الاستدلال - Predict in the inference pool
         try:
-            model = load_model()
+            preds, probas = await inference_executor.run(
+                predict_records,
+                [emp.model_dump() for emp in request.employees],
+                backend
+            )
         except FileNotFoundError:
             raise HTTPException(
                 status_code=503,
                 detail=get_message("model_not_found", lang)
             )
-
-        # تحضير البيانات - Prepare data
-        employees_data = [emp.model_dump() for emp in request.employees]
-        df = pd.DataFrame(employees_data)
-
-        # التنبؤ - Make predictions
-        preds = model.predict(df)
-        probas = model.predict_proba(df)
-
-        # إنشاء النتائج - Create results
-        results = []
-        for i, (emp, pred, proba) in enumerate(zip(request.employees, preds, probas)):
-            confidence = max(proba)
-            results.append({
-                "employee_index": i,
-                "prediction": get_message("promotion_eligible", lang) if pred == 1 else get_message("promotion_not_eligible", lang),
-                "promotion_eligible": bool(pred),
-                "probability": {
-                    "no": round(proba[0], 4),
-                    "yes": round(proba[1], 4)
-                },
-                "confidence": round(confidence, 4)
-            })
+        except ExecutorSaturatedError:
+            raise HTTPException(
+                status_code=503,
+                detail=get_message("server_busy", lang)
+            )
 
         logger.info(f"تنبؤ جماعي لـ {len(request.employees)} موظف")
 
-        return {
+        # الأعمدة كمصفوفات NumPy والتسلسل بـ orjson - Columns as NumPy arrays, serialized by orjson
+        columns = _result_columns(preds, probas)
+        eligible_count = int(columns["promotion_eligible"].sum())
+        body = {
             "detail": get_message("prediction_success", lang),
-            "total_employees": len(request.employees),
-            "eligible_count": sum(preds),
-            "not_eligible_count": len(preds) - sum(preds),
-            "results": results
+            "total_employees": len(preds),
+            "eligible_count": eligible_count,
+            "not_eligible_count": len(preds) - eligible_count
         }
+        labels = [get_message("promotion_not_eligible", lang), get_message("promotion_eligible", lang)]
+
+        if response_format == "columnar":
+            body["format"] = "columnar"
+            body["labels"] = {"false": labels[0], "true": labels[1]}
+            body["columns"] = columns
+        else:
+            body["results"] = [
+                {
+                    "employee_index": i,
+                    "prediction": labels[eligible],
+                    "promotion_eligible": eligible,
+                    "probability": {"no": no, "yes": yes},
+                    "confidence": confidence
+                }
+                for i, eligible, no, yes, confidence in zip(
+                    columns["employee_index"].tolist(),
+                    columns["promotion_eligible"].tolist(),
+                    columns["probability_no"].tolist(),
+                    columns["probability_yes"].tolist(),
+                    columns["confidence"].tolist()
+                )
+            ]
+
+        return FastJSONResponse(body)
 
     except HTTPException:
         raise
@@ -321,6 +528,150 @@ async def predict_batch(
         )
 
 
+@router.post("/stream")
+async def predict_stream(
+    request: Request,
+    lang: str = Query("ar", description="اللغة - Language (ar/en)"),
+    backend: Optional[str] = BACKEND_QUERY
+):
+    """
+    تنبؤ متدفق لعدد كبير من الموظفين - Streaming bulk prediction
+
+    يقبل NDJSON (سجل لكل سطر) أو CSV (Content-Type: text/csv) ويرجع
+    سطر NDJSON لكل صف بنفس الترتيب، ثم سطر ملخص في النهاية. الصفوف غير
+    الصالحة تُرجع خطأً في سطرها دون إيقاف التدفق.
+    Accepts NDJSON (one record per line) or CSV (Content-Type: text/csv)
+    and returns one NDJSON line per row in input order, followed by a
+    summary line. Invalid rows get an error line without stopping the stream.
+
+    Args:
+        request: الطلب - Request
+        lang: اللغة - Language
+        backend: محرك الاستدلال (اختياري) - Inference backend (optional)
+
+    Returns:
+        تدفق NDJSON - NDJSON stream
+    """
+    # التحقق قبل بدء الاستجابة لإرجاع 503 - Check before the response starts so we can still 503
+    try:
+        model_registry.snapshot()
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=503,
+            detail=get_message("model_not_found", lang)
+        )
+
+    return DuplexStreamingResponse(
+        _stream_predictions(request, lang, backend),
+        media_type="application/x-ndjson"
+    )
+
+
+def _check_table(name: str, allowed: List[str], lang: str) -> None:
+    """
+    رفض اسم جدول خارج القائمة المسموحة - Reject a table name outside the allow-list
+
+    Raises:
+        HTTPException: 400 إذا لم يكن الاسم مسموحاً - 400 if the name is not allowed
+    """
+    if name.casefold() not in {table.casefold() for table in allowed}:
+        raise HTTPException(
+            status_code=400,
+            detail=get_message("table_not_allowed", lang, table=name)
+        )
+
+
+@router.post("/from-database")
+async def predict_from_database(
+    source_table: str = Query(DEFAULT_EMPLOYEE_TABLE, description="جدول الموظفين - Employee table"),
+    results_table: str = Query(BULK_SCORING_RESULTS_TABLE, description="جدول النتائج - Results table"),
+    chunk_size: int = Query(BULK_SCORING_CHUNK_SIZE, ge=1, le=100000, description="صفوف لكل جزء - Rows per chunk"),
+    limit: Optional[int] = Query(None, ge=1, description="حد عدد الصفوف - Row limit"),
+    lang: str = Query("ar", description="اللغة - Language (ar/en)"),
+    backend: Optional[str] = BACKEND_QUERY
+):
+    """
+    تقييم جميع الموظفين من SQL Server وكتابة النتائج - Score employees from SQL Server into a results table
+
+    يقرأ الجدول على أجزاء ويكتب التنبؤات بإدخال جماعي، ويعمل في مجمع
+    عمليات خاص به حتى لا ينافس طلبات التنبؤ العادية ولا التدريب.
+    الجداول محصورة في BULK_SCORING_SOURCE_TABLES و BULK_SCORING_RESULTS_TABLES.
+    Reads the table in chunks and bulk-inserts predictions; runs in its own
+    process pool so it competes with neither regular predictions nor training.
+    Tables are limited to BULK_SCORING_SOURCE_TABLES and BULK_SCORING_RESULTS_TABLES.
+
+    Args:
+        source_table: جدول الموظفين - Employee table
+        results_table: جدول النتائج - Results table
+        chunk_size: صفوف لكل جزء - Rows per chunk
+        limit: حد عدد الصفوف - Row limit
+        lang: اللغة - Language
+        backend: محرك الاستدلال (اختياري) - Inference backend (optional)
+
+    Returns:
+        ملخص التشغيل - Run summary
+
+    Raises:
+        HTTPException: 400 لجدول غير مسموح - 400 for a table that is not allowed
+    """
+    _check_table(source_table, BULK_SCORING_SOURCE_TABLES, lang)
+    _check_table(results_table, BULK_SCORING_RESULTS_TABLES, lang)
+    try:
+        summary = await scoring_executor.run(
+            score_database_source,
+            get_db().connection_settings(),
+            None,
+            source_table,
+            results_table,
+            chunk_size,
+            limit,
+            backend
+        )
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=503,
+            detail=get_message("model_not_found", lang)
+        )
+    except ExecutorSaturatedError:
+        raise HTTPException(
+            status_code=503,
+            detail=get_message("server_busy", lang)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=get_message("invalid_input", lang) + f": {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"خطأ في التقييم الجماعي من قاعدة البيانات: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=get_message("prediction_error", lang, error=str(e))
+        )
+
+    return {
+        "detail": get_message("prediction_success", lang),
+        **summary
+    }
+
+
+@router.get("/metrics")
+async def prediction_metrics():
+    """
+    مقاييس مسار التنبؤ - Prediction path metrics
+
+    Returns:
+        عمق الطابور وأحجام الدفعات وإحصائيات الذاكرة - Queue depth, batch sizes and cache counters
+    """
+    return {
+        "inference_backend": INFERENCE_BACKEND,
+        "batching_enabled": PREDICT_BATCHING_ENABLED,
+        "batcher": predict_batcher.metrics(),
+        "cache": prediction_cache.metrics(),
+        "inference_pool": inference_executor.metrics()
+    }
+
+
 def _generate_recommendation(emp: Employee, pred: int, proba: list, lang: str) -> str:
     """
     إنشاء توصية بناءً على التنبؤ - Generate recommendation based on prediction
@@ -342,11 +693,11 @@ def _generate_recommendation(emp: Employee, pred: int, proba: list, lang: str) -
                 return "الموظف مؤهل للترقية، لكن يُنصح بمراجعة الأداء والمهارات قبل اتخاذ القرار النهائي."
         else:
             recommendations = []
-            if emp.performance_score < 70:
+            if emp.Performance_Score < 70:
                 recommendations.append("تحسين الأداء الوظيفي")
-            if emp.training_hours < 20:
+            if emp.Training_Hours < 20:
                 recommendations.append("زيادة ساعات التدريب")
-            if emp.awards == 0:
+            if emp.Awards == 0:
                 recommendations.append("السعي للحصول على جوائز وتقديرات")
 
             if recommendations:
@@ -361,11 +712,11 @@ def _generate_recommendation(emp: Employee, pred: int, proba: list, lang: str) -
                 return "Employee is qualified for promotion, but recommend reviewing performance and skills before final decision."
         else:
             recommendations = []
-            if emp.performance_score < 70:
+            if emp.Performance_Score < 70:
                 recommendations.append("improve job performance")
-            if emp.training_hours < 20:
+            if emp.Training_Hours < 20:
                 recommendations.append("increase training hours")
-            if emp.awards == 0:
+            if emp.Awards == 0:
                 recommendations.append("pursue awards and recognition")
 
             if recommendations:
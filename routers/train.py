@@ -4,23 +4,23 @@
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
-from typing import Optional
-import pandas as pd
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Literal, Optional, Tuple
 from loguru import logger
 import os
 import json
 
-from app.config import DATA_DIR
-from app.data_utils import (
-    split_data, validate_dataframe, prepare_employee_data,
-    clean_df, create_promotion_target
-)
-from app.model_utils import (
-    build_and_train, evaluate, save_model, get_feature_importance
+from app.config import (
+    RANDOM_STATE, TUNING_SEARCH_SPACES, TUNING_N_CANDIDATES, TUNING_FACTOR
 )
+from app.dataset_store import cleaned_dataset_path
+from app.executors import ExecutorSaturatedError
+from app.training import train_from_dataset_file, train_from_database_source
+from app.training_jobs import training_jobs, SUCCEEDED, CANCELLED
+from app.tuning import tune_from_dataset_file
 from app.i18n import get_message
-from app.database import db
+from app.database import get_db, reset_db
 
 router = APIRouter(prefix="/train", tags=["التدريب - Training"])
 
@@ -29,12 +29,34 @@ class TrainingConfig(BaseModel):
     """تكوين التدريب - Training configuration"""
     model_type: str = "random_forest"
     use_cross_validation: bool = True
+    # refit: تحقق متقاطع ثم تدريب نهائي | cv_reuse: نموذج الطية الأولى | oob: خارج الحقيبة
+    # refit: CV then a final fit | cv_reuse: first fold model | oob: out-of-bag (RandomForest)
+    validation_mode: Optional[Literal["refit", "cv_reuse", "oob"]] = None
 
     class Config:
         json_schema_extra = {
             "example": {
                 "model_type": "random_forest",
-                "use_cross_validation": True
+                "use_cross_validation": True,
+                "validation_mode": "oob"
+            }
+        }
+
+
+class TuningConfig(BaseModel):
+    """تكوين البحث عن المعاملات - Hyperparameter search configuration"""
+    model_type: str = "random_forest"
+    n_candidates: int = Field(TUNING_N_CANDIDATES, ge=2, le=500)
+    factor: int = Field(TUNING_FACTOR, ge=2, le=10)
+    random_state: int = RANDOM_STATE
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "model_type": "hist_gradient_boosting",
+                "n_candidates": 24,
+                "factor": 3,
+                "random_state": 42
             }
         }
 
@@ -65,255 +87,419 @@ class DatabaseConfig(BaseModel):
         }
 
 
-@router.post("/")
-async def train_model(
-    config: Optional[TrainingConfig] = None,
-    lang: str = Query("ar", description="اللغة - Language (ar/en)")
-):
+def _training_error(error: Dict[str, Any], lang: str) -> Tuple[int, str]:
     """
-    تدريب نموذج التنبؤ بالترقيات - Train promotion prediction model
+    رمز الحالة والرسالة لخطأ مهمة تدريب - Status code and message for a job error
 
     Args:
-        config: تكوين التدريب - Training configuration
+        error: وصف الخطأ من عملية التدريب - Error description from the worker
         lang: اللغة - Language
 
     Returns:
-        نتائج التدريب والمقاييس - Training results and metrics
+        (رمز الحالة، الرسالة) - (status code, detail)
     """
-    try:
-        # التحقق من وجود البيانات - Check for dataset
-        path = DATA_DIR / "cleaned_dataset.csv"
-        if not path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=get_message("no_dataset", lang)
-            )
-
-        # قراءة البيانات - Read dataset
-        logger.info("قراءة مجموعة البيانات...")
-        df = pd.read_csv(path, encoding='utf-8')
-
-        if df.empty:
-            raise HTTPException(
-                status_code=422,
-                detail=get_message("dataset_empty", lang)
-            )
+    if error["type"] == "DatasetValidationError":
+        detail = get_message(error["message_key"], lang)
+        if error["errors"]:
+            detail = f"{detail}: {', '.join(error['errors'])}"
+        return 422, detail
+    if error["type"] == "ConnectionError":
+        return 500, f"فشل الاتصال بقاعدة البيانات - Database connection failed: {error['message']}"
+    if error.get("message_key"):
+        return 500, get_message(error["message_key"], lang)
+    return 500, get_message("training_error", lang, error=error["message"])
+
+
+def _dataset_training_response(result: Dict[str, Any], params: Dict[str, Any], lang: str) -> Dict[str, Any]:
+    """استجابة التدريب من ملف البيانات - Response body for dataset training"""
+    metrics = result["metrics"]
+    return {
+        "detail": get_message("training_completed", lang),
+        "message": get_message("model_saved", lang),
+        "metrics": {
+            get_message("accuracy", lang): metrics.get("accuracy"),
+            get_message("precision", lang): metrics.get("precision"),
+            get_message("recall", lang): metrics.get("recall"),
+            get_message("f1_score", lang): metrics.get("f1_score"),
+        },
+        "full_metrics": metrics,
+        "feature_importance": result["feature_importance"],
+        "training_info": {
+            "model_type": params["model_type"],
+            "model_version": result.get("model_version"),
+            "validation": metrics.get("validation"),
+            "training_samples": result["training_samples"],
+            "test_samples": result["test_samples"],
+            "total_features": result["total_features"]
+        }
+    }
+
+
+def _database_training_response(result: Dict[str, Any], params: Dict[str, Any], lang: str) -> Dict[str, Any]:
+    """استجابة التدريب من قاعدة البيانات - Response body for database training"""
+    metrics = result["metrics"]
+    return {
+        "detail": get_message("training_completed", lang),
+        "message": "تم التدريب بنجاح من قاعدة البيانات - Training completed successfully from database",
+        "data_source": {
+            "type": "SQL Server Database",
+            "table_name": params["table_name"] or "Custom Query",
+            "total_rows": result["total_rows"],
+            "total_columns": result["total_columns"],
+            "training_rows": result["training_samples"],
+            "testing_rows": result["test_samples"]
+        },
+        "metrics": {
+            "accuracy": round(metrics["accuracy"], 4),
+            "precision": round(metrics["precision"], 4),
+            "recall": round(metrics["recall"], 4),
+            "f1_score": round(metrics["f1_score"], 4),
+            "roc_auc": round(metrics.get("roc_auc", 0), 4)
+        },
+        "model_info": {
+            "type": params["model_type"],
+            "model_version": result.get("model_version"),
+            "cross_validation": params["use_cross_validation"],
+            "validation": metrics.get("validation"),
+            "features_count": result["total_features"],
+            "incremental": result.get("incremental"),
+            "watermark": result.get("watermark")
+        },
+        # أهم 10 ميزات - Top 10 features
+        "feature_importance": dict(list(result["feature_importance"].items())[:10]),
+        "data_warnings": result["data_warnings"]
+    }
+
+
+def _tuning_response(result: Dict[str, Any], params: Dict[str, Any], lang: str) -> Dict[str, Any]:
+    """استجابة البحث عن المعاملات - Response body for a hyperparameter search"""
+    response = _dataset_training_response(result, params, lang)
+    response["tuning"] = result["tuning"]
+    return response
+
+
+_RESPONSE_BUILDERS = {
+    "dataset": _dataset_training_response,
+    "database": _database_training_response,
+    "tuning": _tuning_response,
+}
+
+
+def _job_response(job: Dict[str, Any], lang: str) -> Dict[str, Any]:
+    """
+    حالة المهمة للعميل - Job state for clients
 
-        # التحقق من صحة البيانات - Validate dataset
-        is_valid, errors = validate_dataframe(df, require_target=True)
-        if not is_valid:
-            raise HTTPException(
-                status_code=422,
-                detail=f"{get_message('invalid_input', lang)}: {', '.join(errors)}"
-            )
+    النتيجة تُعرض بنفس شكل استجابة التدريب المتزامن السابقة
+    The result has the same shape the synchronous endpoints used to return
 
-        # تقسيم البيانات - Split data
-        logger.info("تقسيم البيانات...")
-        X_train, X_test, y_train, y_test = split_data(df)
+    Args:
+        job: حالة المهمة - Job state
+        lang: اللغة - Language
 
-        # تدريب النموذج - Train model
-        logger.info("بدء تدريب النموذج...")
+    Returns:
+        حالة المهمة مع النتيجة أو الخطأ المترجم - Job state with formatted result or localized error
+    """
+    if job.get("result") is not None:
+        job["result"] = _RESPONSE_BUILDERS[job["kind"]](job["result"], job["params"], lang)
+    if job.get("error") is not None:
+        job["error"]["detail"] = _training_error(job["error"], lang)[1]
+    return job
+
+
+async def _submit_job(
+    kind: str,
+    fn: Any,
+    kwargs: Dict[str, Any],
+    params: Dict[str, Any],
+    wait: bool,
+    lang: str
+):
+    """
+    إرسال مهمة والرد بمعرفها أو انتظار نتيجتها - Submit a job, then reply with its id or wait for it
 
-        if config is None:
-            config = TrainingConfig()
+    Args:
+        kind: نوع المهمة - Job kind
+        fn: دالة التدريب - Training function
+        kwargs: معاملات الدالة - Function arguments
+        params: المعاملات المعروضة - Displayed parameters
+        wait: انتظار انتهاء التدريب - Wait for the job to finish
+        lang: اللغة - Language
 
-        model = build_and_train(
-            X_train, y_train,
-            model_type=config.model_type,
-            use_cross_validation=config.use_cross_validation
+    Returns:
+        202 مع معرف المهمة، أو نتيجة التدريب عند الانتظار - 202 with the job id, or the training result when waiting
+    """
+    try:
+        job = training_jobs.submit(kind, fn, kwargs, params)
+    except ExecutorSaturatedError:
+        raise HTTPException(
+            status_code=503,
+            detail=get_message("server_busy", lang)
         )
 
-        # تقييم النموذج - Evaluate model
-        logger.info("تقييم النموذج...")
-        metrics = evaluate(model, X_test, y_test, detailed=True)
-
-        # حفظ النموذج - Save model
-        logger.info("حفظ النموذج...")
-        save_model(
-            model,
-            metadata={
-                "model_type": config.model_type,
-                "training_samples": len(X_train),
-                "test_samples": len(X_test)
+    job_id = job["job_id"]
+    if not wait:
+        return JSONResponse(
+            status_code=202,
+            content={
+                "detail": get_message("training_job_submitted", lang),
+                "job_id": job_id,
+                "status": job["status"],
+                "status_url": f"/train/jobs/{job_id}",
+                "cancel_url": f"/train/jobs/{job_id}/cancel"
             }
         )
 
-        # الحصول على أهمية المتغيرات - Get feature importance
-        feature_importance = get_feature_importance(model)
+    job = await training_jobs.wait(job_id)
+    if job["status"] == SUCCEEDED:
+        return {"job_id": job_id, **_RESPONSE_BUILDERS[kind](job["result"], params, lang)}
+    if job["status"] == CANCELLED:
+        raise HTTPException(status_code=409, detail=get_message("training_job_cancelled", lang))
 
-        logger.info("اكتمل التدريب بنجاح!")
+    status_code, detail = _training_error(job["error"], lang)
+    raise HTTPException(status_code=status_code, detail=detail)
 
-        return {
-            "detail": get_message("training_completed", lang),
-            "message": get_message("model_saved", lang),
-            "metrics": {
-                get_message("accuracy", lang): metrics.get("accuracy"),
-                get_message("precision", lang): metrics.get("precision"),
-                get_message("recall", lang): metrics.get("recall"),
-                get_message("f1_score", lang): metrics.get("f1_score"),
-            },
-            "full_metrics": metrics,
-            "feature_importance": feature_importance,
-            "training_info": {
-                "model_type": config.model_type,
-                "training_samples": len(X_train),
-                "test_samples": len(X_test),
-                "total_features": X_train.shape[1]
-            }
-        }
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"خطأ في التدريب: {e}")
+@router.post("/")
+async def train_model(
+    config: Optional[TrainingConfig] = None,
+    wait: bool = Query(False, description="انتظار انتهاء التدريب - Wait for training to finish"),
+    lang: str = Query("ar", description="اللغة - Language (ar/en)")
+):
+    """
+    تدريب نموذج التنبؤ بالترقيات - Train promotion prediction model
+
+    يُرسل التدريب كمهمة في عملية مستقلة ويُرجع 202 مع معرف المهمة؛
+    تابع التقدم عبر /train/jobs/{job_id}.
+    Training is submitted as a job in its own process and 202 is
+    returned with the job id; follow progress at /train/jobs/{job_id}.
+
+    Args:
+        config: تكوين التدريب - Training configuration
+        wait: انتظار النتيجة بدلاً من الرد فوراً - Wait for the result instead of replying at once
+        lang: اللغة - Language
+
+    Returns:
+        معرف المهمة، أو نتائج التدريب والمقاييس عند الانتظار - Job id, or training results and metrics when waiting
+    """
+    # التحقق من وجود البيانات - Check for dataset
+    path = cleaned_dataset_path()
+    if path is None:
         raise HTTPException(
-            status_code=500,
-            detail=get_message("training_error", lang, error=str(e))
+            status_code=404,
+            detail=get_message("no_dataset", lang)
         )
 
+    if config is None:
+        config = TrainingConfig()
+
+    logger.info("إرسال التدريب كمهمة في الخلفية...")
+    return await _submit_job(
+        "dataset",
+        train_from_dataset_file,
+        {
+            "dataset_path": str(path),
+            "model_type": config.model_type,
+            "use_cross_validation": config.use_cross_validation,
+            "validation_mode": config.validation_mode
+        },
+        {
+            "model_type": config.model_type,
+            "use_cross_validation": config.use_cross_validation,
+            "validation_mode": config.validation_mode
+        },
+        wait,
+        lang
+    )
+
 
 @router.post("/from-database")
 async def train_from_database(
     table_name: Optional[str] = Query(None, description="اسم الجدول - Table name"),
     query: Optional[str] = Query(None, description="استعلام SQL مخصص - Custom SQL query"),
     limit: Optional[int] = Query(None, description="حد عدد الصفوف - Row limit"),
+    incremental: bool = Query(False, description="التدريب على الصفوف الجديدة فقط - Train on newly arrived rows only"),
     config: Optional[TrainingConfig] = None,
+    wait: bool = Query(False, description="انتظار انتهاء التدريب - Wait for training to finish"),
     lang: str = Query("ar", description="اللغة - Language (ar/en)")
 ):
     """
     تدريب النموذج من قاعدة بيانات SQL Server - Train model from SQL Server database
 
+    يُرسل التحميل والتنظيف والتدريب كمهمة في عملية مستقلة ويُرجع 202 مع معرف المهمة.
+    Loading, cleaning and training are submitted as a job in its own
+    process and 202 is returned with the job id.
+
+    مع incremental=true تُسحب الصفوف الجديدة فقط بعد آخر علامة وتُضاف أشجار للنموذج الحالي.
+    With incremental=true only rows past the last high-water mark are
+    pulled and trees are added to the current model.
+
     Args:
         table_name: اسم الجدول - Table name (optional)
         query: استعلام SQL مخصص - Custom SQL query (optional)
         limit: حد عدد الصفوف - Row limit (optional)
+        incremental: التدريب التزايدي - Incremental training
         config: تكوين التدريب - Training configuration
+        wait: انتظار النتيجة بدلاً من الرد فوراً - Wait for the result instead of replying at once
         lang: اللغة - Language
 
     Returns:
-        نتائج التدريب والمقاييس - Training results and metrics
+        معرف المهمة، أو نتائج التدريب والمقاييس عند الانتظار - Job id, or training results and metrics when waiting
     """
-    try:
-        logger.info("=" * 60)
-        logger.info("بدء التدريب من قاعدة البيانات - Starting training from database")
-
-        # اختبار الاتصال بقاعدة البيانات
-        connection_test = db.test_connection()
-        if not connection_test["success"]:
-            raise HTTPException(
-                status_code=500,
-                detail=f"فشل الاتصال بقاعدة البيانات - Database connection failed: {connection_test.get('message', 'Unknown error')}"
-            )
-
-        logger.info(f"✅ الاتصال بقاعدة البيانات ناجح - {connection_test.get('server', 'Unknown')}")
-
-        # تحميل البيانات من قاعدة البيانات
-        logger.info("تحميل بيانات الموظفين من قاعدة البيانات...")
-        df = db.load_employee_data(table_name=table_name, query=query, limit=limit)
-
-        if df.empty:
-            raise HTTPException(
-                status_code=422,
-                detail=get_message("dataset_empty", lang)
-            )
-
-        logger.info(f"تم تحميل {len(df)} موظف، {len(df.columns)} عمود")
+    logger.info("=" * 60)
+    logger.info("إرسال التدريب من قاعدة البيانات كمهمة - Submitting database training job")
+
+    # تحديد نوع النموذج
+    model_type = config.model_type if config else "random_forest"
+    use_cv = config.use_cross_validation if config else True
+    validation_mode = config.validation_mode if config else None
+
+    # إعدادات الاتصال تُمرر للعملية فقط ولا تُحفظ في سجل المهام
+    # Connection settings go to the worker only and are never stored in the job history
+    return await _submit_job(
+        "database",
+        train_from_database_source,
+        {
+            "connection": get_db().connection_settings(),
+            "table_name": table_name,
+            "query": query,
+            "limit": limit,
+            "model_type": model_type,
+            "use_cross_validation": use_cv,
+            "validation_mode": validation_mode,
+            "incremental": incremental
+        },
+        {
+            "table_name": table_name,
+            "custom_query": bool(query),
+            "limit": limit,
+            "model_type": model_type,
+            "use_cross_validation": use_cv,
+            "validation_mode": validation_mode,
+            "incremental": incremental
+        },
+        wait,
+        lang
+    )
+
+
+@router.post("/tune")
+async def tune_model(
+    config: Optional[TuningConfig] = None,
+    wait: bool = Query(False, description="انتظار انتهاء البحث - Wait for the search to finish"),
+    lang: str = Query("ar", description="اللغة - Language (ar/en)")
+):
+    """
+    البحث عن أفضل معاملات النموذج - Hyperparameter search with successive halving
 
-        # تحضير البيانات
-        logger.info("تحضير بيانات الموظفين...")
-        df = prepare_employee_data(df)
+    يُقيّم مرشحين من فضاء البحث على عينات متزايدة ويُبقي الأفضل في كل جولة،
+    على TUNING_N_JOBS نواة فقط، ثم يُدرب أفضلهم وينشره كنموذج حالي. المرشحون
+    المكتملون يُحفظون في models/tuning؛ إعادة نفس الطلب بعد انقطاع تستأنف البحث.
+    Candidates from the search space are scored on growing samples and the
+    best survive each round, on TUNING_N_JOBS cores only; the winner is then
+    refit and published as the current model. Finished candidates are
+    checkpointed under models/tuning, so repeating the same request after an
+    interruption resumes the search.
 
-        # تنظيف البيانات
-        logger.info("تنظيف البيانات...")
-        df = clean_df(df)
+    Args:
+        config: تكوين البحث - Search configuration
+        wait: انتظار النتيجة بدلاً من الرد فوراً - Wait for the result instead of replying at once
+        lang: اللغة - Language
 
-        # إنشاء عمود الهدف (promotion_eligible)
-        logger.info("إنشاء عمود الهدف...")
-        df = create_promotion_target(df)
+    Returns:
+        معرف المهمة، أو أفضل المعاملات والمقاييس عند الانتظار - Job id, or best parameters and metrics when waiting
+    """
+    path = cleaned_dataset_path()
+    if path is None:
+        raise HTTPException(
+            status_code=404,
+            detail=get_message("no_dataset", lang)
+        )
 
-        # حفظ البيانات المنظفة
-        cleaned_path = DATA_DIR / "cleaned_dataset.csv"
-        df.to_csv(cleaned_path, index=False, encoding='utf-8')
-        logger.info(f"تم حفظ البيانات المنظفة: {cleaned_path}")
+    if config is None:
+        config = TuningConfig()
+    if config.model_type not in TUNING_SEARCH_SPACES:
+        raise HTTPException(
+            status_code=422,
+            detail=get_message("tuning_unknown_model", lang, model_type=config.model_type)
+        )
 
-        # التحقق من صحة البيانات
-        is_valid, errors = validate_dataframe(df, require_target=True)
-        if not is_valid:
-            logger.warning(f"تحذيرات في البيانات: {errors}")
-            # نكمل التدريب مع التحذيرات
+    logger.info("إرسال البحث عن المعاملات كمهمة في الخلفية...")
+    return await _submit_job(
+        "tuning",
+        tune_from_dataset_file,
+        {"dataset_path": str(path), **config.model_dump()},
+        config.model_dump(),
+        wait,
+        lang
+    )
+
+
+@router.get("/jobs")
+async def list_training_jobs(
+    limit: int = Query(20, ge=1, le=500, description="الحد الأقصى - Max jobs"),
+    status: Optional[str] = Query(None, description="تصفية حسب الحالة - Status filter"),
+    lang: str = Query("ar", description="اللغة - Language (ar/en)")
+):
+    """
+    سجل مهام التدريب - Training job history
 
-        # تقسيم البيانات
-        logger.info("تقسيم البيانات...")
-        X_train, X_test, y_train, y_test = split_data(df)
+    Args:
+        limit: الحد الأقصى - Max jobs
+        status: الحالة (queued, running, succeeded, failed, cancelled) - Status filter
+        lang: اللغة - Language
 
-        logger.info(f"حجم بيانات التدريب: {len(X_train)}")
-        logger.info(f"حجم بيانات الاختبار: {len(X_test)}")
+    Returns:
+        المهام (الأحدث أولاً) وعداداتها - Jobs (newest first) and counters
+    """
+    return {
+        "jobs": [_job_response(job, lang) for job in training_jobs.list(limit, status)],
+        "summary": training_jobs.metrics()
+    }
 
-        # تحديد نوع النموذج
-        model_type = config.model_type if config else "random_forest"
-        use_cv = config.use_cross_validation if config else True
 
-        # بناء وتدريب النموذج
-        logger.info(f"بناء وتدريب النموذج ({model_type})...")
-        model, pipeline = build_and_train(
-            X_train, y_train,
-            model_type=model_type,
-            use_cross_validation=use_cv
-        )
+@router.get("/jobs/{job_id}")
+async def get_training_job(
+    job_id: str,
+    lang: str = Query("ar", description="اللغة - Language (ar/en)")
+):
+    """
+    حالة وتقدم مهمة تدريب - Training job status and progress
 
-        # تقييم النموذج
-        logger.info("تقييم النموذج...")
-        metrics = evaluate(pipeline, X_test, y_test)
+    Args:
+        job_id: معرف المهمة - Job id
+        lang: اللغة - Language
 
-        # حفظ النموذج
-        logger.info("حفظ النموذج...")
-        save_model(pipeline, metrics)
+    Returns:
+        الحالة والمرحلة الحالية والنتيجة عند الانتهاء - Status, current stage and result when done
+    """
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=get_message("training_job_not_found", lang))
+    return _job_response(job, lang)
 
-        # الحصول على أهمية الميزات
-        feature_importance = get_feature_importance(pipeline, X_train.columns)
 
-        logger.info("=" * 60)
-        logger.info("✅ اكتمل التدريب بنجاح من قاعدة البيانات!")
-        logger.info(f"الدقة: {metrics['accuracy']:.2%}")
-        logger.info("=" * 60)
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_training_job(
+    job_id: str,
+    lang: str = Query("ar", description="اللغة - Language (ar/en)")
+):
+    """
+    إلغاء مهمة تدريب - Cancel a training job
 
-        return {
-            "detail": get_message("training_success", lang),
-            "message": "تم التدريب بنجاح من قاعدة البيانات - Training completed successfully from database",
-            "data_source": {
-                "type": "SQL Server Database",
-                "table_name": table_name or "Custom Query",
-                "total_rows": len(df),
-                "total_columns": len(df.columns),
-                "training_rows": len(X_train),
-                "testing_rows": len(X_test)
-            },
-            "metrics": {
-                "accuracy": round(metrics["accuracy"], 4),
-                "precision": round(metrics["precision"], 4),
-                "recall": round(metrics["recall"], 4),
-                "f1_score": round(metrics["f1"], 4),
-                "roc_auc": round(metrics.get("roc_auc", 0), 4)
-            },
-            "model_info": {
-                "type": model_type,
-                "cross_validation": use_cv,
-                "features_count": len(X_train.columns)
-            },
-            "feature_importance": feature_importance[:10],  # أهم 10 ميزات
-            "data_warnings": errors if not is_valid else []
-        }
+    Args:
+        job_id: معرف المهمة - Job id
+        lang: اللغة - Language
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"خطأ في التدريب من قاعدة البيانات: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=500,
-            detail=f"خطأ في التدريب من قاعدة البيانات - Database training error: {str(e)}"
-        )
+    Returns:
+        حالة المهمة بعد طلب الإلغاء - Job state after the cancel request
+    """
+    try:
+        job = training_jobs.cancel(job_id)
+    except ValueError:
+        raise HTTPException(status_code=409, detail=get_message("training_job_finished", lang))
+    if job is None:
+        raise HTTPException(status_code=404, detail=get_message("training_job_not_found", lang))
+    return {"detail": get_message("training_job_cancelled", lang), **_job_response(job, lang)}
 
 
 @router.get("/database/test-connection")
@@ -327,7 +513,7 @@ async def test_database_connection(
         نتيجة الاختبار - Test result
     """
     try:
-        result = db.test_connection()
+        result = get_db().test_connection()
 
         if result["success"]:
             return {
@@ -392,15 +578,15 @@ async def diagnose_database_connection(
                 database=database,
                 username=username,
                 password=password,
-                driver=db.driver,
-                timeout=db.timeout
+                driver=get_db().driver,
+                timeout=get_db().timeout
             )
 
             diagnosis = custom_db.diagnose_connection()
         else:
             # استخدام الإعدادات من .env
             logger.info("📝 استخدام إعدادات .env - Using .env settings")
-            diagnosis = db.diagnose_connection()
+            diagnosis = get_db().diagnose_connection()
 
         # إضافة رسائل مترجمة
         if lang == "ar":
@@ -434,7 +620,7 @@ async def list_database_tables(
         قائمة الجداول - List of tables
     """
     try:
-        tables = db.list_tables()
+        tables = get_db().list_tables()
 
         return {
             "detail": f"تم العثور على {len(tables)} جدول - Found {len(tables)} tables",
@@ -465,7 +651,7 @@ async def get_table_info(
         معلومات الجدول - Table information
     """
     try:
-        info = db.get_table_info(table_name)
+        info = get_db().get_table_info(table_name)
 
         return {
             "detail": f"معلومات الجدول {table_name} - Table {table_name} information",
@@ -514,10 +700,17 @@ async def save_database_config(
         os.environ['SQL_SERVER_TIMEOUT'] = str(config.timeout)
         os.environ['DEFAULT_EMPLOYEE_TABLE'] = config.default_table
 
-        # إعادة تهيئة الاتصال بقاعدة البيانات
-        from app.database import DatabaseConnection
-        global db
-        db = DatabaseConnection()
+        # إعادة تهيئة الاتصال المشترك بالإعدادات الجديدة (تقرؤه الموجهات عند كل طلب)
+        # Rebuild the shared connection from the new settings (routers read it per request)
+        reset_db(
+            host=config.host,
+            port=str(config.port),
+            database=config.database,
+            username=config.username,
+            password=config.password,
+            driver=config.driver,
+            timeout=config.timeout
+        )
 
         return {
             "detail": get_message("db_config_saved", lang) if lang == "ar" else "Database configuration saved successfully",
@@ -4,17 +4,30 @@
 """
 
 from fastapi import APIRouter, File, UploadFile, HTTPException, Query
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+import asyncio
 import pandas as pd
 import numpy as np
 import shutil
 import os
+import time
+import uuid
+from collections import Counter
 from loguru import logger
 
 from app.config import (
-    DATA_DIR, ALLOWED_MIME_TYPES, MAX_FILE_SIZE_MB, ALLOWED_DATA_EXTENSIONS
+    DATA_DIR, ALLOWED_MIME_TYPES, MAX_FILE_SIZE_MB, MAX_STREAMING_FILE_SIZE_MB, ALLOWED_DATA_EXTENSIONS,
+    UPLOAD_PROJECT_COLUMNS, MAX_UPLOAD_FILES, CLEANED_DATASET_PATH, ID_COL
 )
-from app.data_utils import clean_df, validate_dataframe, get_data_summary, read_data_file
+from app.dataset_store import cleaned_dataset_path, iter_csv_chunks
+from app.data_utils import validate_columns
+from app.executors import ingestion_executor, ExecutorSaturatedError
+from app.ingestion import STREAMING_EXTENSIONS, IngestionResult, ingest_file, list_parts, merge_parts
+from app.readers import model_columns
+from app import upload_cache
+from app.serialization import dumps
 from app.i18n import get_message
 from pathlib import Path
 
@@ -83,9 +96,99 @@ def clean_summary_for_json(summary: dict) -> dict:
     return clean_value(summary)
 
 
+def _check_upload(file: UploadFile, lang: str) -> str:
+    """
+    التحقق من امتداد الملف وحجمه - Validate a file's extension and size
+
+    Args:
+        file: الملف المرفوع - Uploaded file
+        lang: اللغة - Language
+
+    Returns:
+        امتداد الملف - File extension
+
+    Raises:
+        HTTPException: 400 إذا كان الامتداد غير مدعوم أو الملف كبيراً - If the extension is unsupported or the file too large
+    """
+    # استخراج امتداد الملف - Extract file extension
+    file_extension = Path(file.filename).suffix.lower()
+
+    # التحقق من امتداد الملف - Validate file extension
+    if file_extension not in ALLOWED_DATA_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=get_message("file_invalid_type", lang) +
+                   f"\n\nالصيغ المدعومة - Supported formats: {', '.join(ALLOWED_DATA_EXTENSIONS)}"
+        )
+
+    # التحقق من حجم الملف - Validate file size
+    file.file.seek(0, 2)  # الانتقال إلى نهاية الملف - Seek to end
+    file_size = file.file.tell()  # الحصول على الحجم - Get size
+    file.file.seek(0)  # العودة إلى البداية - Return to start
+
+    # الصيغ المقروءة على أجزاء تقبل ملفات أكبر - Chunk-read formats accept larger files
+    max_size_mb = MAX_STREAMING_FILE_SIZE_MB if file_extension in STREAMING_EXTENSIONS else MAX_FILE_SIZE_MB
+    if file_size > max_size_mb * 1024 * 1024:
+        raise HTTPException(
+            status_code=400,
+            detail=get_message("file_too_large", lang, max_size=max_size_mb)
+        )
+    return file_extension
+
+
+def _dataset_response(result: IngestionResult, lang: str) -> Dict[str, Any]:
+    """
+    حقول الاستجابة المشتركة بعد الاستيعاب - Response fields shared by the upload endpoints
+
+    Args:
+        result: نتيجة الاستيعاب (rows > 0) - Ingestion result (rows > 0)
+        lang: اللغة - Language
+
+    Returns:
+        حقول الاستجابة - Response fields
+    """
+    # التحقق من صحة البيانات - Validate dataframe
+    is_valid, errors = validate_columns(result.columns, result.rows, result.missing, require_target=True)
+    if not is_valid:
+        logger.warning(f"مشاكل في البيانات: {errors}")
+        # لا نرفض الملف، فقط نحذر - Don't reject, just warn
+
+    logger.info(f"تم تنظيف وحفظ البيانات: {result.path} ({result.rows} صف، {result.chunks} جزء)")
+
+    # تنظيف القيم غير الصالحة في الملخص - Clean JSON-invalid values in the summary
+    try:
+        summary = clean_summary_for_json(result.summary)
+    except Exception as e:
+        logger.warning(f"فشل في إنشاء الملخص: {e}")
+        summary = {}
+
+    return {
+        "status": "success",
+        "detail": get_message("file_uploaded", lang),
+        "message": get_message("dataset_cleaned", lang),
+        "rows": result.rows,
+        "columns": len(result.columns),
+        "shape": [result.rows, len(result.columns)],
+        "column_names": result.columns,
+        "preview": safe_json_convert(result.preview),
+        "summary": summary,
+        "validation_warnings": errors if not is_valid else [],
+        "ingestion": {
+            "streamed": result.streamed,
+            "chunks": result.chunks,
+            "raw_rows": result.raw_rows,
+            "duplicates_removed": result.duplicates_removed
+        }
+    }
+
+
 @router.post("/dataset")
 async def upload_dataset(
     file: UploadFile = File(...),
+    merge_by_id: bool = Query(
+        False,
+        description="دمج مع البيانات الحالية حسب Emp_ID - Merge into the current dataset by Emp_ID"
+    ),
     lang: str = Query("ar", description="اللغة - Language (ar/en)")
 ):
     """
@@ -93,6 +196,8 @@ async def upload_dataset(
 
     Args:
         file: ملف بيانات (CSV, Excel, JSON, Parquet, إلخ) - Data file (CSV, Excel, JSON, Parquet, etc.)
+        merge_by_id: إزالة التكرار حسب Emp_ID ودمج الملف مع البيانات الحالية بدلاً من استبدالها
+            - Deduplicate on Emp_ID and merge the file into the current dataset instead of replacing it
         lang: اللغة - Language
 
     Returns:
@@ -101,47 +206,67 @@ async def upload_dataset(
     Supported formats:
         - CSV: .csv, .tsv
         - Excel: .xlsx, .xls, .xlsb, .xlsm
-        - Text: .txt
-        - JSON: .json
+        - Text: .txt (الفاصل يُكتشف - delimiter is sniffed)
+        - JSON: .json, .ndjson, .jsonl
         - Parquet: .parquet
         - Feather: .feather
+
+    CSV/TSV/TXT/NDJSON/Parquet/Feather تُقرأ وتُنظف على أجزاء (UPLOAD_CHUNK_ROWS) حتى
+    MAX_STREAMING_FILE_SIZE_MB؛ الصيغ الأخرى تُحمّل كاملة حتى MAX_FILE_SIZE_MB.
+    CSV/TSV/TXT/NDJSON/Parquet/Feather are read and cleaned in chunks
+    (UPLOAD_CHUNK_ROWS) up to MAX_STREAMING_FILE_SIZE_MB; other formats are
+    loaded whole, up to MAX_FILE_SIZE_MB.
+
+    الترميز والفاصل وشكل JSON تُكتشف من عينة وتُعاد في "format"
+    The encoding, delimiter and JSON layout are sniffed from a sample and returned in "format"
+
+    CSV يُقرأ بـ pyarrow وExcel بـ calamine عند توفرهما؛ إذا احتوى الملف كل أعمدة
+    النموذج تُقرأ هذه الأعمدة فقط (UPLOAD_PROJECT_COLUMNS)
+    CSV is read with pyarrow and Excel with calamine when available; when the
+    file has every model column only those are read (UPLOAD_PROJECT_COLUMNS)
+
+    بصمة الملف تُحسب أثناء حفظه؛ إعادة رفع نفس المحتوى تستعيد النتيجة السابقة
+    مباشرة (UPLOAD_CACHE_ENABLED). مع merge_by_id يُحتفظ بأول صف لكل Emp_ID في
+    الملف، وصفوف الملف تحل محل صفوف البيانات الحالية بنفس المعرف.
+    The file is hashed while it is saved; re-uploading the same content
+    restores the previous result immediately (UPLOAD_CACHE_ENABLED). With
+    merge_by_id the first row per Emp_ID in the file is kept and the file's
+    rows replace current rows with the same id.
     """
     try:
-        # استخراج امتداد الملف - Extract file extension
-        file_extension = Path(file.filename).suffix.lower()
-
-        # التحقق من امتداد الملف - Validate file extension
-        if file_extension not in ALLOWED_DATA_EXTENSIONS:
-            raise HTTPException(
-                status_code=400,
-                detail=get_message("file_invalid_type", lang) +
-                       f"\n\nالصيغ المدعومة - Supported formats: {', '.join(ALLOWED_DATA_EXTENSIONS)}"
-            )
+        file_extension = _check_upload(file, lang)
 
-        # التحقق من حجم الملف - Validate file size
-        file.file.seek(0, 2)  # الانتقال إلى نهاية الملف - Seek to end
-        file_size = file.file.tell()  # الحصول على الحجم - Get size
-        file.file.seek(0)  # العودة إلى البداية - Return to start
-
-        if file_size > MAX_FILE_SIZE_MB * 1024 * 1024:
-            raise HTTPException(
-                status_code=400,
-                detail=get_message("file_too_large", lang, max_size=MAX_FILE_SIZE_MB)
-            )
-
-        # حفظ الملف بامتداده الأصلي - Save file with original extension
+        # حفظ الملف بامتداده الأصلي مع حساب بصمته - Save file with original extension, hashing it on the way
         saved_path = DATA_DIR / f"raw_dataset{file_extension}"
-
-        # حفظ الملف - Save file
-        with open(saved_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        logger.info(f"تم حفظ الملف: {saved_path} (الحجم: {file_size / 1024:.2f} KB)")
-
-        # قراءة البيانات باستخدام الدالة الجديدة - Read data using new function
+        content_hash = await run_in_threadpool(upload_cache.save_and_hash, file.file, saved_path)
+
+        logger.info(f"تم حفظ الملف: {saved_path} (الحجم: {saved_path.stat().st_size / 1024:.2f} KB)")
+
+        # نتيجة الدمج تعتمد على البيانات الحالية فلا تُحفظ - A merge depends on the current data, so it is not cached
+        key = None if merge_by_id else upload_cache.cache_key(content_hash, file_extension)
+        cached = await run_in_threadpool(upload_cache.load, key) if key else None
+        if cached is not None:
+            return {
+                **cached,
+                "detail": get_message("file_uploaded", lang),
+                "message": get_message("dataset_cleaned", lang),
+                "filename": file.filename,
+                "cache": {"key": key, "hit": True}
+            }
+
+        base = cleaned_dataset_path() if merge_by_id else None
+        if base is not None and base.suffix != ".feather":
+            logger.warning(f"البيانات الحالية {base} بصيغة CSV القديمة ولا تُدمج - Legacy CSV store is not merged")
+            base = None
+
+        # قراءة وتنظيف وحفظ البيانات على أجزاء - Read, clean and store the data chunk by chunk
         try:
-            df = read_data_file(saved_path, file_extension)
-            logger.info(f"تم قراءة البيانات بنجاح: {len(df)} صف، {len(df.columns)} عمود")
+            result = await run_in_threadpool(
+                ingest_file, saved_path, file_extension,
+                target=DATA_DIR / f".upload-{uuid.uuid4().hex}.feather" if base else CLEANED_DATASET_PATH,
+                columns=model_columns() if UPLOAD_PROJECT_COLUMNS else None,
+                dedup_key=ID_COL if merge_by_id else None
+            )
         except Exception as e:
             logger.error(f"فشل في قراءة الملف: {e}")
             raise HTTPException(
@@ -150,55 +275,295 @@ async def upload_dataset(
             )
 
         # التحقق من البيانات - Validate data
-        if df.empty:
+        if result.rows == 0:
             raise HTTPException(
                 status_code=422,
                 detail=get_message("file_empty", lang)
             )
 
-        # تنظيف البيانات - Clean data
-        df = clean_df(df)
+        file_format, merge = result.file_format, None
+        if base is not None:
+            uploaded = result
+            result = await run_in_threadpool(merge_parts, [uploaded], CLEANED_DATASET_PATH, ID_COL, base)
+            merge = {
+                "key": ID_COL,
+                "uploaded_rows": uploaded.rows,
+                "file_duplicates_removed": uploaded.duplicates_removed,
+                "replaced_rows": result.duplicates_removed,
+                "rows": result.rows
+            }
+
+        response = {
+            **_dataset_response(result, lang),
+            "format": file_format.to_dict()
+        }
+        if merge_by_id:
+            response["ingestion"]["merge"] = merge
+        else:
+            await run_in_threadpool(upload_cache.store, key, result.path, response)
+        return {**response, "filename": file.filename, "cache": {"key": key, "hit": False}}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"خطأ غير متوقع في رفع الملف: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=get_message("error", lang) + f": {str(e)}"
+        )
+
 
-        # التحقق من صحة البيانات - Validate dataframe
-        is_valid, errors = validate_dataframe(df, require_target=True)
-        if not is_valid:
-            logger.warning(f"مشاكل في البيانات: {errors}")
-            # لا نرفض الملف، فقط نحذر - Don't reject, just warn
+class _Part(NamedTuple):
+    """ملف أو ورقة واحدة من رفع متعدد - One file or sheet of a multi-file upload"""
+    filename: str
+    path: Path
+    extension: str
+    sheet: Optional[str]
 
-        # حفظ البيانات المنظفة - Save cleaned data
-        cleaned_path = DATA_DIR / "cleaned_dataset.csv"
-        df.to_csv(cleaned_path, index=False, encoding='utf-8')
 
-        logger.info(f"تم تنظيف وحفظ البيانات: {cleaned_path}")
+def _part_report(part: _Part, result: Optional[IngestionResult], error: Optional[Exception]) -> Dict[str, Any]:
+    """
+    تقرير جزء واحد - Report for one part
 
-        # الحصول على ملخص البيانات - Get data summary
+    status: succeeded، أو skipped إذا لم يبق صف أو عمود معروف، أو failed
+    status: succeeded, skipped when no row or known column remained, or failed
+    """
+    report = {"file": part.filename, "sheet": part.sheet}
+    if error is not None:
+        report.update(status="failed", error=str(error))
+        return report
+    report.update(
+        status="succeeded" if result.rows else "skipped",
+        rows=result.rows,
+        raw_rows=result.raw_rows,
+        duplicates_removed=result.duplicates_removed,
+        columns=result.columns,
+        unmatched_columns=result.unmatched_columns,
+        seconds=round(result.seconds, 3),
+        format=result.file_format.to_dict()
+    )
+    return report
+
+
+async def _ingest_part(index: int, part: _Part, work_dir: Path) -> Tuple[int, Optional[IngestionResult], Optional[Exception]]:
+    """قراءة وتنظيف جزء في مجمع الاستيعاب - Read and clean one part in the ingestion pool"""
+    while True:
         try:
-            summary = get_data_summary(df)
-            # تنظيف القيم غير الصالحة في الملخص
-            summary = clean_summary_for_json(summary)
+            result = await ingestion_executor.run(
+                ingest_file, part.path, part.extension,
+                target=work_dir / f"part-{index:04d}.feather",
+                columns=model_columns() if UPLOAD_PROJECT_COLUMNS else None,
+                sheet_name=part.sheet,
+                harmonize=True
+            )
+            return index, result, None
+        except ExecutorSaturatedError:
+            # الرفع مقبول بالفعل، ننتظر مكاناً بدلاً من إفشال جزء - The upload is accepted: wait for a slot instead of failing a part
+            await asyncio.sleep(0.05)
         except Exception as e:
-            logger.warning(f"فشل في إنشاء الملخص: {e}")
-            summary = {}
-
-        return {
-            "status": "success",
-            "detail": get_message("file_uploaded", lang),
-            "message": get_message("dataset_cleaned", lang),
-            "filename": file.filename,
-            "rows": len(df),
-            "columns": len(df.columns),
-            "shape": list(df.shape),
-            "column_names": list(df.columns),
-            "preview": safe_json_convert(df.head(5)),
-            "summary": summary,
-            "validation_warnings": errors if not is_valid else []
+            logger.error(f"فشل في قراءة {part.filename} ({part.sheet or '-'}): {e}")
+            return index, None, e
+
+
+async def _ingest_datasets(
+    saved: List[Tuple[str, Path, str]],
+    work_dir: Path,
+    lang: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    استيعاب ملفات وأوراق متعددة بالتوازي ثم دمجها - Ingest several files and sheets in parallel, then merge them
+
+    يُنتج تقرير كل جزء عند اكتماله ثم {"summary": ...}؛ مجلد العمل يُحذف في النهاية
+    Yields each part's report as it completes, then {"summary": ...}; the work directory is removed at the end
+
+    Raises:
+        HTTPException: 422 إذا لم يبق أي صف بعد الدمج - If no rows remain after the merge
+    """
+    start = time.perf_counter()
+    try:
+        parts, failed = [], []
+        for filename, path, extension in saved:
+            try:
+                sheets = await run_in_threadpool(list_parts, path, extension)
+            except Exception as e:
+                failed.append((_Part(filename, path, extension, None), e))
+                continue
+            parts.extend(_Part(filename, path, extension, sheet) for sheet in sheets)
+
+        total = len(parts) + len(failed)
+        statuses = Counter()
+        first_error = failed[0][1] if failed else None
+        for part, error in failed:
+            report = _part_report(part, None, error)
+            statuses[report["status"]] += 1
+            yield {**report, "completed": sum(statuses.values()), "total": total}
+
+        # لا نحجز أكثر من عدد العمال حتى لا يملأ رفع واحد طابور المجمع
+        # Never hold more than max_workers slots so one upload cannot fill the pool queue
+        semaphore = asyncio.Semaphore(ingestion_executor.max_workers)
+
+        async def run(index: int, part: _Part):
+            async with semaphore:
+                return await _ingest_part(index, part, work_dir)
+
+        tasks = [asyncio.ensure_future(run(i, part)) for i, part in enumerate(parts)]
+        results: Dict[int, IngestionResult] = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result, error = await next_done
+                report = _part_report(parts[index], result, error)
+                statuses[report["status"]] += 1
+                if report["status"] == "succeeded":
+                    results[index] = result
+                first_error = first_error or error
+                yield {**report, "completed": sum(statuses.values()), "total": total}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        parse_seconds = sum(result.seconds for result in results.values())
+        merge_start = time.perf_counter()
+        merged = await run_in_threadpool(merge_parts, [results[i] for i in sorted(results)])
+        merge_seconds = time.perf_counter() - merge_start
+        if merged.rows == 0:
+            raise HTTPException(
+                status_code=422,
+                detail=get_message("file_parse_error", lang, error=str(first_error)) if first_error
+                else get_message("file_empty", lang)
+            )
+
+        yield {
+            "summary": {
+                **_dataset_response(merged, lang),
+                "message": get_message("datasets_merged", lang, count=len(results)),
+                "parts": {"total": total, **{status: statuses[status] for status in ("succeeded", "skipped", "failed")}},
+                "timing": {
+                    "wall_seconds": round(time.perf_counter() - start, 3),
+                    "parse_seconds": round(parse_seconds, 3),
+                    "merge_seconds": round(merge_seconds, 3),
+                    "workers": ingestion_executor.max_workers
+                }
+            }
         }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+@router.post("/datasets")
+async def upload_datasets(
+    files: List[UploadFile] = File(...),
+    stream: bool = Query(False, description="تقدم كل جزء كسطر NDJSON - Per-part progress as NDJSON lines"),
+    lang: str = Query("ar", description="اللغة - Language (ar/en)")
+):
+    """
+    رفع عدة ملفات بيانات ودمجها - Upload several dataset files and merge them
+
+    كل ملف وكل ورقة Excel تُقرأ وتُنظف في مجمع عمليات الاستيعاب بالتوازي
+    (INGESTION_MAX_WORKERS)؛ الأعمدة تُطابق مع DB_COLUMNS/FEATURE_COLS بغض النظر
+    عن حالة الأحرف والفواصل، ثم تُدمج الأجزاء في مخزن البيانات المنظفة مع حذف
+    الصفوف المكررة بينها.
+    Each file and each Excel sheet is read and cleaned in the ingestion
+    process pool in parallel (INGESTION_MAX_WORKERS); columns are matched to
+    DB_COLUMNS/FEATURE_COLS regardless of case and separators, then the parts
+    are merged into the cleaned store with cross-part duplicates dropped.
+
+    Args:
+        files: ملفات البيانات (حتى MAX_UPLOAD_FILES) - Data files (up to MAX_UPLOAD_FILES)
+        stream: إرسال تقرير كل جزء عند اكتماله - Send each part's report as it completes
+        lang: اللغة - Language
+
+    Returns:
+        معلومات البيانات المدمجة مع تقرير وتوقيت كل جزء؛ أو أسطر NDJSON لكل جزء
+        تليها {"summary": ...} عند stream=true
+        - Merged dataset information with per-part reports and timing; or one
+        NDJSON line per part followed by {"summary": ...} when stream=true
+    """
+    if len(files) > MAX_UPLOAD_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=get_message("too_many_files", lang, max_files=MAX_UPLOAD_FILES)
+        )
+    extensions = [_check_upload(file, lang) for file in files]
 
+    # مجلد عمل لكل رفع حتى لا يتداخل رفعان متزامنان - A work directory per upload so concurrent uploads don't collide
+    work_dir = DATA_DIR / f".upload-{uuid.uuid4().hex}"
+    work_dir.mkdir(parents=True)
+    saved = []
+    try:
+        for i, (file, extension) in enumerate(zip(files, extensions)):
+            path = work_dir / f"{i:03d}{extension}"
+            with open(path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+            saved.append((file.filename, path, extension))
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    logger.info(f"تم حفظ {len(saved)} ملف في {work_dir}")
+
+    events = _ingest_datasets(saved, work_dir, lang)
+    if stream:
+        return StreamingResponse(_stream_events(events), media_type="application/x-ndjson")
+
+    reports, summary = [], {}
+    try:
+        async for event in events:
+            if "summary" in event:
+                summary = event["summary"]
+            else:
+                reports.append(event)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"خطأ غير متوقع في رفع الملف: {e}")
+        logger.error(f"خطأ غير متوقع في رفع الملفات: {e}")
         raise HTTPException(
             status_code=500,
             detail=get_message("error", lang) + f": {str(e)}"
         )
+    return {**summary, "files": reports}
+
+
+async def _stream_events(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    أحداث الرفع كأسطر NDJSON - Upload events as NDJSON lines
+
+    الاستجابة بدأت بالفعل، فالأخطاء تُرسل في سطر summary
+    The response has already started, so errors are sent in the summary line
+    """
+    try:
+        async for event in events:
+            yield dumps(event) + b"\n"
+    except HTTPException as e:
+        yield dumps({"summary": {"status": "error", "detail": e.detail}}) + b"\n"
+    except Exception as e:
+        logger.error(f"خطأ غير متوقع في رفع الملفات: {e}")
+        yield dumps({"summary": {"status": "error", "detail": str(e)}}) + b"\n"
+
+
+@router.get("/dataset/export")
+async def export_dataset(
+    lang: str = Query("ar", description="اللغة - Language (ar/en)")
+):
+    """
+    تنزيل البيانات المنظفة كـ CSV - Download the cleaned dataset as CSV
+
+    البيانات تُخزن بصيغة Feather؛ التصدير يُحول إلى CSV على أجزاء دون ملف وسيط
+    The dataset is stored as Feather; the export converts to CSV in chunks without an intermediate file
+
+    Args:
+        lang: اللغة - Language
+
+    Returns:
+        ملف CSV متدفق - Streamed CSV file
+    """
+    path = cleaned_dataset_path()
+    if path is None:
+        raise HTTPException(
+            status_code=404,
+            detail=get_message("no_dataset", lang)
+        )
+
+    return StreamingResponse(
+        iter_csv_chunks(path),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="cleaned_dataset.csv"'}
+    )
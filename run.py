@@ -86,12 +86,24 @@ async def startup_event():
     logger.info(f"📚 الوثائق: http://localhost:8000/docs")
     logger.info("=" * 60)
 
+    # تحميل النموذج مسبقاً في السجل - Preload model into the registry
+    from app.model_registry import model_registry
+    model_registry.preload()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """حدث إيقاف التشغيل - Shutdown event"""
     logger.info("⏹️  إيقاف النظام...")
 
+    # إلغاء مهام التدريب الجارية - Cancel running training jobs
+    from app.training_jobs import training_jobs
+    training_jobs.shutdown()
+
+    # إيقاف مجمعات التنفيذ - Shut down executor pools
+    from app.executors import shutdown_executors
+    shutdown_executors()
+
 
 if __name__ == "__main__":
     uvicorn.run(
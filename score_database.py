@@ -0,0 +1,47 @@
+"""
+Bulk-score employees from SQL Server (or any SQLAlchemy URL) into a results table
+
+Usage:
+    python score_database.py                                  # SQL Server settings from .env
+    python score_database.py --url sqlite:///hr.db --table Employees --chunk-size 2000
+"""
+
+import argparse
+import json
+
+from app.bulk_scoring import score_database_source
+from app.config import (
+    DEFAULT_EMPLOYEE_TABLE, BULK_SCORING_RESULTS_TABLE, BULK_SCORING_CHUNK_SIZE,
+    INFERENCE_BACKENDS
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score employees in chunks and write predictions back")
+    parser.add_argument("--url", help="SQLAlchemy URL (default: SQL Server settings from .env)")
+    parser.add_argument("--table", default=DEFAULT_EMPLOYEE_TABLE, help="Employee table")
+    parser.add_argument("--results-table", default=BULK_SCORING_RESULTS_TABLE, help="Results table")
+    parser.add_argument("--chunk-size", type=int, default=BULK_SCORING_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum rows to score")
+    parser.add_argument("--backend", choices=INFERENCE_BACKENDS, default=None, help="Inference backend")
+    args = parser.parse_args()
+
+    connection = None
+    if not args.url:
+        from app.database import db
+        connection = db.connection_settings()
+
+    summary = score_database_source(
+        connection=connection,
+        database_url=args.url,
+        source_table=args.table,
+        results_table=args.results_table,
+        chunk_size=args.chunk_size,
+        limit=args.limit,
+        backend=args.backend
+    )
+    print(json.dumps(summary, indent=2, ensure_ascii=False, default=str))
+
+
+if __name__ == '__main__':
+    main()
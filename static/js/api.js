@@ -65,8 +65,32 @@ const API = {
         }
     },
     
-    // Training
-    async trainModel(config = {}, lang = 'ar') {
+    // Training (submitted as a background job, then polled until it finishes)
+    async waitForTrainingJob(submitResponse, lang = 'ar', onProgress = null) {
+        const submitted = await submitResponse.json();
+        if (submitResponse.status !== 202) {
+            return submitted;
+        }
+
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const job = await this.getTrainingJob(submitted.job_id, lang);
+            if (onProgress) onProgress(job.progress, job);
+
+            if (job.status === 'succeeded') {
+                return { status: 'success', job_id: job.job_id, ...job.result };
+            }
+            if (job.status === 'failed' || job.status === 'cancelled') {
+                return {
+                    status: job.status,
+                    job_id: job.job_id,
+                    detail: job.error ? job.error.detail : job.status
+                };
+            }
+        }
+    },
+
+    async trainModel(config = {}, lang = 'ar', onProgress = null) {
         try {
             const response = await fetch(`${API_BASE}/train/?lang=${lang}`, {
                 method: 'POST',
@@ -75,14 +99,14 @@ const API = {
                 },
                 body: JSON.stringify(config)
             });
-            return await response.json();
+            return await this.waitForTrainingJob(response, lang, onProgress);
         } catch (error) {
             console.error('Training error:', error);
             throw error;
         }
     },
     
-    async trainFromDatabase(tableName = null, query = null, limit = null, lang = 'ar') {
+    async trainFromDatabase(tableName = null, query = null, limit = null, lang = 'ar', onProgress = null) {
         let url = `${API_BASE}/train/from-database?lang=${lang}`;
         if (tableName) url += `&table_name=${tableName}`;
         if (query) url += `&query=${encodeURIComponent(query)}`;
@@ -92,12 +116,24 @@ const API = {
             const response = await fetch(url, {
                 method: 'POST'
             });
-            return await response.json();
+            return await this.waitForTrainingJob(response, lang, onProgress);
         } catch (error) {
             console.error('Database training error:', error);
             throw error;
         }
     },
+
+    async getTrainingJob(jobId, lang = 'ar') {
+        const response = await fetch(`${API_BASE}/train/jobs/${jobId}?lang=${lang}`);
+        return await response.json();
+    },
+
+    async cancelTrainingJob(jobId, lang = 'ar') {
+        const response = await fetch(`${API_BASE}/train/jobs/${jobId}/cancel?lang=${lang}`, {
+            method: 'POST'
+        });
+        return await response.json();
+    },
     
     // Database
     async testDatabaseConnection(lang = 'ar') {
@@ -55,6 +55,7 @@ const i18n = {
         train_model_type: 'نوع النموذج',
         train_random_forest: 'Random Forest',
         train_gradient_boosting: 'Gradient Boosting',
+        train_hist_gradient_boosting: 'Histogram Gradient Boosting',
         train_cross_validation: 'استخدام التحقق المتقاطع',
         train_start: 'بدء التدريب',
         train_progress: 'جاري التدريب...',
@@ -175,6 +176,7 @@ const i18n = {
         train_model_type: 'Model Type',
         train_random_forest: 'Random Forest',
         train_gradient_boosting: 'Gradient Boosting',
+        train_hist_gradient_boosting: 'Histogram Gradient Boosting',
         train_cross_validation: 'Use Cross Validation',
         train_start: 'Start Training',
         train_progress: 'Training in progress...',
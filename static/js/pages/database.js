@@ -497,7 +497,9 @@ async function trainFromTable(tableName) {
     try {
         progressBar.style.width = '30%';
         
-        const result = await API.trainFromDatabase(tableName, null, null, lang);
+        const result = await API.trainFromDatabase(tableName, null, null, lang, (progress) => {
+            progressBar.style.width = `${Math.max(progress.percent, 10)}%`;
+        });
         
         progressBar.style.width = '100%';
         
@@ -82,6 +82,7 @@ async function loadSettingsPage() {
                                 <select class="form-select" id="defaultModelType">
                                     <option value="random_forest">Random Forest</option>
                                     <option value="gradient_boosting">Gradient Boosting</option>
+                                    <option value="hist_gradient_boosting">Histogram Gradient Boosting</option>
                                 </select>
                             </div>
                             <div class="form-check form-switch mb-3">
@@ -23,6 +23,7 @@ async function loadTrainPage() {
                                 <select class="form-select" id="modelType">
                                     <option value="random_forest">Random Forest</option>
                                     <option value="gradient_boosting">Gradient Boosting</option>
+                                    <option value="hist_gradient_boosting">Histogram Gradient Boosting</option>
                                 </select>
                             </div>
                             
@@ -109,7 +110,9 @@ async function startTraining() {
             use_cross_validation: useCrossValidation
         };
         
-        const result = await API.trainModel(config, lang);
+        const result = await API.trainModel(config, lang, (progress) => {
+            progressBar.style.width = `${Math.max(progress.percent, 10)}%`;
+        });
         
         progressBar.style.width = '100%';
         
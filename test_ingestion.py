@@ -0,0 +1,71 @@
+"""
+Tests for file ingestion, deduplication and merging
+اختبارات استيعاب الملفات وإزالة التكرار والدمج
+"""
+
+import pandas as pd
+
+from app.config import CATEGORICAL_COLS, ID_COL, NUMERIC_VALUE_RANGES, TARGET_COL
+from app.dataset_store import load_cleaned_dataset
+from app.ingestion import RowDeduplicator, ingest_file, merge_parts
+
+
+def _employees(ids, age):
+    """Valid employee rows with the given ids and age"""
+    rows = []
+    for emp_id in ids:
+        row = {ID_COL: emp_id}
+        for col, (low, high) in NUMERIC_VALUE_RANGES.items():
+            row[col] = (low + high) / 2
+        row["Age"] = age
+        for col in CATEGORICAL_COLS:
+            row[col] = f"{col}_{emp_id % 2}"
+        row["gender"] = "male"
+        row[TARGET_COL] = emp_id % 2
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _ingest(tmp_path, name, df, **kwargs):
+    path = tmp_path / f"{name}.csv"
+    df.to_csv(path, index=False)
+    return ingest_file(path, ".csv", target=tmp_path / f"{name}.feather", **kwargs)
+
+
+def test_ingest_drops_repeated_ids(tmp_path):
+    """With a dedup key the first row of each id is kept"""
+    df = pd.concat([_employees(range(1, 4), 30), _employees([2], 60)])
+    result = _ingest(tmp_path, "upload", df, dedup_key=ID_COL)
+
+    stored = load_cleaned_dataset(result.path)
+    assert result.rows == 3
+    assert result.duplicates_removed == 1
+    assert stored.set_index(ID_COL).loc[2, "Age"] == 30
+
+
+def test_merge_parts_uploaded_rows_win(tmp_path):
+    """Ids present in both the upload and the existing dataset take the uploaded values"""
+    base = _ingest(tmp_path, "base", _employees(range(1, 6), 30))
+    uploaded = _ingest(tmp_path, "upload", _employees(range(4, 8), 50), dedup_key=ID_COL)
+
+    merged = merge_parts([uploaded], tmp_path / "merged.feather", ID_COL, base.path)
+
+    stored = load_cleaned_dataset(merged.path).set_index(ID_COL)
+    assert merged.rows == 7
+    assert merged.duplicates_removed == 2
+    assert stored.index.is_unique
+    assert stored.loc[[4, 5, 6, 7], "Age"].tolist() == [50, 50, 50, 50]
+    assert stored.loc[[1, 2, 3], "Age"].tolist() == [30, 30, 30]
+    # ملف الجزء يُحذف والأساس يبقى - The part file is removed, the base is kept
+    assert not uploaded.path.exists()
+    assert base.path.exists()
+
+
+def test_deduplicator_compares_rows_without_id_whole():
+    """Rows with a missing id are only dropped when the whole row repeats"""
+    dedup = RowDeduplicator(ID_COL)
+    df = pd.DataFrame({ID_COL: [1, 1, None, None, None], "a": [1, 2, 3, 3, 4]})
+
+    kept = dedup.filter(df)
+
+    assert kept["a"].tolist() == [1, 3, 4]
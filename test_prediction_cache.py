@@ -0,0 +1,62 @@
+"""
+Tests for the prediction result cache
+اختبارات ذاكرة نتائج التنبؤ
+"""
+
+from app.prediction_cache import PredictionCache, feature_key
+
+
+def _cache(**kwargs):
+    kwargs.setdefault("max_bytes", 1 << 20)
+    kwargs.setdefault("ttl_seconds", 0)
+    return PredictionCache(enabled=True, **kwargs)
+
+
+def test_hit_for_same_version():
+    """A stored prediction is returned while the model version is unchanged"""
+    cache = _cache()
+    key = feature_key({"Age": 35, "Awards": 2})
+    cache.put_many("v1", [(key, (1, (0.2, 0.8)))])
+
+    assert cache.get_many("v1", [key]) == [(1, (0.2, 0.8))]
+    assert cache.metrics()["hits"] == 1
+
+
+def test_numeric_values_share_a_key():
+    """35 and 35.0 describe the same employee"""
+    assert feature_key({"Age": 35}) == feature_key({"Age": 35.0})
+
+
+def test_version_change_invalidates():
+    """Publishing a new model version drops every cached prediction"""
+    cache = _cache()
+    key = feature_key({"Age": 35})
+    cache.put_many("v1", [(key, (1, (0.2, 0.8)))])
+
+    assert cache.get_many("v2", [key]) == [None]
+    metrics = cache.metrics()
+    assert metrics["invalidations"] == 1
+    assert metrics["entries"] == 0
+    assert metrics["model_version"] == "v2"
+
+
+def test_late_result_from_replaced_model_is_dropped():
+    """A batch scored by the old model after the swap is not stored"""
+    cache = _cache()
+    key = feature_key({"Age": 35})
+    cache.get_many("v2", [key])
+    cache.put_many("v1", [(key, (1, (0.2, 0.8)))])
+
+    assert cache.get_many("v2", [key]) == [None]
+    assert cache.metrics()["entries"] == 0
+
+
+def test_evicts_least_recently_used():
+    """The memory cap evicts the entry used longest ago"""
+    cache = _cache(max_bytes=1)
+    first, second = feature_key({"Age": 30}), feature_key({"Age": 40})
+    cache.put_many("v1", [(first, (0, (0.9, 0.1)))])
+    cache.put_many("v1", [(second, (1, (0.1, 0.9)))])
+
+    assert cache.get_many("v1", [first, second]) == [None, None]
+    assert cache.metrics()["evictions"] == 2
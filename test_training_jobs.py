@@ -0,0 +1,116 @@
+"""
+Tests for asynchronous training jobs and the bounded executors
+اختبارات مهام التدريب غير المتزامنة والمنفذات المحدودة
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.executors import BoundedExecutor, ExecutorSaturatedError
+from app.training_jobs import CANCELLED, RUNNING, SUCCEEDED, TrainingJobManager
+
+
+def _quick_job(progress, steps):
+    """Training stand-in that reports progress and returns a version"""
+    for step in range(steps):
+        progress("fitting", step, steps)
+    return {"model_version": "v-test"}
+
+
+def _slow_job(progress, seconds):
+    """Training stand-in that runs until it is cancelled"""
+    progress("fitting", 0, 1)
+    time.sleep(seconds)
+    return {"model_version": "v-slow"}
+
+
+def _wait_for(manager, job_id, status, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while manager.get(job_id)["status"] != status:
+        assert time.monotonic() < deadline, f"job never reached {status}"
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    jobs = TrainingJobManager(history_path=tmp_path / "training_jobs.json", max_running=1, max_queued=1, nice=0)
+    yield jobs
+    jobs.shutdown()
+
+
+def test_job_succeeds_and_persists(manager):
+    """A finished job is written to the history with its result"""
+    job = manager.submit("dataset", _quick_job, {"steps": 50})
+    final = asyncio.run(manager.wait(job["job_id"]))
+
+    assert final["status"] == SUCCEEDED
+    assert final["model_version"] == "v-test"
+    assert final["progress"]["percent"] == 100.0
+    history = json.loads(manager.history_path.read_text(encoding="utf-8"))
+    assert [(j["job_id"], j["status"]) for j in history] == [(job["job_id"], SUCCEEDED)]
+
+
+def test_cancel_running_and_queued_jobs(manager):
+    """Cancelling stops the running process and drops the queued job"""
+    running = manager.submit("dataset", _slow_job, {"seconds": 60})
+    queued = manager.submit("dataset", _slow_job, {"seconds": 60})
+    _wait_for(manager, running["job_id"], RUNNING)
+
+    # لا مكان لمهمة ثالثة - No slot for a third job
+    with pytest.raises(ExecutorSaturatedError):
+        manager.submit("dataset", _slow_job, {"seconds": 60})
+
+    assert manager.cancel(queued["job_id"])["status"] == CANCELLED
+    manager.cancel(running["job_id"])
+    final = asyncio.run(manager.wait(running["job_id"]))
+
+    assert final["status"] == CANCELLED
+    assert final["cancel_requested"] is True
+    with pytest.raises(ValueError):
+        manager.cancel(running["job_id"])
+    history = {j["job_id"]: j["status"] for j in json.loads(manager.history_path.read_text(encoding="utf-8"))}
+    assert history == {running["job_id"]: CANCELLED, queued["job_id"]: CANCELLED}
+
+
+def test_interrupted_job_is_marked_failed_on_reload(tmp_path):
+    """A job left running by a stopped server is reported as interrupted"""
+    path = tmp_path / "training_jobs.json"
+    path.write_text(json.dumps([{"job_id": "abc", "status": RUNNING, "finished_at": None}]), encoding="utf-8")
+
+    job = TrainingJobManager(history_path=path).get("abc")
+
+    assert job["status"] == "failed"
+    assert job["error"]["message_key"] == "training_job_interrupted"
+
+
+def test_bounded_executor_rejects_when_full():
+    """Once workers and queue are busy the next task is rejected (HTTP 503)"""
+    release = threading.Event()
+    executor = BoundedExecutor(
+        "test", lambda: ThreadPoolExecutor(max_workers=1), max_workers=1, max_queue=1
+    )
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(release.wait, 30))
+        second = asyncio.ensure_future(executor.run(release.wait, 30))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(release.wait, 30)
+        release.set()
+        return await asyncio.gather(first, second)
+
+    try:
+        assert asyncio.run(scenario()) == [True, True]
+    finally:
+        release.set()
+        executor.shutdown()
+
+    metrics = executor.metrics()
+    assert metrics["rejected"] == 1
+    assert metrics["completed"] == 2
+    assert metrics["queued"] == 0
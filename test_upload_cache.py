@@ -0,0 +1,76 @@
+"""
+Tests for the upload result cache
+اختبارات ذاكرة الملفات المرفوعة
+"""
+
+import io
+
+import pytest
+
+from app import upload_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(upload_cache, "UPLOAD_CACHE_DIR", directory)
+    monkeypatch.setattr(upload_cache, "UPLOAD_CACHE_ENABLED", True)
+    monkeypatch.setattr(upload_cache, "UPLOAD_CACHE_MAX_ENTRIES", 2)
+    return directory
+
+
+def _tmp_files(directory):
+    return [path.name for path in directory.iterdir() if path.name.endswith(".tmp")]
+
+
+def test_save_and_hash_matches_content(tmp_path):
+    """The hash depends only on the content"""
+    first = upload_cache.save_and_hash(io.BytesIO(b"a,b\n1,2\n"), tmp_path / "first.csv")
+    second = upload_cache.save_and_hash(io.BytesIO(b"a,b\n1,2\n"), tmp_path / "second.csv")
+
+    assert first == second
+    assert (tmp_path / "first.csv").read_bytes() == b"a,b\n1,2\n"
+
+
+def test_repeat_load_leaves_no_tmp_file(tmp_path, cache_dir):
+    """The live dataset already links the cached copy: loading again must not leak a tmp link"""
+    target = tmp_path / "cleaned_dataset.feather"
+    target.write_bytes(b"cleaned")
+    key = upload_cache.cache_key("content", ".csv")
+    upload_cache.store(key, target, {"rows": 1})
+
+    for _ in range(3):
+        assert upload_cache.load(key, target) == {"rows": 1}
+
+    assert _tmp_files(tmp_path) == []
+    assert target.read_bytes() == b"cleaned"
+
+
+def test_load_restores_replaced_dataset(tmp_path, cache_dir):
+    """A hit replaces whatever dataset another upload wrote in between"""
+    target = tmp_path / "cleaned_dataset.feather"
+    target.write_bytes(b"cleaned")
+    key = upload_cache.cache_key("content", ".csv")
+    upload_cache.store(key, target, {"rows": 1})
+
+    target.unlink()
+    target.write_bytes(b"other upload")
+    assert upload_cache.load(key, target) == {"rows": 1}
+
+    assert target.read_bytes() == b"cleaned"
+    assert _tmp_files(tmp_path) == []
+
+
+def test_miss_and_prune(tmp_path, cache_dir):
+    """Unknown keys miss and only the most recently used entries are kept"""
+    target = tmp_path / "cleaned_dataset.feather"
+    assert upload_cache.load("missing", target) is None
+
+    keys = [upload_cache.cache_key(f"content-{i}", ".csv") for i in range(3)]
+    for i, key in enumerate(keys):
+        target.write_bytes(f"cleaned {i}".encode())
+        upload_cache.store(key, target, {"rows": i})
+        target.unlink()
+
+    assert upload_cache.load(keys[0], target) is None
+    assert upload_cache.load(keys[2], target) == {"rows": 2}